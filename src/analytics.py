@@ -0,0 +1,263 @@
+import json
+import os
+import sys
+import time
+import uuid
+
+# Learning analytics: every snippet that spawns, gets caught or falls past the
+# catcher is written to an append-only JSON-lines log. The aggregator folds
+# those events into running per-snippet statistics and remembers how far into
+# the log it has read, so it never rescans history.
+
+
+class EventLog:
+    def __init__(self, path, flush_every=64):
+        self.path = path
+        self.flush_every = flush_every
+        self.pending = []
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def append(self, event):
+        self.pending.append(event)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        lines = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in self.pending)
+        self.pending = []
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            # Analytics must never take the game down
+            pass
+
+
+class Analytics:
+    # Thin recorder used by Game; one instance per running game. Timings come
+    # from the object's frame counters, so pauses don't count towards them.
+    def __init__(self, path, enabled=True, fps=60):
+        self.enabled = enabled
+        self.fps = fps
+        self.log = EventLog(path) if enabled else None
+        self.session = uuid.uuid4().hex[:12]
+
+    def new_session(self):
+        self.flush()
+        self.session = uuid.uuid4().hex[:12]
+
+    def record(self, kind, obj, level):
+        if not self.enabled:
+            return
+        now = time.time()
+        event = {
+            "type": kind,
+            "t": round(now, 3),
+            "session": self.session,
+            "text": obj.text,
+            "is_correct": obj.is_correct,
+            "x": obj.rect.centerx,
+            "level": level,
+        }
+        if kind != "spawn":
+            # Seconds on screen, and until the player first moved towards it
+            event["fall"] = round(obj.age / self.fps, 3)
+            if obj.reacted_at is not None:
+                event["reaction"] = round(obj.reacted_at / self.fps, 3)
+        self.log.append(event)
+
+    def spawn(self, obj, level):
+        self.record("spawn", obj, level)
+
+    def catch(self, obj, level):
+        self.record("catch", obj, level)
+
+    def miss(self, obj, level):
+        self.record("miss", obj, level)
+
+    def flush(self):
+        if self.enabled:
+            self.log.flush()
+
+
+class SnippetStats:
+    __slots__ = ("is_correct", "spawns", "catches", "misses",
+                 "reaction_count", "reaction_mean", "reaction_m2")
+
+    def __init__(self, is_correct=True):
+        self.is_correct = is_correct
+        self.spawns = 0
+        self.catches = 0
+        self.misses = 0
+        self.reaction_count = 0
+        self.reaction_mean = 0.0
+        self.reaction_m2 = 0.0
+
+    def add(self, event):
+        kind = event["type"]
+        if kind == "spawn":
+            self.spawns += 1
+            return
+        if kind == "catch":
+            self.catches += 1
+        elif kind == "miss":
+            self.misses += 1
+        else:
+            return
+
+        # Welford's running mean/variance, only for deliberate catches
+        reaction = event.get("reaction")
+        if kind == "catch" and reaction is not None:
+            self.reaction_count += 1
+            delta = reaction - self.reaction_mean
+            self.reaction_mean += delta / self.reaction_count
+            self.reaction_m2 += delta * (reaction - self.reaction_mean)
+
+    @property
+    def resolved(self):
+        return self.catches + self.misses
+
+    @property
+    def accuracy(self):
+        # Catching correct code and letting bugs fall are both right answers
+        if self.resolved == 0:
+            return None
+        right = self.catches if self.is_correct else self.misses
+        return right / self.resolved
+
+    @property
+    def reaction_stddev(self):
+        if self.reaction_count < 2:
+            return 0.0
+        return (self.reaction_m2 / (self.reaction_count - 1)) ** 0.5
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for slot in cls.__slots__:
+            if slot in data:
+                setattr(stats, slot, data[slot])
+        return stats
+
+
+class SnippetAggregator:
+    def __init__(self):
+        self.stats = {}
+        # A game appends its events in one run, so counting changes of
+        # session id counts sessions without keeping every id
+        self.sessions = 0
+        self.last_session = None
+        self.offset = 0
+
+    def consume(self, event):
+        text = event.get("text")
+        if text is None:
+            return
+        stats = self.stats.get(text)
+        if stats is None:
+            stats = self.stats[text] = SnippetStats(event.get("is_correct", True))
+        stats.add(event)
+        session = event.get("session")
+        if session and session != self.last_session:
+            self.sessions += 1
+            self.last_session = session
+
+    def catch_up(self, log_path):
+        # Read only what was appended since the last call
+        try:
+            size = os.path.getsize(log_path)
+        except OSError:
+            return 0
+        if size < self.offset:
+            # Log was truncated or replaced; start over
+            self.__init__()
+        if size == self.offset:
+            return 0
+
+        consumed = 0
+        with open(log_path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        # Leave a partially written trailing line for the next call
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self.consume(json.loads(line))
+                consumed += 1
+            except ValueError:
+                continue
+        self.offset += end
+        return consumed
+
+    def get(self, text):
+        return self.stats.get(text)
+
+    def hardest(self, count=10, min_resolved=5):
+        ranked = [
+            (stats.accuracy, text) for text, stats in self.stats.items()
+            if stats.resolved >= min_resolved
+        ]
+        ranked.sort()
+        return ranked[:count]
+
+    def save(self, path):
+        state = {
+            "offset": self.offset,
+            "sessions": self.sessions,
+            "last_session": self.last_session,
+            "stats": {text: stats.to_dict() for text, stats in self.stats.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        aggregator = cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return aggregator
+        aggregator.offset = state.get("offset", 0)
+        sessions = state.get("sessions", 0)
+        # Older state files kept the list of session ids
+        aggregator.sessions = len(sessions) if isinstance(sessions, list) else sessions
+        aggregator.last_session = state.get("last_session")
+        aggregator.stats = {
+            text: SnippetStats.from_dict(data) for text, data in state.get("stats", {}).items()
+        }
+        return aggregator
+
+
+def main(argv):
+    # Usage: python analytics.py [events.jsonl] [state.json]
+    from settings import ANALYTICS_LOG, ANALYTICS_STATE
+    log_path = argv[1] if len(argv) > 1 else ANALYTICS_LOG
+    state_path = argv[2] if len(argv) > 2 else ANALYTICS_STATE
+
+    aggregator = SnippetAggregator.load(state_path)
+    new_events = aggregator.catch_up(log_path)
+    aggregator.save(state_path)
+
+    print(f"{new_events} new events, {aggregator.sessions} sessions, {len(aggregator.stats)} snippets")
+    print(f"{'snippet':<32} {'kind':<7} {'seen':>6} {'acc':>6} {'react':>7}")
+    for text, stats in sorted(aggregator.stats.items()):
+        accuracy = "-" if stats.accuracy is None else f"{stats.accuracy:.0%}"
+        kind = "correct" if stats.is_correct else "bug"
+        print(f"{text:<32} {kind:<7} {stats.spawns:>6} {accuracy:>6} {stats.reaction_mean:>6.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,228 @@
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+# Single-file asset pack, opened with mmap so startup is one open() and only
+# the assets actually used get paged in.
+#
+#   python assetpack.py build assets -o assets/assets.pack
+#   python assetpack.py list assets/assets.pack
+#
+# Layout:
+#   header  magic (8 bytes), version (u32), index size (u32)
+#   index   UTF-8 JSON: one entry per asset with its name (path relative to
+#           the asset directory, with forward slashes), offset, size, crc32,
+#           and for PCM WAV files the offset, size and format of the samples
+#   blobs   file contents, each aligned to BLOB_ALIGN bytes; blob offsets are
+#           relative to the first aligned byte after the index
+#
+# Asset names are handed around as "pack:<name>" wherever a path is expected
+# (e.g. the font settings), see resources.py.
+
+MAGIC = b"CCAPACK\0"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+BLOB_ALIGN = 16
+PACK_PREFIX = "pack:"
+
+# WAV sample formats as reported by pygame.mixer.get_init(): (audio format,
+# bits) -> size. pygame reports float32 as -32 (the size 32 it is opened with
+# means float); it never opens 32-bit integer output, so int32 WAVs, like any
+# other format, are loaded through pygame.mixer.Sound instead.
+WAV_FORMATS = {(1, 8): 8, (1, 16): -16, (3, 32): -32}
+
+
+def wav_samples(data):
+    # (offset, size, (frequency, format, channels)) of the PCM data in a WAV
+    # file, or None if it is not a plain PCM WAV pygame can take as a buffer
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk, size = struct.unpack_from("<4sI", data, pos)
+        pos += 8
+        if chunk == b"fmt ":
+            audio_format, channels, frequency = struct.unpack_from("<HHI", data, pos)
+            bits = struct.unpack_from("<H", data, pos + 14)[0]
+            fmt = WAV_FORMATS.get((audio_format, bits))
+            if fmt is None:
+                return None
+            fmt = (frequency, fmt, channels)
+        elif chunk == b"data":
+            if fmt is None:
+                return None
+            return pos, min(size, len(data) - pos), fmt
+        pos += size + (size & 1)
+    return None
+
+
+def build_pack(source_dir, out_path, skip=("README.txt",)):
+    # Packs every file under source_dir except the pack itself
+    out_real = os.path.realpath(out_path)
+    files = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs.sort()
+        for filename in sorted(names):
+            path = os.path.join(root, filename)
+            if filename in skip or os.path.realpath(path) == out_real:
+                continue
+            files.append((os.path.relpath(path, source_dir).replace(os.sep, "/"), path))
+
+    blobs = []
+    entries = []
+    for name, path in files:
+        with open(path, "rb") as f:
+            data = f.read()
+        entry = {"name": name, "size": len(data), "crc32": zlib.crc32(data)}
+        pcm = wav_samples(data) if name.lower().endswith(".wav") else None
+        if pcm:
+            entry["pcm"] = [pcm[0], pcm[1]]
+            entry["format"] = list(pcm[2])
+        entries.append(entry)
+        blobs.append(data)
+
+    offset = 0
+    for entry, data in zip(entries, blobs):
+        entry["offset"] = offset
+        offset = align(offset + len(data))
+    index = json.dumps({"entries": entries}, separators=(",", ":")).encode("utf-8")
+    base = align(HEADER.size + len(index))
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        f.write(index)
+        for entry, data in zip(entries, blobs):
+            f.write(b"\0" * (base + entry["offset"] - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, out_path)
+    return entries
+
+
+def align(offset):
+    return (offset + BLOB_ALIGN - 1) // BLOB_ALIGN * BLOB_ALIGN
+
+
+class BlobFile(io.RawIOBase):
+    # Read-only file object over a memoryview, for APIs that want a file
+    def __init__(self, view):
+        self.view = view
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self.view) - self.pos)
+        if size <= 0:
+            return 0
+        buffer[:size] = self.view[self.pos:self.pos + size]
+        self.pos += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.pos = max(0, offset)
+        return self.pos
+
+    def tell(self):
+        return self.pos
+
+
+class AssetPack:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_size = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} asset pack")
+            index = json.loads(bytes(self.map[HEADER.size:HEADER.size + index_size]))
+        except Exception:
+            self.file.close()
+            raise
+        self.base = align(HEADER.size + index_size)
+        self.data = memoryview(self.map)
+        self.entries = {entry["name"]: entry for entry in index["entries"]}
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def names(self):
+        return list(self.entries)
+
+    def view(self, name):
+        # Zero-copy slice of the mapped file
+        entry = self.entries[name]
+        start = self.base + entry["offset"]
+        return self.data[start:start + entry["size"]]
+
+    def open(self, name):
+        return BlobFile(self.view(name))
+
+    def samples(self, name, mixer_format):
+        # PCM samples of a WAV, if they are already in the mixer's format
+        entry = self.entries[name]
+        if "pcm" not in entry or tuple(entry["format"]) != tuple(mixer_format):
+            return None
+        start = self.base + entry["offset"] + entry["pcm"][0]
+        return self.data[start:start + entry["pcm"][1]]
+
+
+_packs = {}
+
+
+def open_pack(path):
+    # Shared AssetPack for path, or None if there is no (valid) pack there.
+    # settings.py and resources.py both ask, the file is opened once.
+    if path not in _packs:
+        try:
+            _packs[path] = AssetPack(path)
+        except (OSError, ValueError, struct.error) as e:
+            if os.path.exists(path):
+                print(f"Ignoring asset pack {path}: {e}")
+            _packs[path] = None
+    return _packs[path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Code Catcher asset packs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="pack a directory of assets")
+    build_parser.add_argument("source", help="asset directory, e.g. assets")
+    build_parser.add_argument("-o", "--out", help="pack file (default: <source>/assets.pack)")
+
+    list_parser = commands.add_parser("list", help="list the contents of a pack")
+    list_parser.add_argument("pack")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        out_path = args.out or os.path.join(args.source, "assets.pack")
+        entries = build_pack(args.source, out_path)
+        total = sum(entry["size"] for entry in entries)
+        print(f"Packed {len(entries)} assets ({total} bytes) into {out_path}")
+    else:
+        pack = AssetPack(args.pack)
+        for entry in pack.entries.values():
+            extra = f"  pcm {entry['format']}" if "pcm" in entry else ""
+            print(f"{entry['offset']:>10} {entry['size']:>10}  {entry['name']}{extra}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import pygame
+from settings import *
+from metrics import metrics
+
+# Texture atlas for the sprites the game generates (card bodies, shine strips,
+# particle circles, button faces, the player body and fixed text labels).
+# Sprites are shelf-packed into a few large pages and drawn as sub-rects of a
+# page, so the software renderer blits from one block of memory and the
+# texture renderer draws many sprites from the same texture.
+#
+# The atlas is built at startup, in-process or in a worker, and cached on disk
+# under a hash of everything that goes into it (sprite keys, the modules that
+# draw them, the font files and the pygame version). Sprite functions look up
+# their key with atlas.get() and fall back to their own caches on a miss.
+
+ATLAS_VERSION = 1
+
+# Modules whose drawing code or settings end up in the atlas
+SOURCE_FILES = ["atlas.py", "renderer.py", "falling_object.py", "player.py", "game.py", "snippets.py", "layout.py", "settings.py"]
+
+
+class Region:
+    # A sprite inside an atlas page; sized like the Surface it replaces
+    __slots__ = ("page", "rect", "_surface")
+
+    def __init__(self, page, rect):
+        self.page = page
+        self.rect = pygame.Rect(rect)
+        self._surface = None
+
+    def get_width(self):
+        return self.rect.width
+
+    def get_height(self):
+        return self.rect.height
+
+    def get_size(self):
+        return self.rect.size
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self.rect.size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def surface(self):
+        # Subsurface sharing the page's pixels, for rotation and surface alpha
+        if self._surface is None:
+            self._surface = self.page.subsurface(self.rect)
+        return self._surface
+
+
+class ShelfPacker:
+    # Shelf packing: rows of sprites of similar height, tallest first
+    def __init__(self, size=ATLAS_PAGE_SIZE, padding=ATLAS_PADDING):
+        self.size = size
+        self.padding = padding
+        self.pages = []  # per page: list of shelves [y, height, next_x]
+
+    def insert(self, width, height):
+        # Returns (page, x, y)
+        width += self.padding
+        height += self.padding
+        if width > self.size or height > self.size:
+            raise ValueError(f"sprite of {width}x{height} does not fit a {self.size}px atlas page")
+        for index, shelves in enumerate(self.pages):
+            spot = self.place(shelves, width, height)
+            if spot:
+                return (index, *spot)
+        self.pages.append([])
+        return (len(self.pages) - 1, *self.place(self.pages[-1], width, height))
+
+    def place(self, shelves, width, height):
+        # Best-fitting open shelf, else a new shelf under the last one
+        best = None
+        for shelf in shelves:
+            if shelf[1] >= height and shelf[2] + width <= self.size:
+                if best is None or shelf[1] < best[1]:
+                    best = shelf
+        if best is None:
+            top = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            if top + height > self.size:
+                return None
+            best = [top, height, 0]
+            shelves.append(best)
+        x = best[2]
+        best[2] += width
+        return x, best[0]
+
+
+def sprite_specs():
+    # (key, factory) for every sprite that goes into the atlas. Keys are the
+    # same ones the sprite functions look up.
+    from falling_object import SNIPPET_TIERS, make_card, make_shine
+    from layout import card_layout
+    from renderer import make_circle, make_button, make_text, CIRCLE_ALPHAS
+    from player import make_body
+    from game import MENU_BUTTONS, GAME_OVER_BUTTONS
+
+    specs = []
+    # One card per snippet, sized by its layout, and a shine strip per card height
+    heights = set()
+    for correct, bugs in SNIPPET_TIERS:
+        for is_correct, texts in ((True, correct), (False, bugs)):
+            for text in texts:
+                key = ('card', text, is_correct)
+                specs.append((key, lambda k=key: make_card(*k[1:])))
+                heights.add(card_layout(text).height)
+    for height in sorted(heights):
+        key = ('shine', height - 4)
+        specs.append((key, lambda k=key: make_shine(*k[1:])))
+
+    radii = [r / 2 for r in range(1, 13)]
+    for color in (GREEN, RED, LIGHT_GREEN, LIGHT_RED, LIGHT_BLUE):
+        for radius in radii:
+            for alpha in CIRCLE_ALPHAS:
+                key = ('circle', radius, tuple(color[:3]), alpha)
+                specs.append((key, lambda k=key: make_circle(*k[1:])))
+
+    for _, _, width, height, label, color, hover_color, text_color, _ in MENU_BUTTONS + GAME_OVER_BUTTONS:
+        for face in (color, hover_color):
+            key = ('button', (width, height), tuple(face[:3]))
+            specs.append((key, lambda k=key: make_button(*k[1:])))
+        key = ('text', GAME_FONT, FONT_MEDIUM, label, tuple(text_color), True)
+        specs.append((key, lambda k=key: make_text(*k[1:])))
+
+    key = ('text', GAME_FONT_MONO, FONT_TINY, "def catch():", tuple(WHITE), True)
+    specs.append((key, lambda k=key: make_text(*k[1:])))
+    key = ('player_body', 120, 30)
+    specs.append((key, lambda k=key: make_body(*k[1:])))
+    return specs
+
+
+def content_hash(specs):
+    digest = hashlib.sha256()
+    digest.update(f"{ATLAS_VERSION} {pygame.version.ver} {ATLAS_PAGE_SIZE} {ATLAS_PADDING}".encode())
+    for key, _ in specs:
+        digest.update(repr(key).encode())
+    from resources import asset_bytes
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.join(here, name) for name in SOURCE_FILES]
+    paths += [path for path in (GAME_FONT, GAME_FONT_BOLD, GAME_FONT_MONO) if path]
+    for path in paths:
+        try:
+            digest.update(asset_bytes(path))
+        except (OSError, KeyError):
+            digest.update(path.encode())
+    return digest.hexdigest()[:16]
+
+
+def pack(specs):
+    # Draws every sprite and packs them; returns (pages, table) where table
+    # maps key -> (page index, x, y, width, height)
+    sprites = [(key, factory()) for key, factory in specs]
+    sprites.sort(key=lambda item: (item[1].get_height(), item[1].get_width()), reverse=True)
+
+    packer = ShelfPacker()
+    table = {}
+    for key, surface in sprites:
+        page, x, y = packer.insert(*surface.get_size())
+        table[key] = (page, x, y, *surface.get_size())
+
+    # Trim each page to the height actually used
+    heights = [shelves[-1][0] + shelves[-1][1] for shelves in packer.pages]
+    pages = [pygame.Surface((ATLAS_PAGE_SIZE, height), pygame.SRCALPHA) for height in heights]
+    for key, surface in sprites:
+        page, x, y, _, _ = table[key]
+        # Regions never overlap, so MAX onto the empty page copies pixels
+        # exactly instead of blending them against transparent black
+        pages[page].blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+    return pages, table
+
+
+def build_worker():
+    # Runs in a worker process: packs the atlas and returns raw pixel data
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    pages, table = pack(sprite_specs())
+    raw = [(page.get_size(), pygame.image.tobytes(page, "RGBA")) for page in pages]
+    return raw, table
+
+
+def as_key(value):
+    # JSON turns tuples into lists; keys need them back as tuples
+    if isinstance(value, list):
+        return tuple(as_key(item) for item in value)
+    return value
+
+
+class Atlas:
+    def __init__(self):
+        self.pages = []
+        self.regions = {}
+        self.digest = None
+        self.pending = None
+        self.executor = None
+
+    def get(self, key):
+        region = self.regions.get(key)
+        if metrics.enabled:
+            if region is None:
+                metrics.cache_miss('atlas')
+            else:
+                metrics.cache_hit('atlas')
+        return region
+
+    @property
+    def ready(self):
+        return bool(self.regions)
+
+    def install(self, pages, table):
+        if pygame.display.get_surface() is not None:
+            pages = [page.convert_alpha() for page in pages]
+        self.pages = pages
+        self.regions = {key: Region(pages[entry[0]], entry[1:]) for key, entry in table.items()}
+
+    def load_or_build(self, mode=ATLAS_MODE, cache_dir=ATLAS_CACHE_DIR):
+        # mode is "sync", "worker" or "off"; returns once the atlas is
+        # installed, except in worker mode where poll() installs it later
+        if mode == "off":
+            return
+        specs = sprite_specs()
+        self.digest = content_hash(specs)
+        self.cache_dir = cache_dir
+        if self.load(cache_dir):
+            return
+        if mode == "worker":
+            context = multiprocessing.get_context("spawn")
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context)
+            self.pending = self.executor.submit(build_worker)
+        else:
+            pages, table = pack(specs)
+            self.install(pages, table)
+            self.save(cache_dir, pages, table)
+
+    def poll(self):
+        # Installs the atlas once the worker has finished; sprites use their
+        # own caches until then
+        if self.pending is None or not self.pending.done():
+            return
+        try:
+            raw, table = self.pending.result()
+        except Exception as e:
+            print(f"Atlas build failed ({e}), drawing sprites individually")
+        else:
+            pages = [pygame.image.frombytes(data, size, "RGBA") for size, data in raw]
+            self.install(pages, table)
+            self.save(self.cache_dir, self.pages, table)
+        self.pending = None
+        self.executor.shutdown(wait=False)
+        self.executor = None
+
+    def path(self, cache_dir, name):
+        return os.path.join(cache_dir, f"atlas-{self.digest}-{name}")
+
+    def load(self, cache_dir):
+        try:
+            with open(self.path(cache_dir, "index.json"), encoding="utf-8") as f:
+                index = json.load(f)
+            pages = [pygame.image.load(self.path(cache_dir, f"{i}.png")) for i in range(index["pages"])]
+        except (OSError, ValueError, KeyError, pygame.error):
+            return False
+        self.install(pages, {as_key(key): tuple(entry) for key, entry in index["sprites"]})
+        return True
+
+    def save(self, cache_dir, pages, table):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for i, page in enumerate(pages):
+                pygame.image.save(page, self.path(cache_dir, f"{i}.png"))
+            # The index is written last, so a complete index means complete pages
+            tmp_path = self.path(cache_dir, "index.json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"pages": len(pages), "sprites": [[key, entry] for key, entry in table.items()]}, f)
+            os.replace(tmp_path, self.path(cache_dir, "index.json"))
+            # Drop atlases built from older sources
+            for name in os.listdir(cache_dir):
+                if name.startswith("atlas-") and not name.startswith(f"atlas-{self.digest}-"):
+                    os.remove(os.path.join(cache_dir, name))
+        except (OSError, pygame.error) as e:
+            print(f"Could not cache the atlas ({e})")
+
+    def clear(self):
+        self.pages = []
+        self.regions = {}
+
+
+# Shared instance used by the sprite functions
+atlas = Atlas()
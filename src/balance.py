@@ -0,0 +1,190 @@
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Monte-Carlo balancing runner. Plays thousands of headless sessions with the
+# autoplay bot across a process pool and reports survival time, level reached
+# and score distributions for each settings profile.
+#
+#   python balance.py --sessions 2000
+#   python balance.py --profile default --profile gentle --profile "hard:max_bugs=5"
+#   python balance.py --profile "default:SPAWN_INTERVAL_MIN=10"
+#
+# A profile is a gameplay profile from config.py (profiles/ or a file path).
+# Lowercase keys override profile fields; UPPERCASE keys override settings.py
+# constants, which are applied in each worker before the game modules are
+# imported, because they star-import settings at import time.
+
+_worker = {}
+
+
+def init_worker(profile, fields, overrides):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+    import settings
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    import pygame
+    from config import load_profile
+    from game import Game
+    from analytics import Analytics
+
+    pygame.init()
+    screen = pygame.display.set_mode((settings.WIDTH, settings.HEIGHT))
+    game = Game(screen, config=load_profile(profile, fields))
+    # Bot sessions must not end up in the classroom analytics
+    game.analytics = Analytics(settings.ANALYTICS_LOG, enabled=False)
+    _worker["game"] = game
+
+
+def run_session(seed, max_frames, reaction_delay, error_rate, render):
+    import random
+    import pygame
+    from bot import BotPolicy
+    from scenes import GameplayScene
+
+    game = _worker["game"]
+    random.seed(seed)
+    game.controller = BotPolicy(reaction_delay=reaction_delay, error_rate=error_rate, seed=seed)
+    game.reset_game()
+    game.start_game()
+    game.set_scene(GameplayScene(game))
+
+    frames = 0
+    while game.state == 'game' and frames < max_frames:
+        game.update()
+        if render:
+            game.draw()
+        frames += 1
+        if frames % 600 == 0:
+            pygame.event.pump()
+
+    return {
+        "frames": frames,
+        "level": game.level,
+        "score": game.score,
+        "caught_bugs": game.caught_bugs,
+        "missed_correct": game.missed_correct,
+        "finished": game.state == 'game_over',
+    }
+
+
+def distribution(values):
+    values = sorted(values)
+    count = len(values)
+
+    def percentile(p):
+        return values[min(count - 1, int(p * count))]
+
+    return {
+        "mean": statistics.fmean(values),
+        "stdev": statistics.pstdev(values),
+        "min": values[0],
+        "p10": percentile(0.1),
+        "p50": percentile(0.5),
+        "p90": percentile(0.9),
+        "max": values[-1],
+    }
+
+
+def summarize(results, fps):
+    levels = {}
+    for result in results:
+        levels[result["level"]] = levels.get(result["level"], 0) + 1
+    return {
+        "sessions": len(results),
+        "survival_seconds": distribution([r["frames"] / fps for r in results]),
+        "level": distribution([r["level"] for r in results]),
+        "score": distribution([r["score"] for r in results]),
+        "level_histogram": dict(sorted(levels.items())),
+        "ended_by_bugs": sum(1 for r in results if r["finished"] and r["caught_bugs"] > r["missed_correct"]),
+        "timed_out": sum(1 for r in results if not r["finished"]),
+    }
+
+
+def run_profile(name, profile, fields, overrides, args):
+    context = multiprocessing.get_context("spawn")
+    seeds = range(args.seed, args.seed + args.sessions)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, mp_context=context,
+                             initializer=init_worker, initargs=(profile, fields, overrides)) as pool:
+        results = list(pool.map(
+            run_session, seeds,
+            [args.max_frames] * args.sessions,
+            [args.reaction_delay] * args.sessions,
+            [args.error_rate] * args.sessions,
+            [args.render] * args.sessions,
+            chunksize=max(1, args.sessions // (args.workers * 8))
+        ))
+    summary = summarize(results, args.fps)
+    summary["profile"] = name
+    summary["overrides"] = {**fields, **overrides}
+    summary["wall_seconds"] = time.perf_counter() - started
+    return summary
+
+
+def parse_profile(spec):
+    # "profile" or "profile:key=value,KEY=VALUE" -> (label, profile, fields, overrides)
+    from config import load_profile
+
+    profile, _, assignments = spec.partition(":")
+    fields = {}
+    overrides = {}
+    for assignment in filter(None, assignments.split(",")):
+        key, _, value = assignment.partition("=")
+        key = key.strip()
+        (overrides if key.isupper() else fields)[key] = json.loads(value)
+    try:
+        # Catches unknown profiles and bad values before starting the workers
+        load_profile(profile, fields)
+    except (OSError, ValueError) as e:
+        raise SystemExit(str(e))
+    return spec, profile, fields, overrides
+
+
+def print_summary(summary):
+    print(f"\n== {summary['profile']} {summary['overrides'] or ''}")
+    print(f"   {summary['sessions']} sessions in {summary['wall_seconds']:.1f}s, "
+          f"{summary['timed_out']} hit the frame limit, {summary['ended_by_bugs']} ended by bugs")
+    for key in ("survival_seconds", "level", "score"):
+        d = summary[key]
+        print(f"   {key:<17} mean {d['mean']:7.1f}  p10 {d['p10']:7.1f}  p50 {d['p50']:7.1f}  "
+              f"p90 {d['p90']:7.1f}  max {d['max']:7.1f}")
+    print(f"   levels reached    {summary['level_histogram']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Balance Code Catcher with autoplay bots")
+    parser.add_argument("--profile", action="append", help="profile name or path, optionally name:key=value,...")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-frames", type=int, default=60 * 60 * 10)
+    parser.add_argument("--reaction-delay", type=int, default=8)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--render", action="store_true", help="also draw every frame (load generation)")
+    parser.add_argument("--json", help="write the summaries to this file")
+    args = parser.parse_args(argv)
+
+    summaries = []
+    for spec in args.profile or ["default"]:
+        summary = run_profile(*parse_profile(spec), args)
+        print_summary(summary)
+        summaries.append(summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
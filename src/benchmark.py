@@ -0,0 +1,382 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+# Benchmarks for the hot paths of the game, run headless with SDL's dummy
+# drivers under realistic loads.
+#
+#   python benchmark.py run --out ../benchmarks/baseline.json
+#   python benchmark.py run --baseline ../benchmarks/baseline.json --threshold 10
+#   python benchmark.py compare ../benchmarks/baseline.json ../benchmarks/latest.json
+#
+# Every result is stored as milliseconds per operation (lower is better), so
+# compare can treat them all the same way. Comparisons use the best of the
+# repeats, which is far less noisy than the median on a busy machine.
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from settings import *
+
+OBJECT_COUNT = 50
+PARTICLE_COUNT = 500
+
+BENCHMARKS = []
+
+
+def benchmark(name, iterations):
+    # Registers a setup function; it returns the callable that gets timed
+    def register(setup):
+        BENCHMARKS.append((name, iterations, setup))
+        return setup
+    return register
+
+
+def make_game():
+    from game import Game
+    from analytics import Analytics
+    from scenes import GameplayScene
+
+    game = Game(pygame.display.get_surface())
+    game.analytics = Analytics(ANALYTICS_LOG, enabled=False)
+    game.reset_game()
+    game.start_game()
+    game.set_scene(GameplayScene(game))
+    return game
+
+
+def make_objects(count=OBJECT_COUNT):
+    from falling_object import FallingObject
+
+    objects = []
+    for i in range(count):
+        obj = FallingObject(1 + i % 6)
+        obj.rect.y = random.randint(0, HEIGHT - obj.height)
+        objects.append(obj)
+    return objects
+
+
+def make_particles(count=PARTICLE_COUNT, life=30):
+    particles = []
+    for _ in range(count):
+        particles.append({
+            'x': random.uniform(0, WIDTH),
+            'y': random.uniform(0, HEIGHT),
+            'vx': random.uniform(-2, 2),
+            'vy': random.uniform(-3, 1),
+            'radius': random.randint(2, 6),
+            'color': random.choice([GREEN, RED, LIGHT_RED]),
+            'life': life
+        })
+    return particles
+
+
+@benchmark("falling_object.update", iterations=200)
+def bench_object_update():
+    objects = make_objects()
+    quality = QUALITY_TIERS[0]
+
+    def run():
+        for obj in objects:
+            obj.update(quality)
+            if obj.rect.top > HEIGHT:
+                obj.rect.y = -obj.height
+    return run
+
+
+@benchmark("falling_object.draw", iterations=20)
+def bench_object_draw():
+    from renderer import SurfaceRenderer
+
+    objects = make_objects()
+    renderer = SurfaceRenderer(pygame.display.get_surface())
+    quality = QUALITY_TIERS[0]
+    for obj in objects:
+        for _ in range(30):
+            obj.update(quality)
+
+    def run():
+        for obj in objects:
+            obj.draw(renderer, quality)
+    return run
+
+
+@benchmark("player.update", iterations=20000)
+def bench_player_update():
+    from player import Player
+    from input_events import ActionState, MOVE_LEFT, MOVE_RIGHT
+
+    player = Player()
+    left = ActionState(frozenset([MOVE_LEFT]), frozenset(), None)
+    right = ActionState(frozenset([MOVE_RIGHT]), frozenset(), None)
+    state = {'frame': 0}
+
+    def run():
+        state['frame'] += 1
+        player.update(left if (state['frame'] // 40) % 2 else right)
+    return run
+
+
+@benchmark("input.latch", iterations=20000)
+def bench_input_latch():
+    # A tap buffered and latched for the next tick, as every frame with input does
+    from input_events import InputSystem, MOVE_LEFT
+
+    inputs = InputSystem()
+
+    def run():
+        inputs.push(MOVE_LEFT, True)
+        inputs.push(MOVE_LEFT, False)
+        inputs.latch()
+    return run
+
+
+@benchmark("difficulty.tick", iterations=20000)
+def bench_difficulty_tick():
+    # The per-frame spawn parameters, read from the profile's level tables
+    from difficulty import DifficultyEngine
+
+    difficulty = DifficultyEngine()
+    for i in range(ADAPT_WINDOW):
+        difficulty.record_outcome(i % 4 != 0)
+    levels = [1 + i % MAX_LEVELS for i in range(100)]
+
+    def run():
+        for level in levels:
+            difficulty.tick(level)
+    return run
+
+
+@benchmark("player.draw", iterations=500)
+def bench_player_draw():
+    from player import Player
+    from input_events import ActionState, MOVE_RIGHT
+    from renderer import SurfaceRenderer
+
+    player = Player()
+    for _ in range(10):
+        player.update(ActionState(frozenset([MOVE_RIGHT]), frozenset(), None))
+    renderer = SurfaceRenderer(pygame.display.get_surface())
+
+    def run():
+        player.draw(renderer)
+    return run
+
+
+@benchmark("game.update_particles", iterations=100)
+def bench_update_particles():
+    game = make_game()
+    # Long-lived particles so the load stays at PARTICLE_COUNT
+    game.particles = make_particles(life=10 ** 6)
+
+    def run():
+        game.update_particles()
+    return run
+
+
+@benchmark("game.draw_particles", iterations=20)
+def bench_draw_particles():
+    game = make_game()
+    game.particles = make_particles()
+
+    def run():
+        game.draw_particles()
+    return run
+
+
+@benchmark("game.draw_game", iterations=20)
+def bench_draw_game():
+    game = make_game()
+    game.objects = make_objects()
+    game.particles = make_particles()
+
+    def run():
+        game.draw_game()
+    return run
+
+
+@benchmark("game.create_background", iterations=5)
+def bench_create_background():
+    game = make_game()
+
+    def run():
+        game.create_background()
+    return run
+
+
+@benchmark("atlas.pack", iterations=1)
+def bench_atlas_pack():
+    from atlas import pack, sprite_specs
+
+    specs = sprite_specs()
+
+    def run():
+        pack(specs)
+    return run
+
+
+@benchmark("end_to_end.frame", iterations=600)
+def bench_end_to_end():
+    # Full frames (update, draw, flip) of bot-driven gameplay
+    from bot import BotPolicy
+    from scenes import GameplayScene
+
+    game = make_game()
+    game.controller = BotPolicy(seed=0)
+
+    def run():
+        if game.state != 'game':
+            game.reset_game()
+            game.start_game()
+            game.set_scene(GameplayScene(game))
+        game.update()
+        game.draw()
+    return run
+
+
+@benchmark("end_to_end.pipelined", iterations=600)
+def bench_end_to_end_pipelined():
+    # Same frames with drawing on the render thread (main.py --pipeline)
+    from bot import BotPolicy
+    from scenes import GameplayScene
+    from pipeline import RenderPipeline
+
+    game = make_game()
+    game.controller = BotPolicy(seed=0)
+    pipeline = RenderPipeline(game)
+
+    def run():
+        if game.state != 'game':
+            game.reset_game()
+            game.start_game()
+            game.set_scene(GameplayScene(game))
+        game.update()
+        pipeline.draw()
+    return run
+
+
+def time_benchmark(iterations, setup, repeat):
+    random.seed(0)
+    run = setup()
+    run()  # warm up caches and lazy imports
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        samples.append((time.perf_counter() - started) * 1000 / iterations)
+    return {
+        "ms_per_op": statistics.median(samples),
+        "min_ms": min(samples),
+        "iterations": iterations,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(selected=None, repeat=5, use_atlas=False):
+    from atlas import atlas
+
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    if use_atlas:
+        atlas.load_or_build("sync")
+    results = {}
+    for name, iterations, setup in BENCHMARKS:
+        if selected and not any(part in name for part in selected):
+            continue
+        results[name] = time_benchmark(iterations, setup, repeat)
+        extra = ""
+        if name.startswith("end_to_end."):
+            extra = f"  ({1000 / results[name]['ms_per_op']:.0f} fps)"
+        print(f"{name:<26} {results[name]['ms_per_op']:9.4f} ms/op{extra}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "atlas": use_atlas,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    # Returns the names that got slower by more than threshold percent
+    regressions = []
+    print(f"{'benchmark':<26} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<26} {'-':>10} {result['min_ms']:10.4f}      new")
+            continue
+        change = (result["min_ms"] - base["min_ms"]) / base["min_ms"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<26} {base['min_ms']:10.4f} {result['min_ms']:10.4f} {change:+7.1f}%{flag}")
+    return regressions
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Code Catcher benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("names", nargs="*", help="only run benchmarks containing these")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--atlas", action="store_true", help="draw from the sprite atlas")
+    run_parser.add_argument("--out", help="store results as JSON")
+    run_parser.add_argument("--baseline", help="compare against this JSON baseline")
+    run_parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown in percent")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown in percent")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        current = run_benchmarks(args.names, args.repeat, args.atlas)
+        if args.out:
+            save(args.out, current)
+        if not args.baseline:
+            return 0
+        baseline = load(args.baseline)
+    else:
+        baseline = load(args.baseline)
+        current = load(args.current)
+
+    print()
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+from settings import *
+
+# Classroom mode: head-to-head play on a LAN. The teacher runs a session
+# server, every student's game connects to it, plays the same seeded stream
+# of cards and sees everyone's scores live.
+#
+#   python classroom.py serve --port 5050             # teacher
+#   python main.py --classroom teacher-pc:5050 --name Ada
+#   python classroom.py loadtest --clients 40         # bandwidth check
+#
+# Each game still simulates itself. Card n of a session is built from its own
+# Random seeded with "<seed>:<n>", so every student gets the same cards in the
+# same order however they play. Multiplayer games switch adaptive difficulty
+# off and spawn on a fixed schedule of game frames, with speed and tier
+# stepping up every CLASSROOM_LEVEL_SECONDS, so card n also appears at the
+# same moment of everyone's game. Clients report their score, level, misses,
+# bugs and game-over flag when they change; the server keeps the latest
+# report per player.
+#
+# The protocol is newline-delimited JSON over TCP. The server broadcasts at a
+# fixed tick rate, and each tick only carries the fields that changed since the
+# previous one (plus events such as level-ups), so an idle classroom costs
+# nothing and a busy one a few bytes per change. All clients get the same
+# bytes, so a tick is encoded once. Clients that stop reading are dropped
+# once CLASSROOM_WRITE_LIMIT bytes are queued for them.
+#
+# Messages, client -> server:
+#   {"type": "join", "name": "Ada"}
+#   {"type": "state", "s": score, "l": level, "m": missed, "b": bugs, "o": 0|1}
+# server -> client:
+#   {"type": "welcome", "id": "3", "seed": 1234, "tick_rate": 10, "players": {...}}
+#   {"type": "tick", "t": 57, "p": {"3": {"s": 4}}, "gone": ["2"], "e": [["3", "level", 2]]}
+#   {"type": "error", "message": "..."}
+#
+# On the student's side ClassroomClient runs the connection on its own thread
+# with its own event loop; the game loop only swaps in its latest state and
+# reads a copy of the scoreboard.
+
+PLAYER_FIELDS = ("s", "l", "m", "b", "o")
+NAME_LIMIT = 20
+JOIN_TIMEOUT = 5.0
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode(line):
+    try:
+        message = json.loads(line)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def spawn_rng(seed, index):
+    # The Random that builds card number index of a session
+    return random.Random(f"{seed}:{index}")
+
+
+class ClassroomServer:
+    def __init__(self, seed=None, tick_rate=CLASSROOM_TICK_RATE, max_clients=CLASSROOM_MAX_CLIENTS):
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)
+        self.tick_rate = tick_rate
+        self.max_clients = max_clients
+        self.players = {}   # id -> latest fields, including the name "n"
+        self.sent = {}      # id -> fields as of the last broadcast
+        self.events = []    # events since the last broadcast
+        self.writers = {}   # id -> StreamWriter
+        self.handlers = set()
+        self.next_id = 1
+        self.tick = 0
+        self.server = None
+        self.ticker = None
+        self.port = None
+        # full_bytes is what sending every player's full state each tick
+        # would have cost, for comparison in the load test
+        self.stats = {"ticks": 0, "broadcasts": 0, "bytes_in": 0, "bytes_out": 0, "full_bytes": 0}
+
+    async def start(self, host="0.0.0.0", port=CLASSROOM_PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ticker = asyncio.create_task(self.run_ticks())
+        return self.port
+
+    async def close(self):
+        if self.ticker:
+            self.ticker.cancel()
+        if self.server:
+            self.server.close()
+        for writer in list(self.writers.values()):
+            writer.close()
+        # Closed connections end their handlers; let them clean up
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        if self.server:
+            await self.server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        player_id = None
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        try:
+            if len(self.writers) >= self.max_clients:
+                writer.write(encode({"type": "error", "message": "classroom is full"}))
+                return
+            hello = decode(await asyncio.wait_for(reader.readline(), JOIN_TIMEOUT))
+            if not hello or hello.get("type") != "join":
+                return
+            player_id = str(self.next_id)
+            self.next_id += 1
+            name = str(hello.get("name") or f"Player {player_id}")[:NAME_LIMIT]
+
+            # The welcome carries the state as of the last broadcast, which the
+            # following ticks are deltas against. The new player shows up in
+            # the next tick like any other change.
+            writer.write(encode({
+                "type": "welcome", "id": player_id, "seed": self.seed,
+                "tick_rate": self.tick_rate, "players": self.sent
+            }))
+            self.writers[player_id] = writer
+            self.players[player_id] = {"n": name, "s": 0, "l": 1, "m": 0, "b": 0, "o": 0}
+            self.events.append([player_id, "join"])
+
+            async for line in reader:
+                self.stats["bytes_in"] += len(line)
+                message = decode(line)
+                if message and message.get("type") == "state":
+                    self.update_player(player_id, message)
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            if player_id in self.writers:
+                del self.writers[player_id]
+                del self.players[player_id]
+                self.events.append([player_id, "leave"])
+            writer.close()
+            self.handlers.discard(task)
+
+    def update_player(self, player_id, message):
+        player = self.players[player_id]
+        old_level, old_score, was_over = player["l"], player["s"], player["o"]
+        for field in PLAYER_FIELDS:
+            value = message.get(field)
+            if isinstance(value, int):
+                player[field] = value
+        if player["s"] < old_score or (was_over and not player["o"]):
+            self.events.append([player_id, "restart"])
+        elif player["l"] > old_level:
+            self.events.append([player_id, "level", player["l"]])
+        if player["o"] and not was_over:
+            self.events.append([player_id, "over", player["s"]])
+
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_time = loop.time()
+        while True:
+            # Fixed rate without drift: sleep until the next slot, not for a period
+            next_time += interval
+            await asyncio.sleep(max(0, next_time - loop.time()))
+            self.broadcast()
+
+    def broadcast(self):
+        self.tick += 1
+        self.stats["ticks"] += 1
+        delta = {}
+        for player_id, player in self.players.items():
+            old = self.sent.get(player_id, {})
+            changed = {key: value for key, value in player.items() if old.get(key) != value}
+            if changed:
+                delta[player_id] = changed
+                self.sent[player_id] = dict(player)
+        gone = [player_id for player_id in self.sent if player_id not in self.players]
+        for player_id in gone:
+            del self.sent[player_id]
+
+        if self.writers:
+            full = encode({"type": "tick", "t": self.tick, "p": self.sent})
+            self.stats["full_bytes"] += len(full) * len(self.writers)
+        if not (delta or gone or self.events):
+            return
+
+        message = {"type": "tick", "t": self.tick}
+        if delta:
+            message["p"] = delta
+        if gone:
+            message["gone"] = gone
+        if self.events:
+            message["e"] = self.events
+            self.events = []
+        payload = encode(message)
+        self.stats["broadcasts"] += 1
+        for writer in list(self.writers.values()):
+            if writer.transport.get_write_buffer_size() > CLASSROOM_WRITE_LIMIT:
+                # Not reading; closing ends its handler, which removes it
+                writer.close()
+                continue
+            writer.write(payload)
+            self.stats["bytes_out"] += len(payload)
+
+
+class ClassroomClient:
+    def __init__(self, host, port=CLASSROOM_PORT, name=None):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.id = None
+        self.seed = None
+        self.tick_rate = CLASSROOM_TICK_RATE
+        self.players = {}
+        self.events = deque(maxlen=20)
+        self.lock = threading.Lock()
+        self.latest = None    # newest local state, swapped in by the game loop
+        self.connected = False
+        self.error = None
+        self.loop = None
+        self.stop = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="classroom", daemon=True)
+
+    def start(self, timeout=JOIN_TIMEOUT):
+        # Connects and joins; raises ConnectionError if that fails
+        self.thread.start()
+        if not self.ready.wait(timeout):
+            self.close()
+            raise ConnectionError(f"no answer from {self.host}:{self.port}")
+        if self.error:
+            raise ConnectionError(f"cannot join {self.host}:{self.port}: {self.error}")
+        return self
+
+    def run(self):
+        try:
+            asyncio.run(self.session())
+        except Exception as e:
+            self.error = e
+        finally:
+            self.connected = False
+            self.ready.set()
+
+    async def session(self):
+        self.loop = asyncio.get_running_loop()
+        self.stop = asyncio.Event()
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(encode({"type": "join", "name": self.name}))
+            welcome = decode(await asyncio.wait_for(reader.readline(), JOIN_TIMEOUT))
+            if not welcome or welcome.get("type") != "welcome":
+                raise ConnectionError((welcome or {}).get("message", "bad welcome"))
+            self.id = welcome["id"]
+            self.seed = welcome["seed"]
+            self.tick_rate = welcome["tick_rate"]
+            with self.lock:
+                self.players = {player_id: dict(fields) for player_id, fields in welcome["players"].items()}
+            self.connected = True
+            self.ready.set()
+
+            tasks = [asyncio.create_task(coro) for coro in
+                     (self.receive(reader), self.send_states(writer), self.stop.wait())]
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
+        finally:
+            writer.close()
+
+    async def receive(self, reader):
+        async for line in reader:
+            message = decode(line)
+            if not message or message.get("type") != "tick":
+                continue
+            with self.lock:
+                for player_id, changed in message.get("p", {}).items():
+                    self.players.setdefault(player_id, {}).update(changed)
+                for player_id in message.get("gone", ()):
+                    self.players.pop(player_id, None)
+                self.events.extend(message.get("e", ()))
+
+    async def send_states(self, writer):
+        # At most one report per tick, and only when something changed
+        sent = None
+        while True:
+            state = self.latest
+            if state is not None and state != sent:
+                writer.write(encode(dict(zip(("type",) + PLAYER_FIELDS, ("state",) + state))))
+                await writer.drain()
+                sent = state
+            await asyncio.sleep(1 / self.tick_rate)
+
+    def report(self, game):
+        # Called by the game loop; a tuple swap, no I/O
+        self.latest = (game.score, game.level, game.missed_correct, game.caught_bugs, int(game.game_over))
+
+    def spawn_rng(self, index):
+        return spawn_rng(self.seed, index)
+
+    def scoreboard(self, rows=CLASSROOM_SCOREBOARD_ROWS):
+        # ((name, score, level, game over, is us), ...), best first
+        with self.lock:
+            entries = [(fields.get("n", "?"), fields.get("s", 0), fields.get("l", 1), bool(fields.get("o")),
+                        player_id == self.id) for player_id, fields in self.players.items()]
+        entries.sort(key=lambda entry: (-entry[1], entry[0]))
+        return tuple(entries[:rows])
+
+    def close(self):
+        if self.loop and self.stop and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.stop.set)
+        if self.thread.is_alive():
+            self.thread.join(1)
+
+
+async def simulated_client(host, port, index, duration, counters):
+    # A student as the server sees one: catches a card now and then, reports
+    # at most once per tick, reads every broadcast
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode({"type": "join", "name": f"Student {index + 1}"}))
+    welcome = decode(await reader.readline())
+    tick_rate = welcome["tick_rate"]
+    rng = random.Random(index)
+    counters["down"] += len(encode(welcome))
+
+    async def read():
+        async for line in reader:
+            counters["down"] += len(line)
+
+    reading = asyncio.create_task(read())
+    score, level, missed, bugs = 0, 1, 0, 0
+    sent = None
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        # Roughly one card decided per second per student
+        roll = rng.random()
+        if roll < 0.07:
+            score += 1
+            level = 1 + score // 10
+        elif roll < 0.09:
+            missed += 1
+        elif roll < 0.10:
+            bugs += 1
+        state = (score, level, missed, bugs, 0)
+        if state != sent:
+            payload = encode(dict(zip(("type",) + PLAYER_FIELDS, ("state",) + state)))
+            writer.write(payload)
+            counters["up"] += len(payload)
+            await writer.drain()
+            sent = state
+        await asyncio.sleep(1 / tick_rate)
+    reading.cancel()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load_test(clients, duration, tick_rate):
+    server = ClassroomServer(seed=1, tick_rate=tick_rate, max_clients=clients)
+    port = await server.start("127.0.0.1", 0)
+    counters = {"down": 0, "up": 0}
+    started = time.monotonic()
+    await asyncio.gather(*(simulated_client("127.0.0.1", port, i, duration, counters) for i in range(clients)))
+    elapsed = time.monotonic() - started
+    await server.close()
+    return {
+        "clients": clients,
+        "seconds": round(elapsed, 2),
+        "ticks": server.stats["ticks"],
+        "broadcasts": server.stats["broadcasts"],
+        "down_bytes_per_client_s": round(counters["down"] / clients / elapsed, 1),
+        "up_bytes_per_client_s": round(counters["up"] / clients / elapsed, 1),
+        "full_state_bytes_per_client_s": round(server.stats["full_bytes"] / clients / elapsed, 1),
+    }
+
+
+async def serve(host, port, seed, tick_rate):
+    server = ClassroomServer(seed=seed, tick_rate=tick_rate)
+    port = await server.start(host, port)
+    print(f"Classroom server on {host}:{port}, seed {server.seed}, {tick_rate} ticks/s")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Code Catcher classroom server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run a classroom session server")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=CLASSROOM_PORT)
+    serve_parser.add_argument("--seed", type=int, help="card stream seed (random by default)")
+    serve_parser.add_argument("--tick-rate", type=int, default=CLASSROOM_TICK_RATE)
+
+    load_parser = commands.add_parser("loadtest", help="measure bandwidth with simulated clients")
+    load_parser.add_argument("--clients", type=int, default=40)
+    load_parser.add_argument("--seconds", type=float, default=10)
+    load_parser.add_argument("--tick-rate", type=int, default=CLASSROOM_TICK_RATE)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.seed, args.tick_rate))
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(load_test(args.clients, args.seconds, args.tick_rate))
+        for key, value in result.items():
+            print(f"{key:<32} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
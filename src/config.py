@@ -0,0 +1,178 @@
+import json
+import os
+from collections import namedtuple
+from settings import *
+from falling_object import level_tier
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON profiles only
+    tomllib = None
+
+# Gameplay profiles (main.py --profile NAME). A profile is a TOML or JSON file
+# in PROFILE_DIR (or any path) that overrides some of the fields below; the
+# defaults come from settings.py. Loading validates every value and
+# precomputes the per-level tables the hot loop reads, so a tick looks up its
+# spawn interval, fall speed, bug ratio, snippet tier and particle budget by
+# level instead of evaluating the formulas. Config is immutable; build
+# variants with load_profile(..., overrides) rather than _replace, which would
+# leave the tables stale.
+#
+#   python main.py --profile kiosk-lowend
+#   python main.py --profile path/to/custom.toml
+
+# Fields a profile may set, with their defaults
+FIELDS = {
+    "difficulty": DEFAULT_DIFFICULTY,
+    "max_levels": MAX_LEVELS,
+    "lives": LIVES,
+    "max_bugs": MAX_BUGS,
+    "points_per_level": POINTS_PER_LEVEL,
+    "spawn_interval_base": SPAWN_INTERVAL_BASE,
+    "spawn_interval_step": SPAWN_INTERVAL_STEP,
+    "spawn_interval_min": SPAWN_INTERVAL_MIN,
+    "fall_speed_base": FALL_SPEED_BASE,
+    "fall_speed_step": FALL_SPEED_STEP,
+    "fall_speed_spread": FALL_SPEED_SPREAD,
+    "bug_ratio": BUG_RATIO,
+    "bug_ratio_step": BUG_RATIO_STEP,
+    "bug_ratio_min": BUG_RATIO_MIN,
+    "bug_ratio_max": BUG_RATIO_MAX,
+    "adaptive": ADAPTIVE_DIFFICULTY,
+    "object_budget": OBJECT_BUDGET,
+    "particle_budget": PARTICLE_BUDGET,
+    "particle_budget_step": PARTICLE_BUDGET_STEP,
+    "quality_start": QUALITY_START,
+    "quality_auto": QUALITY_AUTO,
+    "sound_enabled": SOUND_ENABLED,
+    "music_volume": MUSIC_VOLUME,
+    "sfx_volume": SFX_VOLUME,
+}
+
+# Per-level tables, index level - 1:
+#   spawn_frames      spawn interval before adaptive scaling and the minimum
+#   fall_speeds       base fall speed before adaptive scaling
+#   bug_ratios        bug ratio before adaptive scaling and clamping
+#   tiers             snippet tier before adaptive adjustment
+#   particle_budgets  live particle cap (the quality tier's cap also applies)
+TABLES = ("spawn_frames", "fall_speeds", "bug_ratios", "tiers", "particle_budgets")
+
+
+class Config(namedtuple('Config', ("name",) + tuple(FIELDS) + TABLES)):
+    __slots__ = ()
+
+    def level_index(self, level):
+        # Levels past max_levels play like the last one
+        return min(max(level, 1), self.max_levels) - 1
+
+
+# Counts; the other numeric fields also take floats
+INTEGER_FIELDS = ("max_levels", "lives", "max_bugs", "points_per_level", "object_budget",
+                  "particle_budget", "particle_budget_step", "quality_start")
+
+
+def check(name, value):
+    # Returns value if it fits the field, else raises ValueError
+    default = FIELDS[name]
+    if isinstance(default, bool):
+        kind, ok = "boolean", isinstance(value, bool)
+    elif name in INTEGER_FIELDS:
+        kind, ok = "whole number", isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(default, (int, float)):
+        kind, ok = "number", isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        kind, ok = "string", isinstance(value, str)
+    if not ok:
+        raise ValueError(f"{name} must be a {kind}, not {value!r}")
+    return value
+
+
+def validate(values):
+    for name in ("max_levels", "lives", "max_bugs", "points_per_level", "object_budget", "spawn_interval_min"):
+        if values[name] < 1:
+            raise ValueError(f"{name} must be at least 1")
+    for name in ("bug_ratio", "bug_ratio_min", "bug_ratio_max", "music_volume", "sfx_volume"):
+        if not 0 <= values[name] <= 1:
+            raise ValueError(f"{name} must be between 0 and 1")
+    if values["bug_ratio_min"] > values["bug_ratio_max"]:
+        raise ValueError("bug_ratio_min is above bug_ratio_max")
+    if values["difficulty"] not in DIFFICULTY_MULTIPLIERS:
+        raise ValueError(f"difficulty must be one of {', '.join(DIFFICULTY_MULTIPLIERS)}")
+    if not 0 <= values["quality_start"] < len(QUALITY_TIERS):
+        raise ValueError(f"quality_start must be below {len(QUALITY_TIERS)}")
+    for name in ("particle_budget", "particle_budget_step", "spawn_interval_step",
+                 "fall_speed_step", "fall_speed_spread"):
+        if values[name] < 0:
+            raise ValueError(f"{name} must not be negative")
+    if values["fall_speed_base"] <= 0:
+        raise ValueError("fall_speed_base must be positive")
+
+
+def build(name, values):
+    multiplier = DIFFICULTY_MULTIPLIERS[values["difficulty"]]
+    levels = range(1, values["max_levels"] + 1)
+    tables = {
+        "spawn_frames": tuple(
+            (values["spawn_interval_base"] - level * values["spawn_interval_step"]) / multiplier
+            for level in levels),
+        "fall_speeds": tuple(
+            (values["fall_speed_base"] + level * values["fall_speed_step"]) * multiplier
+            for level in levels),
+        "bug_ratios": tuple(
+            values["bug_ratio"] + (level - 1) * values["bug_ratio_step"] for level in levels),
+        "tiers": tuple(level_tier(level) for level in levels),
+        "particle_budgets": tuple(
+            max(0, values["particle_budget"] - (level - 1) * values["particle_budget_step"])
+            for level in levels),
+    }
+    return Config(name=name, **values, **tables)
+
+
+def read_profile(path):
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError(f"{path}: TOML profiles need Python 3.11, use JSON")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: a profile is a table of settings")
+    return data
+
+
+def find_profile(name):
+    # Path of a profile given by name or path, or None for the defaults
+    if name in (None, "", "default"):
+        return None
+    if os.path.exists(name):
+        return name
+    for extension in (".toml", ".json"):
+        path = os.path.join(PROFILE_DIR, name + extension)
+        if os.path.exists(path):
+            return path
+    raise ValueError(f"Unknown profile '{name}', known: {', '.join(profile_names())}")
+
+
+def profile_names():
+    names = ["default"]
+    if os.path.isdir(PROFILE_DIR):
+        names += sorted(os.path.splitext(f)[0] for f in os.listdir(PROFILE_DIR) if f.endswith((".toml", ".json")))
+    return names
+
+
+def load_profile(name=None, overrides=None):
+    # Validated Config for a profile name or path, with optional overrides
+    path = find_profile(name)
+    data = read_profile(path) if path else {}
+    data.update(overrides or {})
+    unknown = sorted(set(data) - set(FIELDS))
+    if unknown:
+        raise ValueError(f"{path or 'overrides'}: unknown settings {', '.join(unknown)}")
+    values = dict(FIELDS)
+    for key, value in data.items():
+        values[key] = check(key, value)
+    validate(values)
+    label = os.path.splitext(os.path.basename(name))[0] if path else "default"
+    return build(label, values)
@@ -0,0 +1,110 @@
+from settings import *
+from falling_object import SNIPPET_TIERS
+from config import load_profile
+
+# Adaptive difficulty: recent catch accuracy and reaction time steer a single
+# "pressure" value in [-1, 1], which scales spawn rate, fall speed, bug ratio
+# and snippet tier on top of the per-level baseline. The baseline comes from
+# the profile's precomputed level tables (config.py), so all per-tick work is
+# O(1) lookups.
+
+
+class RollingWindow:
+    # Fixed-size ring buffer with a running sum, so mean() is O(1)
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        if self.count == self.size:
+            self.total -= self.values[self.index]
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.index = (self.index + 1) % self.size
+
+    def mean(self, default=0.0):
+        if self.count == 0:
+            return default
+        return self.total / self.count
+
+    def clear(self):
+        self.values = [0.0] * self.size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+
+def clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+class DifficultyEngine:
+    def __init__(self, config=None):
+        config = config or load_profile()
+        self.config = config
+        self.adaptive = config.adaptive
+        self.object_budget = config.object_budget
+        # Copied out of the namedtuple; tick reads them every frame
+        self.last_level = config.max_levels
+        self.spawn_frames = config.spawn_frames
+        self.spawn_min = config.spawn_interval_min
+        self.fall_speeds = config.fall_speeds
+        self.bug_ratios = config.bug_ratios
+        self.bug_ratio_range = (config.bug_ratio_min, config.bug_ratio_max)
+        self.tiers = config.tiers
+        self.top_tier = len(SNIPPET_TIERS) - 1
+        self.accuracy = RollingWindow(ADAPT_WINDOW)
+        self.reaction = RollingWindow(ADAPT_WINDOW)
+        self.reset()
+
+    def reset(self):
+        self.accuracy.clear()
+        self.reaction.clear()
+        self.pressure = 0.0
+        self.tick(1)
+
+    def record_outcome(self, right):
+        self.accuracy.add(1.0 if right else 0.0)
+
+    def record_reaction(self, frames):
+        self.reaction.add(frames)
+
+    def target_pressure(self):
+        if not self.adaptive or self.accuracy.count < ADAPT_MIN_SAMPLES:
+            return 0.0
+
+        # Positive when the player is doing better than we aim for
+        goal = (self.accuracy.mean() - TARGET_ACCURACY) * 4
+        if self.reaction.count:
+            reaction = self.reaction.mean()
+            if reaction < REACTION_FAST:
+                goal += 0.25
+            elif reaction > REACTION_SLOW:
+                goal -= 0.25
+        return clamp(goal, -1.0, 1.0)
+
+    def tick(self, level):
+        self.pressure += (self.target_pressure() - self.pressure) * ADAPT_RATE
+        pressure = self.pressure
+        scale = 1 + 0.25 * pressure
+        # Levels past the profile's last one play like it
+        i = min(max(level, 1), self.last_level) - 1
+
+        self.spawn_interval = max(self.spawn_min, self.spawn_frames[i] / scale)
+        self.base_speed = self.fall_speeds[i] * scale
+        self.bug_ratio = clamp(self.bug_ratios[i] + 0.15 * pressure, *self.bug_ratio_range)
+
+        tier = self.tiers[i]
+        if pressure > 0.6:
+            tier += 1
+        elif pressure < -0.6:
+            tier -= 1
+        self.tier = clamp(tier, 0, self.top_tier)
+
+    def can_spawn(self, active_objects):
+        return active_objects < self.object_budget
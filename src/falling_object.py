@@ -1,102 +1,91 @@
 import pygame
 import random
 import math
+from collections import namedtuple
 from settings import *
+from renderer import circle_sprite
+from atlas import atlas
+from layout import card_layout, card_font
+from snippets import load_tiers
+
+# Verified snippets by tier: (correct, bugs), built by snippets.py
+SNIPPET_TIERS = load_tiers()
+
+def level_tier(level):
+    # Snippet tier for a level before any adaptive adjustment
+    if level <= 2:
+        return 0
+    elif level <= 4:
+        return 1
+    return 2
 
 class FallingObject:
-    def __init__(self, level):
-        self.width = random.randint(120, 220)
-        self.height = 50
-        self.rect = pygame.Rect(
-            random.randint(0, WIDTH - self.width),
-            -self.height,
-            self.width,
-            self.height
-        )
+    def __init__(self, level, base_speed=None, bug_ratio=BUG_RATIO, tier=None, rng=None,
+                 speed_spread=FALL_SPEED_SPREAD):
+        # rng: a random.Random for a reproducible card, e.g. in classroom mode
+        if rng is None:
+            rng = random
         
-        # Varied speed based on level
-        base_speed = 2 + (level * 0.5)
-        self.speed = random.uniform(base_speed, base_speed + 3)
+        # Varied speed based on level, unless the difficulty engine chose one
+        if base_speed is None:
+            base_speed = FALL_SPEED_BASE + (level * FALL_SPEED_STEP)
+        self.speed = rng.uniform(base_speed, base_speed + speed_spread)
         
         # Random horizontal movement
-        self.has_horizontal_movement = random.random() < 0.3
+        self.has_horizontal_movement = rng.random() < 0.3
         if self.has_horizontal_movement:
-            self.h_speed = random.choice([-1, 1]) * random.uniform(0.5, 1.5)
+            self.h_speed = rng.choice([-1, 1]) * rng.uniform(0.5, 1.5)
             self.h_distance = 0
-            self.max_h_distance = random.randint(30, 80)
+            self.max_h_distance = rng.randint(30, 80)
         
         # Determine if this is correct code or a bug
-        self.is_correct = random.choice([True, False])
-        
-        # Code snippets by level
-        if level <= 2:
-            self.correct_snippets = [
-                "print('Hello')",
-                "x = 5 + 3",
-                "def func():",
-                "for i in range(10):",
-                "if x > 0:"
-            ]
-            self.bug_snippets = [
-                "pront('Hello')",
-                "x = 5 + ",
-                "def func()",
-                "for i in rage(10):",
-                "if x > 0"
-            ]
-        elif level <= 4:
-            self.correct_snippets = [
-                "while True: break",
-                "try: except ValueError:",
-                "class MyClass(object):",
-                "with open('file.txt') as f:",
-                "import random"
-            ]
-            self.bug_snippets = [
-                "while True, break",
-                "try: except ValueError",
-                "class MyClass(object)",
-                "with open('file.txt') as f",
-                "import randum"
-            ]
-        else:
-            self.correct_snippets = [
-                "lambda x: x * 2",
-                "[x for x in range(10)]",
-                "async def func(): await x",
-                "assert condition, 'message'",
-                "yield from generator()"
-            ]
-            self.bug_snippets = [
-                "lambda x: x *",
-                "[x for x in range 10]",
-                "async def func(): wait x",
-                "assert condition 'message'",
-                "yield form generator()"
-            ]
+        self.is_correct = rng.random() >= bug_ratio
+        if tier is None:
+            tier = level_tier(level)
+        
+        # Code snippets by tier
+        self.correct_snippets, self.bug_snippets = SNIPPET_TIERS[tier]
         
         # Select a random snippet
         if self.is_correct:
-            self.text = random.choice(self.correct_snippets)
+            self.text = rng.choice(self.correct_snippets)
         else:
-            self.text = random.choice(self.bug_snippets)
+            self.text = rng.choice(self.bug_snippets)
+        
+        # The card is sized to fit the snippet
+        layout = card_layout(self.text)
+        self.width = layout.width
+        self.height = layout.height
+        self.rect = pygame.Rect(
+            rng.randint(0, WIDTH - self.width),
+            -self.height,
+            self.width,
+            self.height
+        )
         
         # Visual properties
-        self.font = pygame.font.Font(GAME_FONT_MONO, 16)
         self.wobble = 0
-        self.wobble_speed = random.uniform(0.05, 0.15)
-        self.wobble_amount = random.uniform(0.5, 1.5)
-        self.angle = random.uniform(-5, 5)
-        self.rotation_speed = random.uniform(-0.2, 0.2)
+        self.wobble_speed = rng.uniform(0.05, 0.15)
+        self.wobble_amount = rng.uniform(0.5, 1.5)
+        self.angle = rng.uniform(-5, 5)
+        self.rotation_speed = rng.uniform(-0.2, 0.2)
         
         # Animation properties
         self.shine_pos = 0
-        self.shine_speed = random.uniform(0.01, 0.03)
+        self.shine_speed = rng.uniform(0.01, 0.03)
         
         # Particles
         self.particles = []
         
-    def update(self):
+        # Frames alive, and the frame the player first moved towards us
+        self.age = 0
+        self.reacted_at = None
+        
+    def update(self, quality=None):
+        if quality is None:
+            quality = QUALITY_TIERS[0]
+        self.age += 1
+        
         # Update vertical position
         self.rect.y += self.speed
         
@@ -137,7 +126,7 @@ class FallingObject:
             particle['vy'] += 0.1  # Gravity
             
         # Randomly emit trail particles
-        if random.random() < 0.1:
+        if quality['trail_particles'] and random.random() < 0.1:
             self.add_trail_particle()
     
     def add_trail_particle(self):
@@ -152,95 +141,140 @@ class FallingObject:
             'life': random.randint(10, 30)
         })
             
-    def draw(self, screen):
+    def draw(self, renderer, quality=None):
+        if quality is None:
+            quality = QUALITY_TIERS[0]
+            
         # Draw particles first (behind the object)
         for particle in self.particles:
             alpha = int(255 * (particle['life'] / 30))
-            particle_surf = pygame.Surface((particle['radius']*2, particle['radius']*2), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surf, (*particle['color'][:3], alpha), 
-                              (particle['radius'], particle['radius']), particle['radius'])
-            screen.blit(particle_surf, (particle['x'] - particle['radius'], particle['y'] - particle['radius']))
+            sprite = circle_sprite(particle['radius'], particle['color'], alpha)
+            renderer.draw_sprite(sprite, (particle['x'], particle['y']))
         
         # Calculate wobble offset
         wobble_offset = math.sin(self.wobble) * self.wobble_amount
+        center = (self.rect.centerx + wobble_offset, self.rect.centery)
+        angle = self.angle if quality['card_rotation'] else 0
         
-        # Create a surface for the object that can be rotated
-        obj_surf = pygame.Surface((self.width + 20, self.height + 20), pygame.SRCALPHA)
-        
-        # Calculate background and border colors with slight variance for visual interest
-        bg_color = LIGHT_GREEN if self.is_correct else LIGHT_RED
-        border_color = GREEN if self.is_correct else RED
-        
-        # Draw the main object on the surface
-        obj_rect = pygame.Rect(10, 10, self.width, self.height)
-        
-        # Draw rounded rectangle with shadow
-        shadow_rect = obj_rect.copy()
-        shadow_rect.x += 3
-        shadow_rect.y += 3
-        pygame.draw.rect(obj_surf, (*DARK_GRAY[:3], 100), shadow_rect, border_radius=8)
-        
-        # Draw main rectangle
-        pygame.draw.rect(obj_surf, bg_color, obj_rect, border_radius=8)
-        pygame.draw.rect(obj_surf, border_color, obj_rect, 2, border_radius=8)
+        # The card itself never changes, so it is drawn once and cached
+        renderer.draw_sprite(card_sprite(self.text, self.is_correct), center, angle)
         
-        # Render text with shadow effect
-        text_surface = self.font.render(self.text, True, DARK_GRAY)
-        shadow_surface = self.font.render(self.text, True, (*DARK_GRAY[:3], 120))
-        
-        text_pos = (
-            obj_rect.x + obj_rect.width//2 - text_surface.get_width()//2,
-            obj_rect.y + obj_rect.height//2 - text_surface.get_height()//2
+        # Add a shine effect, moving along the card's rotated x axis
+        if quality['card_shine'] and self.shine_pos > 0 and self.shine_pos < 1:
+            offset = self.shine_pos * self.width - self.width / 2
+            radians = math.radians(angle)
+            shine_center = (
+                center[0] + offset * math.cos(radians),
+                center[1] - offset * math.sin(radians)
+            )
+            renderer.draw_sprite(shine_sprite(self.height - 4), shine_center, angle)
+            
+    def snapshot(self):
+        return FallingObjectState(
+            self.text, self.width, self.height, self.is_correct, self.rect.copy(),
+            self.wobble, self.wobble_amount, self.angle, self.shine_pos,
+            tuple(dict(particle) for particle in self.particles)
         )
+
+
+class FallingObjectState(namedtuple('FallingObjectState', 'text width height is_correct rect wobble wobble_amount angle shine_pos particles')):
+    # Copy of everything FallingObject.draw reads, owned by the render thread
+    __slots__ = ()
+    draw = FallingObject.draw
+
+
+_card_cache = {}
+_shine_cache = {}
+
+def card_sprite(text, is_correct):
+    key = ('card', text, is_correct)
+    sprite = atlas.get(key) if atlas.regions else None
+    if sprite is None:
+        sprite = _card_cache.get(key)
+        if sprite is None:
+            if len(_card_cache) >= CARD_CACHE_SIZE:
+                _card_cache.clear()
+            sprite = _card_cache[key] = make_card(text, is_correct)
+    return sprite
+
+def make_card(text, is_correct):
+    # Card body with a 10px margin for the shadow and rotation
+    layout = card_layout(text)
+    width, height = layout.width, layout.height
+    font = card_font()
+    obj_surf = pygame.Surface((width + 20, height + 20), pygame.SRCALPHA)
+    
+    # Calculate background and border colors with slight variance for visual interest
+    bg_color = LIGHT_GREEN if is_correct else LIGHT_RED
+    border_color = GREEN if is_correct else RED
+    
+    # Draw the main object on the surface
+    obj_rect = pygame.Rect(10, 10, width, height)
+    
+    # Draw rounded rectangle with shadow
+    shadow_rect = obj_rect.copy()
+    shadow_rect.x += 3
+    shadow_rect.y += 3
+    pygame.draw.rect(obj_surf, (*DARK_GRAY[:3], 100), shadow_rect, border_radius=8)
+    
+    # Draw main rectangle
+    pygame.draw.rect(obj_surf, bg_color, obj_rect, border_radius=8)
+    pygame.draw.rect(obj_surf, border_color, obj_rect, 2, border_radius=8)
+    
+    # Render text with shadow effect, line by line as laid out
+    for line, x, y in layout.lines:
+        text_surface = font.render(line, True, DARK_GRAY)
+        shadow_surface = font.render(line, True, (*DARK_GRAY[:3], 120))
+        text_pos = (obj_rect.x + x, obj_rect.y + y)
         
         # Draw shadow first
         obj_surf.blit(shadow_surface, (text_pos[0]+1, text_pos[1]+1))
         # Then draw main text
         obj_surf.blit(text_surface, text_pos)
-        
-        # Add a shine effect
-        if self.shine_pos > 0 and self.shine_pos < 1:
-            shine_x = int(obj_rect.x + self.shine_pos * obj_rect.width)
-            shine_height = obj_rect.height - 4
-            shine_width = 20
-            
-            # Create gradient for shine
-            for i in range(shine_width):
-                alpha = int(255 * math.sin(i / shine_width * math.pi) * 0.5)
-                color = (255, 255, 255, alpha)
-                shine_rect = pygame.Rect(shine_x - shine_width//2 + i, obj_rect.y + 2, 1, shine_height)
-                pygame.draw.rect(obj_surf, color, shine_rect)
-        
-        # Draw a small icon to help quickly identify
-        icon_size = 12
-        icon_rect = pygame.Rect(
-            obj_rect.right - icon_size - 8, 
-            obj_rect.top + 5, 
-            icon_size, 
-            icon_size
-        )
-        if self.is_correct:
-            # Draw checkmark
-            pygame.draw.circle(obj_surf, GREEN, icon_rect.center, icon_size//2)
-            pygame.draw.line(obj_surf, WHITE, 
-                            (icon_rect.centerx - 4, icon_rect.centery), 
-                            (icon_rect.centerx - 1, icon_rect.centery + 3), 2)
-            pygame.draw.line(obj_surf, WHITE, 
-                            (icon_rect.centerx - 1, icon_rect.centery + 3), 
-                            (icon_rect.centerx + 4, icon_rect.centery - 3), 2)
-        else:
-            # Draw bug
-            pygame.draw.circle(obj_surf, RED, icon_rect.center, icon_size//2)
-            pygame.draw.line(obj_surf, WHITE, 
-                            (icon_rect.centerx - 3, icon_rect.centery - 3), 
-                            (icon_rect.centerx + 3, icon_rect.centery + 3), 2)
-            pygame.draw.line(obj_surf, WHITE, 
-                            (icon_rect.centerx + 3, icon_rect.centery - 3), 
-                            (icon_rect.centerx - 3, icon_rect.centery + 3), 2)
-        
-        # Rotate surface
-        rotated_surf = pygame.transform.rotate(obj_surf, self.angle)
-        rotated_rect = rotated_surf.get_rect(center=(self.rect.centerx + wobble_offset, self.rect.centery))
-        
-        # Draw to screen
-        screen.blit(rotated_surf, rotated_rect.topleft)
+    
+    # Draw a small icon to help quickly identify
+    icon_size = 12
+    icon_rect = pygame.Rect(
+        obj_rect.right - icon_size - 8, 
+        obj_rect.top + 5, 
+        icon_size, 
+        icon_size
+    )
+    if is_correct:
+        # Draw checkmark
+        pygame.draw.circle(obj_surf, GREEN, icon_rect.center, icon_size//2)
+        pygame.draw.line(obj_surf, WHITE, 
+                        (icon_rect.centerx - 4, icon_rect.centery), 
+                        (icon_rect.centerx - 1, icon_rect.centery + 3), 2)
+        pygame.draw.line(obj_surf, WHITE, 
+                        (icon_rect.centerx - 1, icon_rect.centery + 3), 
+                        (icon_rect.centerx + 4, icon_rect.centery - 3), 2)
+    else:
+        # Draw bug
+        pygame.draw.circle(obj_surf, RED, icon_rect.center, icon_size//2)
+        pygame.draw.line(obj_surf, WHITE, 
+                        (icon_rect.centerx - 3, icon_rect.centery - 3), 
+                        (icon_rect.centerx + 3, icon_rect.centery + 3), 2)
+        pygame.draw.line(obj_surf, WHITE, 
+                        (icon_rect.centerx + 3, icon_rect.centery - 3), 
+                        (icon_rect.centerx - 3, icon_rect.centery + 3), 2)
+    
+    return obj_surf
+
+def shine_sprite(shine_height):
+    key = ('shine', shine_height)
+    sprite = atlas.get(key) if atlas.regions else None
+    if sprite is None:
+        sprite = _shine_cache.get(shine_height)
+        if sprite is None:
+            sprite = _shine_cache[shine_height] = make_shine(shine_height)
+    return sprite
+
+def make_shine(shine_height):
+    # Vertical white gradient strip swept across the card
+    shine_width = 20
+    sprite = pygame.Surface((shine_width, shine_height), pygame.SRCALPHA)
+    for i in range(shine_width):
+        alpha = int(255 * math.sin(i / shine_width * math.pi) * 0.5)
+        pygame.draw.rect(sprite, (255, 255, 255, alpha), pygame.Rect(i, 0, 1, shine_height))
+    return sprite
@@ -1,21 +1,25 @@
 import pygame
 from player import Player
-from falling_object import FallingObject
+from falling_object import FallingObject, SNIPPET_TIERS
+from layout import precompute as precompute_layouts
+from input_events import InputSystem, MOVES, CLICK, OVERLAY, QUIT
+from analytics import Analytics
+from config import load_profile
+from difficulty import DifficultyEngine
+from quality import QualityGovernor
+from scenes import MenuScene, GameOverScene
+from metrics import metrics
+from renderer import SurfaceRenderer, render_text, circle_sprite, button_sprite
+from resources import get_font, load_sound, load_assets
 from settings import *
 import random
 import os
+import time
+from collections import namedtuple
 
 pygame.init()
 pygame.mixer.init()
 
-# Load sound files
-def load_sound(filename):
-    try:
-        sound_path = os.path.join('assets', filename)
-        return pygame.mixer.Sound(sound_path)
-    except:
-        return None
-
 # Load all sounds
 game_start_sound = load_sound('game_start.mp3')
 game_over_sound = load_sound('game_over.mp3')
@@ -25,6 +29,33 @@ levelup_sound = load_sound('levelup.wav')
 button_hover_sound = load_sound('hover.wav')
 button_click_sound = load_sound('click.wav')
 
+
+def apply_volumes(config):
+    # Sound volumes from the profile; sound_enabled = false mutes everything
+    sfx = config.sfx_volume if config.sound_enabled else 0.0
+    for sound in (game_start_sound, game_over_sound, correct_sound, bug_sound,
+                  levelup_sound, button_hover_sound, button_click_sound):
+        if sound:
+            sound.set_volume(sfx)
+    if pygame.mixer.get_init():
+        pygame.mixer.music.set_volume(config.music_volume if config.sound_enabled else 0.0)
+
+# Buttons: x, y, width, height, text, color, hover color, text color, action
+MENU_BUTTONS = [
+    (WIDTH//2 - 100, HEIGHT//2, 200, 50, "START GAME", GREEN, LIGHT_GREEN, DARK_GRAY, "start_game"),
+    (WIDTH//2 - 100, HEIGHT//2 + 70, 200, 50, "HOW TO PLAY", BLUE, LIGHT_BLUE, WHITE, "tutorial"),
+    (WIDTH//2 - 100, HEIGHT//2 + 140, 200, 50, "QUIT", LIGHT_RED, RED, WHITE, "quit"),
+]
+
+GAME_OVER_BUTTONS = [
+    (WIDTH//2 - 120, HEIGHT//2 + 50, 240, 50, "PLAY AGAIN", GREEN, LIGHT_GREEN, DARK_GRAY, "play_again"),
+    (WIDTH//2 - 120, HEIGHT//2 + 120, 240, 50, "BACK TO MENU", BLUE, LIGHT_BLUE, WHITE, "menu"),
+]
+
+# Immutable copy of a gameplay frame (see Game.snapshot and pipeline.py)
+FrameState = namedtuple('FrameState', 'player objects particles score level missed_correct caught_bugs '
+                                      'flash_alpha flash_color quality input_time scoreboard')
+
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color, text_color, action=None, font_size=FONT_MEDIUM):
         self.rect = pygame.Rect(x, y, width, height)
@@ -33,13 +64,12 @@ class Button:
         self.text_color = text_color
         self.text = text
         self.action = action
-        self.font = pygame.font.Font(GAME_FONT, font_size)
+        self.font = get_font(GAME_FONT, font_size)
         self.is_hovered = False
-        self.clicked = False
         self.hover_effect = 0
         self.hover_direction = 1
 
-    def draw(self, screen):
+    def draw(self, renderer):
         # Calculate hover effect (pulsing glow)
         self.hover_effect += 0.05 * self.hover_direction
         if self.hover_effect > 1:
@@ -55,48 +85,46 @@ class Button:
         if self.is_hovered:
             glow_rect = self.rect.inflate(10 + 5 * self.hover_effect, 10 + 5 * self.hover_effect)
             glow_color = (*self.hover_color[:3], 100)
-            pygame.draw.rect(screen, glow_color, glow_rect, border_radius=10)
+            renderer.rect(glow_color, glow_rect, border_radius=10)
             
-        # Draw main button
-        pygame.draw.rect(screen, current_color, self.rect, border_radius=8)
-        pygame.draw.rect(screen, WHITE, self.rect, 2, border_radius=8)
+        # Draw main button (face and border in one sprite)
+        renderer.blit(button_sprite(self.rect.size, current_color), self.rect.topleft)
         
         # Draw text
-        text_surf = self.font.render(self.text, True, self.text_color)
+        text_surf = render_text(self.font, self.text, self.text_color)
         text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        renderer.blit(text_surf, text_rect.topleft)
         
-    def update(self, mouse_pos, mouse_clicked):
-        # Check if mouse is over button
+    def update(self, pointer, clicks=()):
+        # Check if the pointer is over the button
         prev_hovered = self.is_hovered
-        self.is_hovered = self.rect.collidepoint(mouse_pos)
+        self.is_hovered = pointer is not None and self.rect.collidepoint(pointer)
         
         # Play hover sound if just started hovering
         if self.is_hovered and not prev_hovered and button_hover_sound:
             button_hover_sound.play()
         
-        # Check for click
-        if self.is_hovered and mouse_clicked and self.action and not self.clicked:
+        # Clicks are checked where they happened, not where the pointer is now
+        if self.action and any(self.rect.collidepoint(pos) for pos in clicks):
             if button_click_sound:
                 button_click_sound.play()
-            self.clicked = True
             return self.action
-        
-        # Reset clicked state
-        if not mouse_clicked:
-            self.clicked = False
             
         return None
 
 class Game:
-    def __init__(self, screen):
+    def __init__(self, screen, renderer=None, config=None):
+        # screen is None with the texture renderer; draw through self.renderer
         self.screen = screen
-        self.font = pygame.font.Font(GAME_FONT, FONT_MEDIUM)
-        self.state = 'menu'
+        self.config = config or load_profile()
+        self.renderer = renderer or SurfaceRenderer(screen)
+        self.font = get_font(GAME_FONT, FONT_MEDIUM)
+        self.scenes = []
         self.game_over = False
         self.player = Player()
         self.objects = []
         self.spawn_timer = 0
+        self.spawn_count = 0
         self.score = 0
         self.level = 1
         self.missed_correct = 0
@@ -109,22 +137,54 @@ class Game:
         self.background = self.create_background()
         self.particles = []
         self.tutorial_shown = False
-        self.pause = False
+        self.progress_bars = {}
+        # Drawing has its own RNG: with --pipeline it runs on the render
+        # thread, and must not touch the simulation's (seeded) global one
+        self.draw_rng = random.Random()
+        self.inputs = InputSystem()
+        self.input_time = None  # earliest input the next frame shows
+        self.game_over_overlay = None
+        self.analytics = Analytics(ANALYTICS_LOG, enabled=ANALYTICS_ENABLED, fps=FPS)
+        self.difficulty = DifficultyEngine(self.config)
+        self.quality_governor = QualityGovernor(start=self.config.quality_start, auto=self.config.quality_auto)
+        self.controller = None  # e.g. a BotPolicy; None means the keyboard
+        self.memdiag = None     # MemoryDiagnostics when running with --memdiag
+        self.session = None     # ClassroomClient when playing in a classroom
+        self.recorder = None    # Recorder when running with --record
         self.load_assets()
+        apply_volumes(self.config)
+        # Measure every snippet now so spawning a card never touches the font
+        precompute_layouts(SNIPPET_TIERS)
+        self.set_scene(MenuScene(self))
+        
+    @property
+    def scene(self):
+        return self.scenes[-1]
+        
+    @property
+    def state(self):
+        # Name of the current screen: 'menu', 'tutorial', 'game' or 'game_over'
+        return self.scene.state
+        
+    @property
+    def pause(self):
+        return len(self.scenes) > 1 and self.scene.state == 'game'
+        
+    def set_scene(self, scene):
+        self.scenes = [scene]
+        
+    def push_scene(self, scene):
+        self.scenes.append(scene)
+        
+    def pop_scene(self):
+        if len(self.scenes) > 1:
+            self.scenes.pop()
         
     def load_assets(self):
         # Load images
-        try:
-            self.logo = pygame.image.load('assets/logo.png').convert_alpha()
-            self.logo = pygame.transform.scale(self.logo, (400, 200))
-        except:
-            self.logo = None
-            
-        try:
-            self.player_img = pygame.image.load('assets/catcher.png').convert_alpha()
-            self.player_img = pygame.transform.scale(self.player_img, (100, 60))
-        except:
-            self.player_img = None
+        assets = load_assets()
+        self.logo = assets['logo']
+        self.player_img = assets['player_img']
             
     def create_background(self):
         # Create a gradient background with code-like elements
@@ -138,7 +198,7 @@ class Game:
         
         # Add some code-like symbols in the background
         symbols = ['{ }', '[ ]', '( )', '< >', ';', '==', '+=', '->']
-        symbol_font = pygame.font.Font(GAME_FONT_MONO, 14)
+        symbol_font = get_font(GAME_FONT_MONO, 14)
         
         for _ in range(50):
             symbol = random.choice(symbols)
@@ -151,92 +211,36 @@ class Game:
         return bg
         
     def setup_buttons(self):
-        # Menu buttons
-        start_btn = Button(
-            WIDTH//2 - 100, HEIGHT//2, 
-            200, 50, 
-            "START GAME", GREEN, LIGHT_GREEN, DARK_GRAY,
-            action="start_game"
-        )
-        
-        tutorial_btn = Button(
-            WIDTH//2 - 100, HEIGHT//2 + 70, 
-            200, 50, 
-            "HOW TO PLAY", BLUE, LIGHT_BLUE, WHITE,
-            action="tutorial"
-        )
-        
-        quit_btn = Button(
-            WIDTH//2 - 100, HEIGHT//2 + 140, 
-            200, 50, 
-            "QUIT", LIGHT_RED, RED, WHITE,
-            action="quit"
-        )
-        
-        self.menu_buttons = [start_btn, tutorial_btn, quit_btn]
-        
-        # Game over buttons
-        play_again_btn = Button(
-            WIDTH//2 - 120, HEIGHT//2 + 50, 
-            240, 50, 
-            "PLAY AGAIN", GREEN, LIGHT_GREEN, DARK_GRAY,
-            action="play_again"
-        )
-        
-        menu_btn = Button(
-            WIDTH//2 - 120, HEIGHT//2 + 120, 
-            240, 50, 
-            "BACK TO MENU", BLUE, LIGHT_BLUE, WHITE,
-            action="menu"
-        )
-        
-        self.game_over_buttons = [play_again_btn, menu_btn]
+        self.menu_buttons = [Button(*spec[:8], action=spec[8]) for spec in MENU_BUTTONS]
+        self.game_over_buttons = [Button(*spec[:8], action=spec[8]) for spec in GAME_OVER_BUTTONS]
         
     def handle_events(self):
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_clicked = False
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        # UI actions apply now; moves wait in the input buffer for game_update
+        clicks = []
+        for event in self.inputs.poll():
+            if event.action == QUIT:
+                self.analytics.flush()
                 return False
-                
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left mouse button
-                    mouse_clicked = True
-                    
-            if event.type == pygame.KEYDOWN:
-                if self.state == 'game':
-                    if event.key == pygame.K_ESCAPE:
-                        self.pause = not self.pause
-                elif self.state == 'tutorial':
-                    if event.key == pygame.K_ESCAPE or event.key == pygame.K_RETURN:
-                        self.state = 'menu'
-        
-        # Handle buttons based on current state
-        if self.state == 'menu':
-            for button in self.menu_buttons:
-                action = button.update(mouse_pos, mouse_clicked)
-                if action == "start_game":
-                    self.state = 'game'
-                    self.start_game()
-                elif action == "tutorial":
-                    self.state = 'tutorial'
-                elif action == "quit":
-                    return False
-                    
-        elif self.state == 'game_over':
-            for button in self.game_over_buttons:
-                action = button.update(mouse_pos, mouse_clicked)
-                if action == "play_again":
-                    self.state = 'game'
-                    self.reset_game()
-                    self.start_game()
-                elif action == "menu":
-                    self.state = 'menu'
-                    
-        return True
+            if not event.down or event.action in MOVES:
+                continue
+            self.note_input(event.time)
+            if event.action == OVERLAY:
+                metrics.toggle_overlay()
+            elif event.action == CLICK:
+                clicks.append(event.pos)
+            else:
+                self.scene.handle_action(event.action)
+        
+        # Buttons belong to the scene on top
+        return self.scene.handle_buttons(self.inputs.pointer, clicks)
+        
+    def note_input(self, event_time):
+        if event_time is not None and (self.input_time is None or event_time < self.input_time):
+            self.input_time = event_time
         
     def start_game(self):
+        if self.controller and hasattr(self.controller, 'reset'):
+            self.controller.reset()
         if game_start_sound:
             game_start_sound.play()
         self.score = 0
@@ -244,24 +248,37 @@ class Game:
         self.missed_correct = 0
         self.caught_bugs = 0
         self.game_over = False
-        self.pause = False
+        self.inputs.clear()
+        self.analytics.new_session()
+        self.difficulty.reset()
+        if self.memdiag:
+            self.memdiag.on_restart(self)
         
     def reset_game(self):
         self.player = Player()
         self.objects = []
         self.particles = []
         self.spawn_timer = 0
+        self.spawn_count = 0
+        self.session_frame = 0
+        self.next_spawn_frame = 0
         
-    def update(self):
-        if self.state == 'game' and not self.pause:
-            self.game_update()
+    def is_animating(self):
+        # False when the next frame would look the same as this one, which lets
+        # the main loop sleep until input arrives
+        return metrics.overlay_visible or self.scene.is_animating()
+        
+    @property
+    def quality(self):
+        return self.quality_governor.tier
         
-        # Update particles regardless of state
-        self.update_particles()
+    @property
+    def scoreboard(self):
+        # Classroom standings, or None when playing alone
+        return self.session.scoreboard() if self.session else None
         
-        # Handle flash effect fade
-        if self.flash_alpha > 0:
-            self.flash_alpha = max(0, self.flash_alpha - 15)
+    def update(self):
+        self.scene.update()
             
     def update_particles(self):
         # Update and remove dead particles
@@ -279,6 +296,11 @@ class Game:
             particle['vy'] += 0.1  # Gravity
             
     def create_particle_effect(self, x, y, color, count=20, is_correct=True):
+        # Scale the effect down and respect the live particle cap on lower tiers
+        quality = self.quality
+        count = max(1, int(count * quality['particle_scale']))
+        cap = min(quality['particle_cap'], self.config.particle_budgets[self.config.level_index(self.level)])
+        count = min(count, cap - len(self.particles))
         for _ in range(count):
             speed = random.uniform(1, 3) if is_correct else random.uniform(0.5, 2)
             angle = random.uniform(0, 6.28)
@@ -294,24 +316,66 @@ class Game:
             
     def game_update(self):
         if self.game_over:
-            self.state = 'game_over'
+            self.push_scene(GameOverScene(self, self.scene))
+            self.analytics.flush()
             if game_over_sound:
                 game_over_sound.play()
+            if self.session:
+                self.session.report(self)
             return
             
-        keys = pygame.key.get_pressed()
-        self.player.update(keys)
-        
-        # Spawn new objects
-        spawn_rate = max(20, 60 - self.level * 5)
-        self.spawn_timer += 1
-        if self.spawn_timer > spawn_rate:
-            self.objects.append(FallingObject(self.level))
+        # The bot presses and releases moves through the same input buffer
+        if self.controller:
+            self.controller.feed(self, self.inputs)
+        controls = self.inputs.latch()
+        self.note_input(controls.time)
+        prev_x = self.player.x
+        self.player.max_trail = self.quality['player_trail']
+        self.player.update(controls)
+        player_dx = self.player.x - prev_x
+        
+        # Spawn new objects at the rate the difficulty engine asks for
+        difficulty = self.difficulty
+        if self.session:
+            # Head-to-head: card n spawns on the same frame for every player,
+            # so the schedule follows the game clock, not this player's level
+            # or how many cards they have on screen
+            self.session_frame += 1
+            spawn_level = min(self.config.max_levels, 1 + self.session_frame // (CLASSROOM_LEVEL_SECONDS * FPS))
+            difficulty.tick(spawn_level)
+            due = self.session_frame >= self.next_spawn_frame
+            if due:
+                self.next_spawn_frame += difficulty.spawn_interval
+        else:
+            spawn_level = self.level
+            difficulty.tick(spawn_level)
+            self.spawn_timer += 1
+            due = self.spawn_timer > difficulty.spawn_interval and difficulty.can_spawn(len(self.objects))
+        if due:
+            # In a classroom every player gets the same card for the same index
+            rng = self.session.spawn_rng(self.spawn_count) if self.session else None
+            obj = FallingObject(
+                spawn_level,
+                base_speed=difficulty.base_speed,
+                bug_ratio=difficulty.bug_ratio,
+                tier=difficulty.tier,
+                rng=rng,
+                speed_spread=self.config.fall_speed_spread
+            )
+            self.objects.append(obj)
+            self.analytics.spawn(obj, self.level)
             self.spawn_timer = 0
+            self.spawn_count += 1
             
         # Update objects and check collisions
+        quality = self.quality
         for obj in self.objects[:]:
-            obj.update()
+            obj.update(quality)
+            
+            # Reaction time: first frame the player heads towards a correct snippet
+            if obj.reacted_at is None and player_dx and obj.is_correct:
+                if (player_dx > 0) == (obj.rect.centerx > self.player.rect.centerx):
+                    obj.reacted_at = obj.age
             
             if obj.rect.colliderect(self.player.rect):
                 # Visual and audio feedback
@@ -328,6 +392,11 @@ class Game:
                     is_correct=obj.is_correct
                 )
                 
+                self.analytics.catch(obj, self.level)
+                difficulty.record_outcome(obj.is_correct)
+                if obj.is_correct and obj.reacted_at is not None:
+                    difficulty.record_reaction(obj.reacted_at)
+                
                 if obj.is_correct:
                     self.score += 1
                     if correct_sound:
@@ -340,6 +409,8 @@ class Game:
                 self.objects.remove(obj)
                 
             elif obj.rect.top > HEIGHT:
+                self.analytics.miss(obj, self.level)
+                difficulty.record_outcome(not obj.is_correct)
                 if obj.is_correct:
                     self.missed_correct += 1
                     # Small negative feedback
@@ -353,7 +424,7 @@ class Game:
                 self.objects.remove(obj)
                 
         # Level progression
-        if self.score >= self.level * 10:
+        if self.score >= self.level * self.config.points_per_level and self.level < self.config.max_levels:
             self.level += 1
             if levelup_sound:
                 levelup_sound.play()
@@ -369,106 +440,102 @@ class Game:
                 )
                 
         # Game over conditions
-        if self.missed_correct >= 5 or self.caught_bugs >= 5:
+        if self.missed_correct >= self.config.lives or self.caught_bugs >= self.config.max_bugs:
             self.game_over = True
             
-    def draw(self):
-        # Background
-        self.screen.blit(self.background, (0, 0))
-        
-        # Draw particles
-        self.draw_particles()
-        
-        # Flash effect if active
-        if self.flash_alpha > 0:
-            flash_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            flash_surface.fill((*self.flash_color[:3], self.flash_alpha))
-            self.screen.blit(flash_surface, (0, 0))
-        
-        # State-specific drawing
-        if self.state == 'menu':
-            self.draw_menu()
-        elif self.state == 'game':
-            self.draw_game()
-            if self.pause:
-                self.draw_pause()
-        elif self.state == 'game_over':
-            self.draw_game_over()
-        elif self.state == 'tutorial':
-            self.draw_tutorial()
+        if self.session:
+            self.session.report(self)
             
-        pygame.display.flip()
+    def snapshot(self):
+        # Everything a gameplay frame draws, copied so the simulation can move
+        # on while the render thread draws it
+        return FrameState(
+            self.player.snapshot(),
+            tuple(obj.snapshot() for obj in self.objects),
+            tuple(dict(particle) for particle in self.particles),
+            self.score, self.level, self.missed_correct, self.caught_bugs,
+            self.flash_alpha, self.flash_color, self.quality, self.input_time,
+            self.scoreboard
+        )
         
-    def draw_particles(self):
-        for particle in self.particles:
+    def draw(self):
+        renderer = self.renderer
+        renderer.begin_frame()
+        self.scene.draw(renderer)
+        if metrics.enabled:
+            if metrics.overlay_visible:
+                metrics.draw_overlay(renderer, self)
+            metrics.mark('draw')
+        renderer.present()
+        if self.recorder:
+            self.recorder.capture(renderer)
+        if metrics.enabled:
+            metrics.mark('flip')
+            if self.input_time is not None:
+                metrics.record_latency((time.perf_counter() - self.input_time) * 1000)
+        self.input_time = None
+        
+    def draw_particles(self, particles=None):
+        renderer = self.renderer
+        if particles is None:
+            particles = self.particles
+        for particle in particles:
             # Calculate alpha based on remaining life
-            alpha = int(255 * (particle['life'] / 40))
+            alpha = min(255, int(255 * (particle['life'] / 40)))
             radius = particle['radius'] * (particle['life'] / 40)  # Shrink as life decreases
             
-            # Create surface for this particle
-            particle_surface = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
-            
-            # Draw the particle with alpha
-            pygame.draw.circle(
-                particle_surface, 
-                (*particle['color'][:3], alpha), 
-                (radius, radius), 
-                int(radius)
-            )
-            
-            # Blit to screen
-            self.screen.blit(
-                particle_surface, 
-                (particle['x'] - radius, particle['y'] - radius)
-            )
+            # Circle sprites are cached per radius, colour and alpha
+            sprite = circle_sprite(radius, particle['color'], alpha)
+            renderer.draw_sprite(sprite, (particle['x'], particle['y']))
             
     def draw_menu(self):
+        renderer = self.renderer
         # Draw logo or title
         if self.logo:
             logo_rect = self.logo.get_rect(centerx=WIDTH//2, y=50)
-            self.screen.blit(self.logo, logo_rect)
+            renderer.blit(self.logo, logo_rect.topleft)
         else:
             # Fallback to text if logo isn't available
-            title_font = pygame.font.Font(GAME_FONT_BOLD, FONT_XL)
-            subtitle_font = pygame.font.Font(GAME_FONT, FONT_MEDIUM)
+            title_font = get_font(GAME_FONT_BOLD, FONT_XL)
+            subtitle_font = get_font(GAME_FONT, FONT_MEDIUM)
             
             # Draw glowing title effect
             glows = [(4, 4, 20), (3, 3, 40), (2, 2, 60), (1, 1, 80)]
             title_text = "CODE CATCHER"
             
-            for offset_x, offset_y, alpha in glows:
-                glow_surf = title_font.render(title_text, True, (*BLUE[:3], alpha))
-                self.screen.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 + offset_x, HEIGHT//4 + offset_y))
-                self.screen.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 - offset_x, HEIGHT//4 - offset_y))
+            for offset_x, offset_y, alpha in glows[:self.quality['glow_passes']]:
+                glow_surf = render_text(title_font, title_text, (*BLUE[:3], alpha))
+                renderer.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 + offset_x, HEIGHT//4 + offset_y))
+                renderer.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 - offset_x, HEIGHT//4 - offset_y))
             
             # Main title
-            title = title_font.render(title_text, True, BLUE)
-            subtitle = subtitle_font.render("Catch correct code snippets, avoid bugs!", True, DARK_GRAY)
+            title = render_text(title_font, title_text, BLUE)
+            subtitle = render_text(subtitle_font, "Catch correct code snippets, avoid bugs!", DARK_GRAY)
             
-            self.screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//4))
-            self.screen.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, HEIGHT//3))
-        
-        # Draw animated buttons
-        for button in self.menu_buttons:
-            button.draw(self.screen)
+            renderer.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//4))
+            renderer.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, HEIGHT//3))
             
-        # Draw version info
-        version_font = pygame.font.Font(GAME_FONT, FONT_TINY)
-        version_text = version_font.render("v1.0", True, GRAY)
-        self.screen.blit(version_text, (WIDTH - version_text.get_width() - 10, HEIGHT - version_text.get_height() - 10))
-        
-    def draw_game(self):
+        # Draw version info (buttons are drawn by the menu scene every frame)
+        version_font = get_font(GAME_FONT, FONT_TINY)
+        version_text = render_text(version_font, "v1.0", GRAY)
+        renderer.blit(version_text, (WIDTH - version_text.get_width() - 10, HEIGHT - version_text.get_height() - 10))
+        
+    def draw_game(self, state=None):
+        # state is a FrameState in pipelined mode, otherwise the game itself
+        if state is None:
+            state = self
+        renderer = self.renderer
         # Draw header panel with gradient
         header_rect = pygame.Rect(0, 0, WIDTH, 70)
-        pygame.draw.rect(self.screen, HEADER_COLOR, header_rect)
+        renderer.rect(HEADER_COLOR, header_rect)
         
         # Add subtle pattern to header
         for i in range(10):
-            x = random.randint(0, WIDTH)
-            y = random.randint(0, 60)
-            pygame.draw.circle(self.screen, (*LIGHT_BLUE[:3], 30), (x, y), 5)
+            x = self.draw_rng.randint(0, WIDTH)
+            y = self.draw_rng.randint(0, 60)
+            renderer.circle((*LIGHT_BLUE[:3], 30), (x, y), 5)
         
-        pygame.draw.line(self.screen, BLUE, (0, 70), (WIDTH, 70), 2)
+        renderer.line(BLUE, (0, 70), (WIDTH, 70), 2)
         
         # Stats display with icons
         icons = [
@@ -478,121 +545,143 @@ class Game:
             "🐞"  # Bugs
         ]
         
-        stats_font = pygame.font.Font(GAME_FONT_MONO, FONT_SMALL)
+        stats_font = get_font(GAME_FONT_MONO, FONT_SMALL)
         stats = [
-            f"{icons[0]} {self.score}",
-            f"{icons[1]} {self.level}",
-            f"{icons[2]} {5 - self.missed_correct}",
-            f"{icons[3]} {self.caught_bugs}/5"
+            f"{icons[0]} {state.score}",
+            f"{icons[1]} {state.level}",
+            f"{icons[2]} {self.config.lives - state.missed_correct}",
+            f"{icons[3]} {state.caught_bugs}/{self.config.max_bugs}"
         ]
         
         for i, stat in enumerate(stats):
-            text = stats_font.render(stat, True, DARK_GRAY)
+            text = render_text(stats_font, stat, DARK_GRAY)
             
             # Create a subtle background for each stat
             bg_rect = pygame.Rect(20 + i*170, 10, 150, 30)
-            pygame.draw.rect(self.screen, (*WHITE[:3], 180), bg_rect, border_radius=5)
+            renderer.rect((*WHITE[:3], 180), bg_rect, border_radius=5)
             
-            self.screen.blit(text, (30 + i*170, 15))
+            renderer.blit(text, (30 + i*170, 15))
         
         # Progress bar with animation
         progress_bg_rect = pygame.Rect(20, 50, WIDTH-40, 10)
-        progress_width = int((WIDTH-40)*(self.score%10)/10)
-        progress_rect = pygame.Rect(20, 50, progress_width, 10)
+        points = self.config.points_per_level
+        progress_width = int((WIDTH-40)*(state.score%points)/points)
         
         # Draw progress bar background with gradient
-        pygame.draw.rect(self.screen, (*WHITE[:3], 100), progress_bg_rect, border_radius=5)
+        renderer.rect((*WHITE[:3], 100), progress_bg_rect, border_radius=5)
         
         # Draw actual progress
         if progress_width > 0:
-            # Create a gradient effect for the progress bar
-            for x in range(progress_width):
-                progress_color = gradient_color(GREEN, LIGHT_GREEN, x/progress_width)
-                pygame.draw.line(self.screen, progress_color, (20 + x, 50), (20 + x, 59))
+            renderer.blit(self.progress_bar(progress_width), (20, 50))
                 
         # Border for progress bar
-        pygame.draw.rect(self.screen, GREEN, progress_bg_rect, 2, border_radius=5)
+        renderer.rect(GREEN, progress_bg_rect, 2, border_radius=5)
         
         # Add level indicator on progress bar
-        level_indicator = stats_font.render(f"Level {self.level}", True, DARK_GRAY)
-        self.screen.blit(level_indicator, (WIDTH//2 - level_indicator.get_width()//2, 30))
+        level_indicator = render_text(stats_font, f"Level {state.level}", DARK_GRAY)
+        renderer.blit(level_indicator, (WIDTH//2 - level_indicator.get_width()//2, 30))
         
         # Game objects
-        self.player.draw(self.screen, self.player_img)
-        for obj in self.objects:
-            obj.draw(self.screen)
+        state.player.draw(renderer, self.player_img)
+        quality = state.quality
+        for obj in state.objects:
+            obj.draw(renderer, quality)
+            
+        if state.scoreboard:
+            self.draw_scoreboard(state.scoreboard)
+            
+    def draw_scoreboard(self, scoreboard):
+        # Classroom standings in the top right corner, below the header
+        renderer = self.renderer
+        font = get_font(GAME_FONT_MONO, FONT_TINY)
+        row_height = 20
+        panel = pygame.Rect(WIDTH - 210, 80, 190, 10 + row_height * len(scoreboard))
+        renderer.rect(UI_BG_COLOR, panel, border_radius=5)
+        renderer.rect(UI_BORDER_COLOR, panel, 1, border_radius=5)
+        for i, (name, score, level, over, is_us) in enumerate(scoreboard):
+            color = BLUE if is_us else GRAY if over else DARK_GRAY
+            row = render_text(font, f"{i + 1}. {name[:12]:<12} {score:>4}", color)
+            renderer.blit(row, (panel.x + 10, panel.y + 5 + i * row_height))
+            
+    def progress_bar(self, progress_width):
+        # The bar only ever has ten widths, so each gradient is drawn once
+        bar = self.progress_bars.get(progress_width)
+        if bar is None:
+            bar = pygame.Surface((progress_width, 10))
+            for x in range(progress_width):
+                progress_color = gradient_color(GREEN, LIGHT_GREEN, x/progress_width)
+                pygame.draw.line(bar, progress_color, (x, 0), (x, 9))
+            self.progress_bars[progress_width] = bar
+        return bar
             
     def draw_pause(self):
+        renderer = self.renderer
         # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        renderer.fill((0, 0, 0, 180))
         
         # Pause text
-        pause_font = pygame.font.Font(GAME_FONT_BOLD, FONT_XL)
-        instruction_font = pygame.font.Font(GAME_FONT, FONT_MEDIUM)
+        pause_font = get_font(GAME_FONT_BOLD, FONT_XL)
+        instruction_font = get_font(GAME_FONT, FONT_MEDIUM)
         
-        pause_text = pause_font.render("PAUSED", True, WHITE)
-        instruction = instruction_font.render("Press ESC to Resume", True, LIGHT_BLUE)
+        pause_text = render_text(pause_font, "PAUSED", WHITE)
+        instruction = render_text(instruction_font, "Press ESC to Resume", LIGHT_BLUE)
         
-        self.screen.blit(pause_text, (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2 - 50))
-        self.screen.blit(instruction, (WIDTH//2 - instruction.get_width()//2, HEIGHT//2 + 20))
+        renderer.blit(pause_text, (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2 - 50))
+        renderer.blit(instruction, (WIDTH//2 - instruction.get_width()//2, HEIGHT//2 + 20))
         
     def draw_game_over(self):
-        # Draw the game state in the background
-        self.draw_game()
+        # The game state underneath is drawn by the game over scene
         
-        # Semi-transparent overlay with gradient
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        for y in range(HEIGHT):
-            alpha = 180 + int(20 * math.sin(y/30))
-            overlay.fill((0, 0, 30, alpha), (0, y, WIDTH, 1))
-        self.screen.blit(overlay, (0, 0))
+        renderer = self.renderer
+        
+        # Semi-transparent overlay with gradient, built once
+        if self.game_over_overlay is None:
+            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            for y in range(HEIGHT):
+                alpha = 180 + int(20 * math.sin(y/30))
+                overlay.fill((0, 0, 30, alpha), (0, y, WIDTH, 1))
+            self.game_over_overlay = overlay
+        renderer.blit(self.game_over_overlay, (0, 0))
         
         # Game over text with glow effect
-        title_font = pygame.font.Font(GAME_FONT_BOLD, FONT_XL)
-        text_font = pygame.font.Font(GAME_FONT, FONT_LARGE)
+        title_font = get_font(GAME_FONT_BOLD, FONT_XL)
+        text_font = get_font(GAME_FONT, FONT_LARGE)
         
         # Draw glowing text effect
         glows = [(3, 3, 50), (2, 2, 100), (1, 1, 150)]
-        for offset_x, offset_y, alpha in glows:
-            glow_surf = title_font.render("GAME OVER", True, (*RED[:3], alpha))
-            self.screen.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 + offset_x, HEIGHT//3 + offset_y))
-            self.screen.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 - offset_x, HEIGHT//3 - offset_y))
+        for offset_x, offset_y, alpha in glows[:self.quality['glow_passes']]:
+            glow_surf = render_text(title_font, "GAME OVER", (*RED[:3], alpha))
+            renderer.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 + offset_x, HEIGHT//3 + offset_y))
+            renderer.blit(glow_surf, (WIDTH//2 - glow_surf.get_width()//2 - offset_x, HEIGHT//3 - offset_y))
         
         # Main text
-        title = title_font.render("GAME OVER", True, RED)
-        score = text_font.render(f"Final Score: {self.score}", True, WHITE)
-        level = text_font.render(f"Level Reached: {self.level}", True, LIGHT_BLUE)
-        
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//3))
-        self.screen.blit(score, (WIDTH//2 - score.get_width()//2, HEIGHT//2 - 30))
-        self.screen.blit(level, (WIDTH//2 - level.get_width()//2, HEIGHT//2 + 10))
+        title = render_text(title_font, "GAME OVER", RED)
+        score = render_text(text_font, f"Final Score: {self.score}", WHITE)
+        level = render_text(text_font, f"Level Reached: {self.level}", LIGHT_BLUE)
         
-        # Draw animated buttons
-        for button in self.game_over_buttons:
-            button.draw(self.screen)
+        renderer.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//3))
+        renderer.blit(score, (WIDTH//2 - score.get_width()//2, HEIGHT//2 - 30))
+        renderer.blit(level, (WIDTH//2 - level.get_width()//2, HEIGHT//2 + 10))
         
     def draw_tutorial(self):
+        renderer = self.renderer
         # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 40, 220))
-        self.screen.blit(overlay, (0, 0))
+        renderer.fill((0, 0, 40, 220))
         
         # Tutorial content
-        title_font = pygame.font.Font(GAME_FONT_BOLD, FONT_LARGE)
-        text_font = pygame.font.Font(GAME_FONT, FONT_MEDIUM)
-        tip_font = pygame.font.Font(GAME_FONT_MONO, FONT_SMALL)
+        title_font = get_font(GAME_FONT_BOLD, FONT_LARGE)
+        text_font = get_font(GAME_FONT, FONT_MEDIUM)
+        tip_font = get_font(GAME_FONT_MONO, FONT_SMALL)
         
-        title = title_font.render("HOW TO PLAY", True, WHITE)
+        title = render_text(title_font, "HOW TO PLAY", WHITE)
         
         instructions = [
             "1. Use LEFT and RIGHT arrow keys to move your code catcher",
             "2. Catch correct code snippets (green) to score points",
             "3. Avoid catching buggy code (red)",
-            "4. Missing 5 correct snippets or catching 5 bugs ends the game",
-            "5. Level up after every 10 points",
-            "6. Press ESC during gameplay to pause"
+            f"4. Missing {self.config.lives} correct snippets or catching {self.config.max_bugs} bugs ends the game",
+            f"5. Level up after every {self.config.points_per_level} points",
+            "6. Press ESC during gameplay to pause" if not self.session else "6. Classroom games can't be paused"
         ]
         
         examples = [
@@ -601,35 +690,35 @@ class Game:
         ]
         
         # Draw title
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, 50))
+        renderer.blit(title, (WIDTH//2 - title.get_width()//2, 50))
         
         # Draw instructions
         for i, instruction in enumerate(instructions):
-            inst_text = text_font.render(instruction, True, LIGHT_BLUE)
-            self.screen.blit(inst_text, (WIDTH//2 - inst_text.get_width()//2, 120 + i*40))
+            inst_text = render_text(text_font, instruction, LIGHT_BLUE)
+            renderer.blit(inst_text, (WIDTH//2 - inst_text.get_width()//2, 120 + i*40))
         
         # Draw example section title
-        example_title = text_font.render("EXAMPLES:", True, WHITE)
-        self.screen.blit(example_title, (WIDTH//2 - example_title.get_width()//2, 380))
+        example_title = render_text(text_font, "EXAMPLES:", WHITE)
+        renderer.blit(example_title, (WIDTH//2 - example_title.get_width()//2, 380))
         
         # Draw examples with colored backgrounds
         for i, (code, desc) in enumerate(examples):
             # Code snippet background
             bg_color = GREEN if "CORRECT" in desc else RED
             snippet_rect = pygame.Rect(WIDTH//2 - 200, 420 + i*70, 400, 30)
-            pygame.draw.rect(self.screen, bg_color, snippet_rect, border_radius=5)
+            renderer.rect(bg_color, snippet_rect, border_radius=5)
             
             # Code text
-            code_text = tip_font.render(code, True, WHITE)
-            self.screen.blit(code_text, (WIDTH//2 - code_text.get_width()//2, 425 + i*70))
+            code_text = render_text(tip_font, code, WHITE)
+            renderer.blit(code_text, (WIDTH//2 - code_text.get_width()//2, 425 + i*70))
             
             # Description
-            desc_text = tip_font.render(desc, True, LIGHT_GRAY)
-            self.screen.blit(desc_text, (WIDTH//2 - desc_text.get_width()//2, 455 + i*70))
+            desc_text = render_text(tip_font, desc, LIGHT_GRAY)
+            renderer.blit(desc_text, (WIDTH//2 - desc_text.get_width()//2, 455 + i*70))
         
         # Back instruction
-        back_text = text_font.render("Press ESC or ENTER to return to menu", True, GREEN)
-        self.screen.blit(back_text, (WIDTH//2 - back_text.get_width()//2, HEIGHT - 50))
+        back_text = render_text(text_font, "Press ESC or ENTER to return to menu", GREEN)
+        renderer.blit(back_text, (WIDTH//2 - back_text.get_width()//2, HEIGHT - 50))
 
 # Helper function for color gradients
 def gradient_color(color1, color2, ratio):
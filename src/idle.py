@@ -0,0 +1,30 @@
+import pygame
+from settings import *
+
+# Frame scheduler for the main loop. While the game animates it ticks at FPS
+# like before; when the screen is static it blocks on the event queue so an
+# idle menu or pause screen uses next to no CPU, and wakes on the first input.
+# The event that woke it is handed to the input system, which reads it ahead
+# of the rest of the queue, so input order is kept.
+
+
+class IdleScheduler:
+    def __init__(self, clock, inputs, fps=FPS, wait_ms=IDLE_WAIT_MS):
+        self.clock = clock
+        self.inputs = inputs
+        self.fps = fps
+        self.wait_ms = wait_ms
+        self.idle = False
+
+    def tick(self, animating):
+        if animating:
+            self.idle = False
+            return self.clock.tick(self.fps)
+
+        self.idle = True
+        event = pygame.event.wait(self.wait_ms)
+        if event.type != pygame.NOEVENT:
+            # Game.handle_events sees it first next frame
+            self.inputs.defer(event)
+        # Keep the clock's frame timing continuous without sleeping again
+        return self.clock.tick()
@@ -0,0 +1,273 @@
+import time
+from collections import namedtuple
+import pygame
+from settings import *
+from metrics import metrics
+
+try:
+    from pygame._sdl2 import controller as sdl_controller
+except ImportError:  # pygame without the SDL2 extras: plain joysticks only
+    sdl_controller = None
+
+# Input pipeline. SDL events from the keyboard, mouse, gamepads and touch
+# screens are translated into actions, stamped with the time they were read
+# and kept in a ring buffer. Game.handle_events dispatches UI actions (back,
+# confirm, clicks) to the scene straight away; the simulation latches the
+# movement actions once per tick. A tap that goes down and up between two
+# ticks still counts for the tick it happened before, which polling
+# pygame.key.get_pressed() used to miss. The bot feeds the same buffer.
+#
+# The earliest timestamp applied in a frame becomes Game.input_time, and the
+# time from there to present() is recorded as input latency in metrics. The
+# stamp is taken when the event is read from SDL, not when SDL received it,
+# so the measured latency can be up to a frame short of the physical one.
+
+# Actions
+MOVE_LEFT = "left"
+MOVE_RIGHT = "right"
+CONFIRM = "confirm"
+BACK = "back"
+OVERLAY = "overlay"
+CLICK = "click"
+QUIT = "quit"
+
+MOVES = (MOVE_LEFT, MOVE_RIGHT)
+
+KEY_ACTIONS = {
+    pygame.K_LEFT: MOVE_LEFT,
+    pygame.K_a: MOVE_LEFT,
+    pygame.K_RIGHT: MOVE_RIGHT,
+    pygame.K_d: MOVE_RIGHT,
+    pygame.K_RETURN: CONFIRM,
+    pygame.K_ESCAPE: BACK,
+    DEBUG_OVERLAY_KEY: OVERLAY,
+}
+
+# SDL game controllers, which have a standard layout. Devices SDL knows a
+# mapping for are opened as controllers, everything else as a joystick.
+CONTROLLER_BUTTON_ACTIONS = {
+    pygame.CONTROLLER_BUTTON_DPAD_LEFT: MOVE_LEFT,
+    pygame.CONTROLLER_BUTTON_DPAD_RIGHT: MOVE_RIGHT,
+    pygame.CONTROLLER_BUTTON_A: CONFIRM,
+    pygame.CONTROLLER_BUTTON_B: BACK,
+    pygame.CONTROLLER_BUTTON_START: BACK,
+}
+
+# Plain joysticks: the button numbers of the common pads (Xbox layout)
+JOY_BUTTON_ACTIONS = {0: CONFIRM, 1: BACK, 7: BACK}
+
+# time: perf_counter() when read; down: pressed or released; pos: screen
+# position for clicks, else None. A move stays held while any of its sources
+# (a key, button, axis, hat, finger or the bot) is down.
+InputEvent = namedtuple('InputEvent', 'time action down pos')
+
+
+class ActionState(namedtuple('ActionState', 'held pressed time')):
+    # Movement input for one simulation tick: actions held at the end of it,
+    # actions that went down during it, and the earliest event time (or None)
+    __slots__ = ()
+
+    def active(self, action):
+        return action in self.held or action in self.pressed
+
+
+class EventRing:
+    # Fixed-size ring buffer of InputEvents; when full the oldest is dropped
+    def __init__(self, size):
+        self.size = size
+        self.events = [None] * size
+        self.start = 0
+        self.count = 0
+
+    def push(self, event):
+        if self.count == self.size:
+            self.start = (self.start + 1) % self.size
+            self.count -= 1
+            if metrics.enabled:
+                metrics.count("input_dropped")
+        self.events[(self.start + self.count) % self.size] = event
+        self.count += 1
+
+    def pop_until(self, until):
+        # Oldest-first events stamped at or before until
+        taken = []
+        while self.count and self.events[self.start].time <= until:
+            taken.append(self.events[self.start])
+            self.events[self.start] = None
+            self.start = (self.start + 1) % self.size
+            self.count -= 1
+        return taken
+
+    def clear(self):
+        self.events = [None] * self.size
+        self.start = 0
+        self.count = 0
+
+
+class InputSystem:
+    def __init__(self, size=INPUT_BUFFER_SIZE):
+        self.ring = EventRing(size)
+        self.held = {}           # move -> sources holding it down
+        self.pointer = None      # last known pointer position, for hover
+        self.directions = {}     # axis, hat or finger -> the move it holds
+        self.joysticks = {}      # instance id -> open Joystick or Controller
+        self.controllers = set() # instance ids opened as controllers
+        self.deferred = []       # SDL events taken off the queue early
+
+    def poll(self):
+        # Reads the SDL queue; returns this batch of actions for the UI
+        now = time.perf_counter()
+        batch = []
+        events = self.deferred + pygame.event.get()
+        self.deferred = []
+        for event in events:
+            for action, down, pos, source in self.translate(event):
+                batch.append(self.push(action, down, pos, now, source))
+        return batch
+
+    def defer(self, event):
+        # An event read outside poll(); the next poll() handles it first
+        self.deferred.append(event)
+
+    def push(self, action, down, pos=None, now=None, source=None):
+        # Also the entry point for synthetic input such as the bot
+        event = InputEvent(time.perf_counter() if now is None else now, action, down, pos)
+        if action in MOVES:
+            # Only moves wait for the simulation; the rest is handled at once
+            sources = self.held.setdefault(action, set())
+            if down:
+                sources.add(source)
+            else:
+                sources.discard(source)
+                if not sources:
+                    del self.held[action]
+            self.ring.push(event)
+        return event
+
+    def latch(self, until=None):
+        # Movement input for the tick being simulated
+        events = self.ring.pop_until(time.perf_counter() if until is None else until)
+        pressed = frozenset(event.action for event in events if event.down)
+        first = events[0].time if events else None
+        return ActionState(frozenset(self.held), pressed, first)
+
+    def clear(self):
+        # Drops buffered events and held moves, e.g. from the menu or a
+        # previous bot before a new game; a key still down needs a new press
+        self.ring.clear()
+        self.held.clear()
+        self.directions.clear()
+
+    def set_direction(self, source, value, dead_zone=0.5):
+        # Axis, hat or finger position -> at most one held move per source
+        move = MOVE_LEFT if value < -dead_zone else MOVE_RIGHT if value > dead_zone else None
+        old = self.directions.get(source)
+        if move == old:
+            return []
+        self.directions[source] = move
+        changes = []
+        if old:
+            changes.append((old, False, None, source))
+        if move:
+            changes.append((move, True, None, source))
+        return changes
+
+    def translate(self, event):
+        # (action, down, pos, source) for an SDL event; most events map to
+        # nothing. source tells apart the keys, buttons, sticks and fingers
+        # holding the same move.
+        kind = event.type
+        if kind == pygame.QUIT:
+            return [(QUIT, True, None, None)]
+        if kind in (pygame.KEYDOWN, pygame.KEYUP):
+            action = KEY_ACTIONS.get(event.key)
+            return [(action, kind == pygame.KEYDOWN, None, ("key", event.key))] if action else []
+
+        if kind in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+            # SDL mirrors touches as mouse events; the FINGER events cover those
+            if getattr(event, "touch", False):
+                return []
+            self.pointer = event.pos
+            if kind == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                return [(CLICK, True, event.pos, None)]
+            return []
+
+        if kind in (pygame.FINGERDOWN, pygame.FINGERMOTION, pygame.FINGERUP):
+            # Holding a finger on the left or right half of the screen moves
+            # that way; a tap is also a click where it lands
+            pos = (int(event.x * WIDTH), int(event.y * HEIGHT))
+            source = ("finger", event.touch_id, event.finger_id)
+            if kind == pygame.FINGERUP:
+                return self.set_direction(source, 0)
+            self.pointer = pos
+            changes = self.set_direction(source, event.x * 2 - 1, dead_zone=0)
+            if kind == pygame.FINGERDOWN:
+                changes.append((CLICK, True, pos, None))
+            return changes
+
+        if kind in (pygame.CONTROLLERBUTTONDOWN, pygame.CONTROLLERBUTTONUP):
+            action = CONTROLLER_BUTTON_ACTIONS.get(event.button)
+            source = ("button", event.instance_id, event.button)
+            return [(action, kind == pygame.CONTROLLERBUTTONDOWN, None, source)] if action else []
+        if kind == pygame.CONTROLLERAXISMOTION:
+            if event.axis != pygame.CONTROLLER_AXIS_LEFTX:
+                return []
+            return self.set_direction(("axis", event.instance_id), event.value / 32767)
+
+        if kind in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYHATMOTION,
+                    pygame.JOYAXISMOTION) and event.instance_id in self.controllers:
+            # An open controller also reports through its joystick
+            return []
+        if kind in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            action = JOY_BUTTON_ACTIONS.get(event.button)
+            source = ("button", event.instance_id, event.button)
+            return [(action, kind == pygame.JOYBUTTONDOWN, None, source)] if action else []
+        if kind == pygame.JOYHATMOTION:
+            return self.set_direction(("hat", event.instance_id, event.hat), event.value[0])
+        if kind == pygame.JOYAXISMOTION:
+            if event.axis != 0:
+                return []
+            return self.set_direction(("axis", event.instance_id), event.value)
+        if kind == pygame.JOYDEVICEADDED:
+            # Devices only send events once opened; SDL sends this for
+            # controllers too
+            self.open_device(event.device_index)
+            return []
+        if kind in (pygame.JOYDEVICEREMOVED, pygame.CONTROLLERDEVICEREMOVED):
+            if self.joysticks.pop(event.instance_id, None) is None:
+                return []
+            self.controllers.discard(event.instance_id)
+            return self.release_sources(event.instance_id)
+
+        if kind == pygame.WINDOWFOCUSLOST:
+            # Key-ups go to the other window; don't leave moves stuck down.
+            # The bot (source None) isn't affected and keeps its move.
+            return self.release_sources()
+        return []
+
+    def open_device(self, index):
+        if sdl_controller and sdl_controller.is_controller(index):
+            if not sdl_controller.get_init():
+                sdl_controller.init()
+            device = sdl_controller.Controller(index)
+            instance_id = device.as_joystick().get_instance_id()
+            self.controllers.add(instance_id)
+        else:
+            device = pygame.joystick.Joystick(index)
+            instance_id = device.get_instance_id()
+        self.joysticks[instance_id] = device
+
+    def release_sources(self, instance_id=None):
+        # Releases the moves held by a device's buttons, axes and hats, or by
+        # every physical source if instance_id is None
+        def matches(source):
+            if source is None:
+                return False
+            return instance_id is None or (source[0] in ("button", "axis", "hat") and source[1] == instance_id)
+
+        for source in list(self.directions):
+            if matches(source):
+                del self.directions[source]
+        return [(action, False, None, source)
+                for action, sources in self.held.items()
+                for source in sources if matches(source)]
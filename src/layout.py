@@ -0,0 +1,89 @@
+from collections import namedtuple
+from settings import *
+from resources import get_font, font_key
+
+# Card layout. Every snippet is measured once with Font.size, and its card is
+# sized to fit the text plus padding instead of getting a random width. Lines
+# wider than the card's maximum text width are wrapped at spaces, which in
+# practice only happens for the longer snippets of the harder tiers; explicit
+# newlines in a snippet are kept. Layouts are computed for the whole corpus
+# at startup (precompute), so nothing is measured during gameplay.
+
+# width, height: card body size; lines: ((text, x, y), ...) relative to the
+# card body's top-left corner
+CardLayout = namedtuple('CardLayout', 'width height lines')
+
+_metrics = {}
+_layouts = {}
+
+
+def card_font():
+    return get_font(GAME_FONT_MONO, CARD_FONT_SIZE)
+
+
+def text_size(font, text):
+    # Font.size, cached per (font, text)
+    key = (font_key(font), text)
+    size = _metrics.get(key)
+    if size is None:
+        size = _metrics[key] = font.size(text)
+    return size
+
+
+def wrap(font, text, max_width):
+    # Greedy word wrap; a single word wider than max_width gets its own line.
+    # Indentation is kept, also on the lines a paragraph wraps onto.
+    lines = []
+    for paragraph in text.split("\n"):
+        words = paragraph.lstrip(" ")
+        indent = paragraph[:len(paragraph) - len(words)]
+        line = indent
+        for word in words.split(" "):
+            if line == indent:
+                line += word
+                continue
+            candidate = line + " " + word
+            if text_size(font, candidate)[0] > max_width:
+                lines.append(line)
+                line = indent + word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def card_layout(text):
+    layout = _layouts.get(text)
+    if layout is None:
+        layout = _layouts[text] = measure_card(text)
+    return layout
+
+
+def measure_card(text):
+    font = card_font()
+    max_text_width = CARD_WIDTH_MAX - 2 * CARD_PADDING_X
+    lines = wrap(font, text, max_text_width)
+    sizes = [text_size(font, line) for line in lines]
+    line_height = font.get_linesize()
+
+    text_width = max(width for width, _ in sizes)
+    text_height = line_height * (len(lines) - 1) + sizes[-1][1]
+    width = max(CARD_WIDTH_MIN, text_width + 2 * CARD_PADDING_X)
+    height = max(CARD_HEIGHT, text_height + 2 * CARD_PADDING_Y)
+
+    # A single line is centred; wrapped lines share a left edge, centred as a block
+    top = (height - text_height) // 2
+    if len(lines) == 1:
+        placed = ((lines[0], (width - text_width) // 2, top),)
+    else:
+        left = (width - text_width) // 2
+        placed = tuple((line, left, top + i * line_height) for i, line in enumerate(lines))
+    return CardLayout(width, height, placed)
+
+
+def precompute(tiers):
+    # Lay out every snippet up front; returns the number of layouts
+    for correct, bugs in tiers:
+        for text in correct + bugs:
+            card_layout(text)
+    return len(_layouts)
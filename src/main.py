@@ -1,23 +1,119 @@
 import sys
+import argparse
 import pygame
 from settings import *
 from game import Game
+from idle import IdleScheduler
+from metrics import metrics, MetricsExporter
+from renderer import create_renderer
+from atlas import atlas
+from config import load_profile, profile_names
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Code Catcher")
+    parser.add_argument("--autoplay", action="store_true", help="let the bot play")
+    parser.add_argument("--bot-delay", type=int, default=8, help="bot reaction delay in frames")
+    parser.add_argument("--bot-errors", type=float, default=0.05, help="chance the bot misreads a snippet")
+    parser.add_argument("--metrics", action="store_true", help="show the performance overlay (toggle with F3)")
+    parser.add_argument("--metrics-out", help="export metrics to a file, udp://host:port or tcp://host:port")
+    parser.add_argument("--metrics-format", choices=["json", "prometheus"], default="json")
+    parser.add_argument("--renderer", choices=["software", "texture"], default=RENDERER,
+                        help="draw with software blits or the SDL2 texture renderer")
+    parser.add_argument("--atlas", choices=["sync", "worker", "off"], default=ATLAS_MODE,
+                        help="build the sprite atlas before starting, in a worker process, or not at all")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="draw gameplay frames on a render thread while the next tick is simulated")
+    parser.add_argument("--classroom", metavar="HOST[:PORT]",
+                        help="join a classroom session server (see classroom.py)")
+    parser.add_argument("--name", help="player name shown to the classroom")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the session to a .gif/.png/.webp, a video file via ffmpeg, or a folder of PNGs")
+    parser.add_argument("--record-fps", type=int, default=RECORD_FPS, help="frames per second to record")
+    parser.add_argument("--memdiag", metavar="DIR", help="write memory diagnostics reports to DIR")
+    parser.add_argument("--memdiag-interval", type=float, default=MEMDIAG_INTERVAL,
+                        help="seconds between periodic memory reports")
+    parser.add_argument("--profile", metavar="NAME|PATH",
+                        help=f"gameplay profile ({', '.join(profile_names())}) or a .toml/.json file; "
+                             "defaults to classroom with --classroom")
+    args = parser.parse_args(argv)
+    try:
+        args.config = load_profile(args.profile or ("classroom" if args.classroom else "default"))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
     pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Code Catcher")
+    renderer, screen = create_renderer(args.renderer, (WIDTH, HEIGHT), "Code Catcher")
     clock = pygame.time.Clock()
+    atlas.load_or_build(args.atlas)
     
-    game = Game(screen)
+    game = Game(screen, renderer, args.config)
+    if args.autoplay:
+        from bot import BotPolicy
+        game.controller = BotPolicy(reaction_delay=args.bot_delay, error_rate=args.bot_errors)
+    scheduler = IdleScheduler(clock, game.inputs)
+    pipeline = None
+    if args.pipeline:
+        if renderer.name == "software":
+            from pipeline import RenderPipeline
+            pipeline = RenderPipeline(game)
+        else:
+            print("--pipeline needs the software renderer, drawing on the main thread")
+    if args.metrics:
+        metrics.toggle_overlay()
+    if args.metrics_out:
+        metrics.set_exporter(MetricsExporter(args.metrics_out, args.metrics_format))
+    if args.classroom:
+        from classroom import ClassroomClient
+        host, _, port = args.classroom.partition(":")
+        try:
+            game.session = ClassroomClient(host, int(port or CLASSROOM_PORT), args.name).start()
+            # Same cards at the same time for everyone: no adaptive difficulty
+            game.difficulty.adaptive = False
+        except ConnectionError as e:
+            print(f"{e}, playing alone")
+    if args.record:
+        from recorder import Recorder
+        game.recorder = Recorder(args.record, (WIDTH, HEIGHT), fps=args.record_fps)
+    if args.memdiag:
+        from memdiag import MemoryDiagnostics
+        game.memdiag = MemoryDiagnostics(args.memdiag, interval=args.memdiag_interval)
     
     running = True
     while running:
+        timed = metrics.enabled
+        if timed:
+            metrics.begin_frame()
         running = game.handle_events()
+        if timed:
+            metrics.mark('events')
         game.update()
-        game.draw()
-        clock.tick(FPS)  # Control the game frame rate
+        if timed:
+            metrics.mark('update')
+        if pipeline:
+            pipeline.draw()
+        else:
+            game.draw()
+        scheduler.tick(game.is_animating())  # FPS while animating, sleep on input when idle
+        if timed and metrics.enabled:
+            metrics.end_frame(game)
+        if not scheduler.idle:
+            game.quality_governor.record(clock.get_rawtime())
+        if game.memdiag:
+            game.memdiag.tick(game)
+        if atlas.pending:
+            atlas.poll()
     
+    if pipeline:
+        pipeline.close()
+    if game.session:
+        game.session.close()
+    if game.recorder:
+        game.recorder.close()
+    if game.memdiag:
+        game.memdiag.close(game)
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+import pygame
+from settings import *
+from metrics import read_rss
+
+# Memory diagnostics for long unattended sessions. Periodically takes a
+# tracemalloc snapshot and writes the top allocation sites (by line and by
+# module) plus a census of live pygame Surfaces to disk. At every game restart
+# it records traced memory, RSS and the surface count, and flags memory that
+# keeps growing from one restart to the next.
+
+
+# The real Surface class. metrics.py swaps pygame.Surface for a counting
+# subclass while its overlay is on, and surfaces made from the original (or
+# before the swap) are not instances of that.
+Surface = pygame.surface.Surface
+
+
+def count_surfaces():
+    # Surfaces are not tracked by the garbage collector themselves, so look
+    # for them among the referents of everything that is
+    seen = set()
+    by_size = {}
+    total_bytes = 0
+    for obj in gc.get_objects():
+        for ref in gc.get_referents(obj):
+            if isinstance(ref, Surface) and id(ref) not in seen:
+                seen.add(id(ref))
+                size = ref.get_size()
+                by_size[size] = by_size.get(size, 0) + 1
+                total_bytes += size[0] * size[1] * ref.get_bytesize()
+    largest = sorted(by_size.items(), key=lambda item: item[0][0] * item[0][1] * item[1], reverse=True)
+    return {
+        "count": len(seen),
+        "pixel_bytes": total_bytes,
+        "by_size": [{"size": list(size), "count": count} for size, count in largest[:MEMDIAG_TOP]],
+    }
+
+
+def module_name(filename):
+    # Shorten a path to something like "game.py" or "pygame/sprite.py"
+    for path in sorted((os.path.abspath(p) for p in sys.path if p), key=len, reverse=True):
+        if filename.startswith(path + os.sep):
+            return os.path.relpath(filename, path)
+    return filename
+
+
+class MemoryDiagnostics:
+    def __init__(self, out_dir, interval=MEMDIAG_INTERVAL, frames=MEMDIAG_FRAMES):
+        self.out_dir = out_dir
+        self.interval = interval
+        os.makedirs(out_dir, exist_ok=True)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.started = time.time()
+        self.last_report = time.monotonic()
+        self.baseline = self.take_snapshot()
+        self.restarts = []
+        self.report_count = 0
+
+    def take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def tick(self, game):
+        if time.monotonic() - self.last_report >= self.interval:
+            self.report(game)
+
+    def report(self, game, reason="interval"):
+        self.last_report = time.monotonic()
+        snapshot = self.take_snapshot()
+
+        by_line = []
+        for stat in snapshot.compare_to(self.baseline, "lineno")[:MEMDIAG_TOP]:
+            frame = stat.traceback[0]
+            by_line.append({
+                "where": f"{module_name(frame.filename)}:{frame.lineno}",
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            })
+
+        by_module = {}
+        for stat in snapshot.statistics("filename"):
+            name = module_name(stat.traceback[0].filename)
+            by_module[name] = by_module.get(name, 0) + stat.size
+        top_modules = sorted(by_module.items(), key=lambda item: item[1], reverse=True)[:MEMDIAG_TOP]
+
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "reason": reason,
+            "t": round(time.time(), 3),
+            "uptime": round(time.time() - self.started, 1),
+            "state": game.state,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "rss_bytes": read_rss(),
+            "surfaces": count_surfaces(),
+            "objects": len(game.objects),
+            "particles": len(game.particles),
+            "top_lines": by_line,
+            "top_modules": [{"module": name, "size": size} for name, size in top_modules],
+            "restarts": len(self.restarts),
+            "growth": self.growth(),
+        }
+
+        self.report_count += 1
+        path = os.path.join(self.out_dir, f"memory-{self.report_count:05d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def on_restart(self, game):
+        # Called from Game.start_game; compare like with like at each restart
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        sample = {
+            "t": round(time.time(), 3),
+            "restart": len(self.restarts) + 1,
+            "traced_bytes": current,
+            "rss_bytes": read_rss(),
+            "surfaces": count_surfaces()["count"],
+        }
+        self.restarts.append(sample)
+
+        growth = self.growth()
+        previous = self.restarts[-2] if len(self.restarts) > 1 else {}
+        sample["growth_suspected"] = growth["suspected"]
+        with open(os.path.join(self.out_dir, "restarts.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(sample) + "\n")
+        # Report once when growth is first noticed, not at every restart after
+        if growth["suspected"] and not previous.get("growth_suspected", False):
+            print(f"memdiag: memory grew over the last {MEMDIAG_GROWTH_WINDOW} restarts "
+                  f"(+{growth['traced_bytes']} traced bytes, +{growth['surfaces']} surfaces)",
+                  file=sys.stderr)
+            self.report(game, reason="growth")
+
+    def growth(self):
+        # Growth is suspected when traced memory rose at every one of the last
+        # MEMDIAG_GROWTH_WINDOW restarts and by more than MEMDIAG_GROWTH_MIN_BYTES
+        window = self.restarts[-(MEMDIAG_GROWTH_WINDOW + 1):]
+        if len(window) <= MEMDIAG_GROWTH_WINDOW:
+            return {"suspected": False, "traced_bytes": 0, "surfaces": 0}
+        traced = [sample["traced_bytes"] for sample in window]
+        rising = all(b > a for a, b in zip(traced, traced[1:]))
+        total = traced[-1] - traced[0]
+        return {
+            "suspected": rising and total > MEMDIAG_GROWTH_MIN_BYTES,
+            "traced_bytes": total,
+            "surfaces": window[-1]["surfaces"] - window[0]["surfaces"],
+        }
+
+    def close(self, game):
+        self.report(game, reason="exit")
@@ -0,0 +1,382 @@
+import collections
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+import pygame
+from settings import *
+from resources import get_font
+
+# Runtime instrumentation: frame and phase timings, object/particle counts,
+# surface allocations, cache hit rates and RSS. Drawn as a debug overlay
+# (toggle with DEBUG_OVERLAY_KEY) and optionally exported as JSON lines or
+# Prometheus text. Callers check `metrics.enabled` before recording anything,
+# so a disabled instance costs one attribute lookup per call site.
+
+
+def read_rss():
+    # Resident set size in bytes, or None if the platform gives us nothing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        import resource
+        # Peak rather than current, but better than nothing (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return None
+
+
+class AllocationCounter:
+    # Counts Surface creation by swapping pygame.Surface, pygame.font.Font and
+    # the transform functions for counting versions while installed. Surfaces
+    # created by code that captured the originals earlier are not seen.
+    def __init__(self):
+        self.count = 0
+        self.originals = None
+
+    def install(self):
+        if self.originals:
+            return
+        counter = self
+        surface_cls = pygame.Surface
+        font_cls = pygame.font.Font
+
+        class CountingSurface(surface_cls):
+            def __init__(self, *args, **kwargs):
+                counter.count += 1
+                super().__init__(*args, **kwargs)
+
+        class CountingFont(font_cls):
+            def render(self, *args, **kwargs):
+                counter.count += 1
+                return super().render(*args, **kwargs)
+
+        def counted(func):
+            def wrapper(*args, **kwargs):
+                counter.count += 1
+                return func(*args, **kwargs)
+            return wrapper
+
+        self.originals = {
+            "Surface": surface_cls,
+            "Font": font_cls,
+            "rotate": pygame.transform.rotate,
+            "scale": pygame.transform.scale,
+            "smoothscale": pygame.transform.smoothscale,
+        }
+        pygame.Surface = CountingSurface
+        pygame.font.Font = CountingFont
+        pygame.transform.rotate = counted(self.originals["rotate"])
+        pygame.transform.scale = counted(self.originals["scale"])
+        pygame.transform.smoothscale = counted(self.originals["smoothscale"])
+
+    def uninstall(self):
+        if not self.originals:
+            return
+        pygame.Surface = self.originals["Surface"]
+        pygame.font.Font = self.originals["Font"]
+        pygame.transform.rotate = self.originals["rotate"]
+        pygame.transform.scale = self.originals["scale"]
+        pygame.transform.smoothscale = self.originals["smoothscale"]
+        self.originals = None
+
+
+class Metrics:
+    PHASES = ("events", "update", "draw", "flip", "sleep")
+
+    def __init__(self, history=METRICS_HISTORY):
+        self.enabled = False
+        self.overlay_visible = False
+        self.exporter = None
+        self.allocations = AllocationCounter()
+        self.frame_times = collections.deque(maxlen=history)
+        self.latencies = collections.deque(maxlen=history)
+        self.phases = {phase: 0.0 for phase in self.PHASES}
+        self.counters = {}
+        self.caches = {}
+        self.frame = 0
+        self.frame_started = 0.0
+        self.last_mark = 0.0
+        self.surfaces_per_frame = 0
+        self.rss = None
+        self.last_export = 0.0
+        self.font = None
+
+    # -- switching on and off
+
+    def update_enabled(self):
+        enabled = self.overlay_visible or self.exporter is not None
+        if enabled and not self.enabled:
+            self.allocations.install()
+            self.frame_started = self.last_mark = time.perf_counter()
+        elif not enabled and self.enabled:
+            self.allocations.uninstall()
+        self.enabled = enabled
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.update_enabled()
+
+    def set_exporter(self, exporter):
+        self.exporter = exporter
+        self.update_enabled()
+
+    # -- recording; only call these when self.enabled
+
+    def begin_frame(self):
+        self.frame_started = self.last_mark = time.perf_counter()
+        self.allocations.count = 0
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self, game):
+        self.mark("sleep")
+        self.frame_times.append((self.last_mark - self.frame_started) * 1000)
+        self.surfaces_per_frame = self.allocations.count
+        self.counters["objects"] = len(game.objects)
+        self.counters["particles"] = len(game.particles)
+        self.counters["trail_particles"] = sum(len(obj.particles) for obj in game.objects)
+        self.frame += 1
+
+        # RSS is a syscall; once a second is plenty
+        if self.frame % FPS == 1:
+            self.rss = read_rss()
+        if self.exporter and self.last_mark - self.last_export >= METRICS_EXPORT_INTERVAL:
+            self.last_export = self.last_mark
+            self.rss = read_rss()
+            self.exporter.export(self.snapshot(game))
+
+    def record_latency(self, ms):
+        # Time from polling input to presenting the frame that reflects it
+        self.latencies.append(ms)
+
+    def cache_hit(self, name):
+        self.caches.setdefault(name, [0, 0])[0] += 1
+
+    def cache_miss(self, name):
+        self.caches.setdefault(name, [0, 0])[1] += 1
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    # -- reporting
+
+    def fps(self):
+        if not self.frame_times:
+            return 0.0
+        average = sum(self.frame_times) / len(self.frame_times)
+        return 1000 / average if average else 0.0
+
+    def frame_percentile(self, fraction, samples=None):
+        if samples is None:
+            samples = self.frame_times
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[int(fraction * (len(ordered) - 1))]
+
+    def cache_ratios(self):
+        ratios = {}
+        for name, (hits, misses) in self.caches.items():
+            total = hits + misses
+            ratios[name] = hits / total if total else 0.0
+        return ratios
+
+    def snapshot(self, game):
+        return {
+            "t": round(time.time(), 3),
+            "frame": self.frame,
+            "state": game.state,
+            "fps": round(self.fps(), 2),
+            "frame_ms_p50": round(self.frame_percentile(0.5), 3),
+            "frame_ms_p95": round(self.frame_percentile(0.95), 3),
+            "input_latency_ms_p50": round(self.frame_percentile(0.5, self.latencies), 3),
+            "input_latency_ms_p95": round(self.frame_percentile(0.95, self.latencies), 3),
+            "phase_ms": {phase: round(ms, 3) for phase, ms in self.phases.items()},
+            "counters": dict(self.counters),
+            "surface_allocs": self.surfaces_per_frame,
+            "cache_hit_ratio": {name: round(r, 4) for name, r in self.cache_ratios().items()},
+            "rss_bytes": self.rss,
+            "quality": game.quality['name'],
+        }
+
+    def draw_overlay(self, renderer, game):
+        # Allocations made by the overlay itself are not charged to the frame
+        allocations = self.allocations.count
+        if self.font is None:
+            self.font = get_font(GAME_FONT_MONO, FONT_TINY - 2)
+
+        lines = [
+            f"FPS {self.fps():5.1f}  p50 {self.frame_percentile(0.5):5.1f}ms  p95 {self.frame_percentile(0.95):5.1f}ms",
+            "  ".join(f"{phase} {self.phases[phase]:.1f}" for phase in self.PHASES[:4]),
+            f"input latency p50 {self.frame_percentile(0.5, self.latencies):5.1f}ms  "
+            f"p95 {self.frame_percentile(0.95, self.latencies):5.1f}ms",
+            f"objects {self.counters.get('objects', 0)}  particles {self.counters.get('particles', 0)}"
+            f"+{self.counters.get('trail_particles', 0)}",
+            f"surfaces/frame {self.surfaces_per_frame}  quality {game.quality['name']}",
+        ]
+        for name, ratio in sorted(self.cache_ratios().items()):
+            lines.append(f"cache {name} {ratio:.0%}")
+        if self.rss is not None:
+            lines.append(f"RSS {self.rss / (1024 * 1024):.1f} MiB")
+
+        line_height = self.font.get_linesize()
+        graph_height = 40
+        panel = pygame.Rect(WIDTH - 310, 80, 300, len(lines) * line_height + graph_height + 16)
+        panel_surf = pygame.Surface(panel.size, pygame.SRCALPHA)
+        panel_surf.fill((0, 0, 0, 170))
+
+        for i, line in enumerate(lines):
+            panel_surf.blit(self.font.render(line, True, LIGHT_GREEN), (6, 4 + i * line_height))
+
+        # Frame time graph; the line marks the frame budget
+        graph_top = panel.height - graph_height - 6
+        budget = 1000 / FPS
+        scale = graph_height / (budget * 2)
+        bar_width = max(1, (panel.width - 12) // max(1, self.frame_times.maxlen))
+        for i, ms in enumerate(self.frame_times):
+            height = min(graph_height, int(ms * scale))
+            color = GREEN if ms <= budget else RED
+            pygame.draw.rect(panel_surf, color,
+                             (6 + i * bar_width, graph_top + graph_height - height, bar_width, height))
+        budget_y = graph_top + graph_height - int(budget * scale)
+        pygame.draw.line(panel_surf, WHITE, (6, budget_y), (panel.width - 6, budget_y))
+
+        renderer.blit(panel_surf, panel.topleft)
+        self.allocations.count = allocations
+
+
+class MetricsExporter:
+    # target is a file path, or udp://host:port / tcp://host:port. TCP
+    # connects and sends on a background thread, so a slow or missing
+    # collector never stalls a frame; samples that arrive while it is
+    # disconnected or backed up are dropped.
+    def __init__(self, target, fmt="json"):
+        self.target = target
+        self.format = fmt
+        self.sock = None
+        self.address = None
+        if "://" in target:
+            scheme, _, rest = target.partition("://")
+            host, _, port = rest.rpartition(":")
+            self.scheme = scheme
+            self.address = (host or "127.0.0.1", int(port))
+        else:
+            self.scheme = "file"
+            directory = os.path.dirname(target)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        if self.scheme == "tcp":
+            self.pending = queue.Queue(METRICS_QUEUE)
+            self.dropped = 0
+            threading.Thread(target=self.send_loop, name="metrics-tcp", daemon=True).start()
+
+    def render(self, snapshot):
+        if self.format == "prometheus":
+            return prometheus_text(snapshot)
+        return json.dumps(snapshot, separators=(",", ":")) + "\n"
+
+    def export(self, snapshot):
+        payload = self.render(snapshot)
+        if self.scheme == "tcp":
+            try:
+                self.pending.put_nowait(payload.encode())
+            except queue.Full:
+                self.dropped += 1
+            return
+        try:
+            if self.scheme == "file":
+                self.write_file(payload)
+            elif self.scheme == "udp":
+                if self.sock is None:
+                    self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self.sock.sendto(payload.encode(), self.address)
+        except OSError:
+            # Metrics are best effort; drop the sample
+            if self.sock:
+                self.sock.close()
+            self.sock = None
+
+    def send_loop(self):
+        # Runs on the sender thread; reconnects with exponential backoff
+        delay = METRICS_RECONNECT_MIN
+        retry_at = 0.0
+        while True:
+            data = self.pending.get()
+            if self.sock is None:
+                if time.monotonic() < retry_at:
+                    self.dropped += 1
+                    continue
+                try:
+                    self.sock = socket.create_connection(self.address, timeout=1.0)
+                    delay = METRICS_RECONNECT_MIN
+                except OSError:
+                    retry_at = time.monotonic() + delay
+                    delay = min(delay * 2, METRICS_RECONNECT_MAX)
+                    self.dropped += 1
+                    continue
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.sock.close()
+                self.sock = None
+                retry_at = time.monotonic() + delay
+                self.dropped += 1
+
+    def write_file(self, payload):
+        if self.format == "prometheus":
+            # Textfile-collector style: the file always holds the latest sample
+            tmp_path = self.target + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.target)
+        else:
+            with open(self.target, "a", encoding="utf-8") as f:
+                f.write(payload)
+
+
+def prometheus_text(snapshot):
+    lines = [
+        "# TYPE codecatcher_fps gauge",
+        f"codecatcher_fps {snapshot['fps']}",
+        "# TYPE codecatcher_frame_ms gauge",
+        f'codecatcher_frame_ms{{quantile="0.5"}} {snapshot["frame_ms_p50"]}',
+        f'codecatcher_frame_ms{{quantile="0.95"}} {snapshot["frame_ms_p95"]}',
+        "# TYPE codecatcher_input_latency_ms gauge",
+        f'codecatcher_input_latency_ms{{quantile="0.5"}} {snapshot["input_latency_ms_p50"]}',
+        f'codecatcher_input_latency_ms{{quantile="0.95"}} {snapshot["input_latency_ms_p95"]}',
+        "# TYPE codecatcher_phase_ms gauge",
+    ]
+    for phase, ms in snapshot["phase_ms"].items():
+        lines.append(f'codecatcher_phase_ms{{phase="{phase}"}} {ms}')
+    lines.append("# TYPE codecatcher_count gauge")
+    for name, value in snapshot["counters"].items():
+        lines.append(f'codecatcher_count{{name="{name}"}} {value}')
+    lines.append("# TYPE codecatcher_surface_allocs_per_frame gauge")
+    lines.append(f"codecatcher_surface_allocs_per_frame {snapshot['surface_allocs']}")
+    lines.append("# TYPE codecatcher_cache_hit_ratio gauge")
+    for name, ratio in snapshot["cache_hit_ratio"].items():
+        lines.append(f'codecatcher_cache_hit_ratio{{cache="{name}"}} {ratio}')
+    if snapshot["rss_bytes"] is not None:
+        lines.append("# TYPE codecatcher_rss_bytes gauge")
+        lines.append(f"codecatcher_rss_bytes {snapshot['rss_bytes']}")
+    return "\n".join(lines) + "\n"
+
+
+# Shared instance used by the game loop
+metrics = Metrics()
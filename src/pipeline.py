@@ -0,0 +1,114 @@
+import threading
+import time
+from settings import *
+from metrics import metrics
+from scenes import GameplayScene
+
+# Pipelined rendering for gameplay (main.py --pipeline). After each
+# simulation tick the game is copied into an immutable FrameState and handed
+# to a render thread, which draws it while the main thread sleeps, polls input
+# and simulates the next tick. pygame releases the GIL during blits, so on a
+# multi-core machine drawing overlaps the simulation.
+#
+# There are two state slots: the frame being drawn and the frame drawn and
+# waiting to be shown. The main thread presents a frame before handing over
+# the next one, so the render thread is never more than one frame behind:
+# input shows up on screen one frame later than in the sequential loop, and
+# no more. Both loops report input-to-present latency to metrics for frames
+# that applied input.
+#
+# Only the software renderer is supported, since SDL renderers must be used
+# from the thread that created them. Menus and overlays are drawn on the main
+# thread as before.
+
+
+class RenderPipeline:
+    def __init__(self, game):
+        self.game = game
+        self.renderer = game.renderer
+        self.condition = threading.Condition()
+        self.submitted = None  # (scene, state) the render thread is drawing
+        self.drawn = None      # state drawn and waiting to be presented
+        self.running = True
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="render", daemon=True)
+        self.thread.start()
+
+    def active(self):
+        scene = self.game.scene
+        return isinstance(scene, GameplayScene) and not self.game.game_over
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.submitted is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                scene, state = self.submitted
+            try:
+                self.draw_state(scene, state)
+            except Exception as e:
+                # Surface the error on the main thread instead of hanging it
+                self.error = e
+            with self.condition:
+                self.drawn = state
+                self.submitted = None
+                self.condition.notify_all()
+
+    def draw_state(self, scene, state):
+        renderer = self.renderer
+        renderer.begin_frame()
+        scene.draw(renderer, state)
+        if metrics.overlay_visible:
+            metrics.draw_overlay(renderer, self.game)
+
+    def draw(self):
+        # Called by the main loop instead of Game.draw
+        if not self.active():
+            self.flush()
+            self.game.draw()
+            return
+        state = self.game.snapshot()
+        self.game.input_time = None
+        self.present()
+        with self.condition:
+            self.submitted = (self.game.scene, state)
+            self.condition.notify_all()
+
+    def wait(self):
+        with self.condition:
+            while self.submitted is not None:
+                self.condition.wait()
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+
+    def present(self):
+        # Show the last frame the render thread finished
+        self.wait()
+        if metrics.enabled:
+            metrics.mark('draw')
+        if self.drawn is None:
+            return
+        self.renderer.present()
+        if self.game.recorder:
+            # Before the next frame is handed to the render thread
+            self.game.recorder.capture(self.renderer)
+        if metrics.enabled:
+            metrics.mark('flip')
+            if self.drawn.input_time is not None:
+                metrics.record_latency((time.perf_counter() - self.drawn.input_time) * 1000)
+        self.drawn = None
+
+    def flush(self):
+        # Finish and show any frame in flight before drawing on this thread
+        if self.submitted is not None or self.drawn is not None:
+            self.present()
+
+    def close(self):
+        self.flush()
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join()
@@ -1,5 +1,10 @@
 import pygame
+from collections import namedtuple
 from settings import *
+from renderer import render_text
+from resources import get_font
+from atlas import atlas
+from input_events import MOVE_LEFT, MOVE_RIGHT
 
 class Player:
     def __init__(self):
@@ -23,14 +28,15 @@ class Player:
         self.active_animation = 0
         self.animation_speed = 0.2
         
-    def update(self, keys):
+    def update(self, controls):
+        # controls: the ActionState latched for this tick
         # Store previous position for trail effect
         prev_pos = self.rect.copy()
         
         # Handle horizontal movement
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if controls.active(MOVE_LEFT):
             self.x -= self.speed
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if controls.active(MOVE_RIGHT):
             self.x += self.speed
             
         # Keep player within screen bounds
@@ -51,33 +57,26 @@ class Player:
         # Add to trail if we moved
         if prev_pos.x != self.rect.x:
             self.trail.append(prev_pos.copy())
-            # Keep trail at max length
-            if len(self.trail) > self.max_trail:
-                self.trail.pop(0)
+        # Keep trail at max length
+        while len(self.trail) > self.max_trail:
+            self.trail.pop(0)
         
-    def draw(self, screen, player_img=None):
+    def draw(self, renderer, player_img=None):
         # Draw trail with decreasing opacity
         for i, trail_rect in enumerate(self.trail):
             alpha = int(128 * ((i + 1) / len(self.trail)))
-            trail_surf = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            trail_surf.fill((*BLUE[:3], alpha))
-            screen.blit(trail_surf, trail_rect)
+            renderer.fill((*BLUE[:3], alpha), trail_rect)
         
         # Draw player using image if available
         if player_img:
-            screen.blit(player_img, (self.rect.x - 15, self.rect.y - 15))
+            renderer.blit(player_img, (self.rect.x - 15, self.rect.y - 15))
         else:
             # Draw a code catcher (basket-like receptacle)
-            # Main body with gradient
-            gradient_rect = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            for y in range(self.height):
-                alpha = 255 - int(150 * (y / self.height))
-                color = (*BLUE[:3], alpha)
-                pygame.draw.line(gradient_rect, color, (0, y), (self.width, y))
-            screen.blit(gradient_rect, self.rect)
+            # Main body with gradient, drawn once
+            renderer.blit(body_sprite(self.width, self.height), self.rect.topleft)
             
             # Draw border
-            pygame.draw.rect(screen, BLUE, self.rect, 2, border_radius=5)
+            renderer.rect(BLUE, self.rect, 2, border_radius=5)
             
             # Add some visual flair - an animated "reception" indicator
             indicators = [
@@ -92,9 +91,40 @@ class Player:
             for dot_pos in indicators[active_index]:
                 dot_x = self.rect.x + dot_pos[0]
                 dot_y = self.rect.y + dot_pos[1]
-                pygame.draw.circle(screen, LIGHT_BLUE, (dot_x, dot_y), 3)
+                renderer.circle(LIGHT_BLUE, (dot_x, dot_y), 3)
                 
             # Add text to indicate function
-            font = pygame.font.Font(GAME_FONT_MONO, FONT_TINY)
-            text = font.render("def catch():", True, WHITE)
-            screen.blit(text, (self.rect.x + 10, self.rect.y + 8))
\ No newline at end of file
+            font = get_font(GAME_FONT_MONO, FONT_TINY)
+            text = render_text(font, "def catch():", WHITE)
+            renderer.blit(text, (self.rect.x + 10, self.rect.y + 8))
+
+    def snapshot(self):
+        return PlayerState(
+            self.rect.copy(),
+            tuple(trail_rect.copy() for trail_rect in self.trail),
+            self.width, self.height, self.active_animation
+        )
+
+class PlayerState(namedtuple('PlayerState', 'rect trail width height active_animation')):
+    # Copy of everything Player.draw reads, owned by the render thread
+    __slots__ = ()
+    draw = Player.draw
+
+_bodies = {}
+
+def body_sprite(width, height):
+    key = ('player_body', width, height)
+    body = atlas.get(key) if atlas.regions else None
+    if body is None:
+        body = _bodies.get(key)
+        if body is None:
+            body = _bodies[key] = make_body(width, height)
+    return body
+
+def make_body(width, height):
+    body = pygame.Surface((width, height), pygame.SRCALPHA)
+    for y in range(height):
+        alpha = 255 - int(150 * (y / height))
+        color = (*BLUE[:3], alpha)
+        pygame.draw.line(body, color, (0, y), (width, y))
+    return body
@@ -0,0 +1,54 @@
+from settings import *
+
+# Quality governor: watches how long each frame takes to update and draw and
+# steps through QUALITY_TIERS to keep that under the frame budget. Separate
+# thresholds and window counts for going down and up give it hysteresis, so it
+# does not flap between two tiers.
+
+
+class QualityGovernor:
+    def __init__(self, tiers=QUALITY_TIERS, start=QUALITY_START, auto=QUALITY_AUTO, fps=FPS):
+        self.tiers = tiers
+        self.level = start
+        self.auto = auto
+        self.budget_ms = 1000.0 / fps
+        self.samples = []
+        self.slow_windows = 0
+        self.fast_windows = 0
+        self.last_percentile = 0.0
+
+    @property
+    def tier(self):
+        return self.tiers[self.level]
+
+    def set_level(self, level):
+        self.level = max(0, min(len(self.tiers) - 1, level))
+        self.slow_windows = 0
+        self.fast_windows = 0
+
+    def record(self, frame_ms):
+        # frame_ms is the work time of one frame, excluding any sleep
+        self.samples.append(frame_ms)
+        if len(self.samples) >= QUALITY_WINDOW:
+            self.evaluate()
+
+    def evaluate(self):
+        samples = sorted(self.samples)
+        self.samples = []
+        self.last_percentile = samples[int(QUALITY_PERCENTILE * (len(samples) - 1))]
+        if not self.auto:
+            return
+
+        if self.last_percentile > self.budget_ms * QUALITY_DOWNGRADE:
+            self.slow_windows += 1
+            self.fast_windows = 0
+            if self.slow_windows >= QUALITY_DOWNGRADE_WINDOWS and self.level < len(self.tiers) - 1:
+                self.set_level(self.level + 1)
+        elif self.last_percentile < self.budget_ms * QUALITY_UPGRADE:
+            self.fast_windows += 1
+            self.slow_windows = 0
+            if self.fast_windows >= QUALITY_UPGRADE_WINDOWS and self.level > 0:
+                self.set_level(self.level - 1)
+        else:
+            self.slow_windows = 0
+            self.fast_windows = 0
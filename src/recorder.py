@@ -0,0 +1,227 @@
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import time
+from multiprocessing import shared_memory
+import pygame
+from settings import *
+from metrics import metrics
+
+# Gameplay recording (main.py --record PATH). After a frame is presented the
+# game copies it into one of RECORD_SLOTS frame buffers in shared memory
+# (one memcpy from the surface's pixel view) and hands the slot number to an
+# encoder process, which downscales the frame and encodes it. The game loop
+# never waits: when every slot is still queued for the encoder, the capture
+# is skipped and counted as record_dropped, the game frame is not delayed.
+#
+# The output depends on PATH:
+#   .gif, .png (APNG), .webp           animated image, needs Pillow
+#   .mp4, .mkv, .webm, .mov, .avi      raw frames piped to ffmpeg
+#   anything else                      a directory of numbered PNG frames
+# Without Pillow or ffmpeg the frames go to "<PATH>_frames/" instead.
+#
+# Frames carry their capture time. The encoders place them on a fixed
+# RECORD_FPS timeline, so dropped captures show up as a held frame instead
+# of speeding the clip up; idle pauses longer than RECORD_MAX_GAP seconds
+# are cut short.
+
+PILLOW_FORMATS = (".gif", ".png", ".webp")
+FFMPEG_FORMATS = (".mp4", ".mkv", ".webm", ".mov", ".avi")
+
+
+def output_kind(path):
+    # (encoder, path) for a recording path, falling back to PNG frames
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PILLOW_FORMATS:
+        try:
+            import PIL  # noqa: F401
+            return "pillow", path
+        except ImportError:
+            print("Recording needs Pillow for", extension, "- writing PNG frames instead")
+    elif extension in FFMPEG_FORMATS:
+        if shutil.which("ffmpeg"):
+            return "ffmpeg", path
+        print("Recording needs ffmpeg for", extension, "- writing PNG frames instead")
+    else:
+        return "frames", path
+    return "frames", os.path.splitext(path)[0] + "_frames"
+
+
+def pixel_format(surface):
+    # pygame.image.frombuffer format of a 32-bit surface's raw pixels, if any
+    if surface.get_bytesize() != 4:
+        return None
+    masks = surface.get_masks()[:3]
+    if masks == (0xff0000, 0xff00, 0xff):
+        return "BGRA"
+    if masks == (0xff, 0xff00, 0xff0000):
+        return "RGBX"
+    return None
+
+
+class Recorder:
+    def __init__(self, path, size, fps=RECORD_FPS, scale=RECORD_SCALE, slots=RECORD_SLOTS):
+        self.size = size
+        self.interval = 1 / fps
+        self.frame_bytes = size[0] * size[1] * 4
+        self.kind, self.path = output_kind(path)
+        # Even dimensions, which the common video codecs require
+        out_size = (max(2, int(size[0] * scale) // 2 * 2), max(2, int(size[1] * scale) // 2 * 2))
+
+        self.memory = shared_memory.SharedMemory(create=True, size=slots * self.frame_bytes)
+        context = multiprocessing.get_context("spawn")
+        self.filled = context.Queue()
+        self.free = context.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self.process = context.Process(
+            target=encode_frames, name="recorder", daemon=True,
+            args=(self.memory.name, size, out_size, fps, self.kind, self.path, self.filled, self.free)
+        )
+        self.process.start()
+        self.next_capture = 0.0
+        self.captured = 0
+        self.dropped = 0
+
+    def capture(self, renderer):
+        # Called right after present()
+        now = time.perf_counter()
+        if now < self.next_capture:
+            return
+        self.next_capture = max(self.next_capture + self.interval, now - self.interval)
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            # Encoder is behind: lose this capture, not a game frame
+            self.dropped += 1
+            if metrics.enabled:
+                metrics.count("record_dropped")
+            return
+
+        surface = renderer.read_pixels()
+        start = slot * self.frame_bytes
+        fmt = pixel_format(surface)
+        if fmt and surface.get_size() == self.size and surface.get_pitch() == self.size[0] * 4:
+            self.memory.buf[start:start + self.frame_bytes] = surface.get_view("0")
+        else:
+            fmt = "RGBX"
+            self.memory.buf[start:start + self.frame_bytes] = pygame.image.tobytes(
+                pygame.transform.scale(surface, self.size), fmt)
+        self.filled.put((slot, fmt, now))
+        self.captured += 1
+
+    def close(self):
+        # Waits for the encoder to finish the queued frames
+        self.filled.put(None)
+        self.process.join(RECORD_CLOSE_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.memory.close()
+        self.memory.unlink()
+        print(f"Recorded {self.captured} frames to {self.path} ({self.dropped} dropped)")
+
+
+# Writers take each frame as RGB bytes of the output size and its index on
+# the RECORD_FPS timeline
+
+
+class FrameWriter:
+    # Numbered PNG files in a directory
+    def __init__(self, path, size, fps):
+        self.path = path
+        self.size = size
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, rgb, index):
+        frame = pygame.image.frombuffer(rgb, self.size, "RGB")
+        pygame.image.save(frame, os.path.join(self.path, f"frame_{index:06d}.png"))
+
+    def close(self):
+        pass
+
+
+class FfmpegWriter:
+    # Raw RGB frames on ffmpeg's stdin, one per timeline step
+    def __init__(self, path, size, fps):
+        self.process = subprocess.Popen(
+            ["ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-", "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE
+        )
+        self.written = 0
+
+    def write(self, rgb, index):
+        # Repeats the frame over any gap left by dropped captures
+        for _ in range(max(1, index - self.written + 1)):
+            self.process.stdin.write(rgb)
+        self.written = index + 1
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class PillowWriter:
+    # Animated GIF/APNG/WebP. Pillow writes these in one go, so the
+    # downscaled frames are kept until the end.
+    def __init__(self, path, size, fps):
+        from PIL import Image
+        self.Image = Image
+        self.path = path
+        self.size = size
+        self.frame_ms = 1000 / fps
+        self.frames = []
+        self.indices = []
+
+    def write(self, rgb, index):
+        image = self.Image.frombytes("RGB", self.size, rgb)
+        if self.path.lower().endswith(".gif"):
+            image = image.quantize()
+        self.frames.append(image)
+        self.indices.append(index)
+
+    def close(self):
+        if not self.frames:
+            return
+        ends = self.indices[1:] + [self.indices[-1] + 1]
+        durations = [round((end - start) * self.frame_ms) for start, end in zip(self.indices, ends)]
+        self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                            duration=durations, loop=0)
+
+
+WRITERS = {"frames": FrameWriter, "ffmpeg": FfmpegWriter, "pillow": PillowWriter}
+
+
+def encode_frames(memory_name, size, out_size, fps, kind, path, filled, free):
+    # Runs in the encoder process
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    memory = shared_memory.SharedMemory(name=memory_name)
+    frame_bytes = size[0] * size[1] * 4
+    writer = WRITERS[kind](path, out_size, fps)
+    first = None
+    index = -1
+    try:
+        while True:
+            item = filled.get()
+            if item is None:
+                break
+            slot, fmt, captured_at = item
+            start = slot * frame_bytes
+            frame = pygame.image.frombuffer(memory.buf[start:start + frame_bytes], size, fmt)
+            # RGB drops the unused fourth byte, which BGRA reads as alpha
+            rgb = pygame.image.tobytes(pygame.transform.smoothscale(frame, out_size), "RGB")
+            del frame
+            # The slot is free again as soon as the frame is scaled
+            free.put(slot)
+
+            if first is None:
+                first = captured_at
+            step = round((captured_at - first) * fps)
+            index = min(max(index + 1, step), index + 1 + int(RECORD_MAX_GAP * fps))
+            first = captured_at - index / fps
+            writer.write(rgb, index)
+    finally:
+        writer.close()
+        memory.close()
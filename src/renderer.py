@@ -0,0 +1,307 @@
+import collections
+import math
+import weakref
+import pygame
+from settings import *
+from atlas import atlas, Region
+from resources import font_key
+
+# Draw interface shared by the game, player and falling objects, with two
+# backends picked at startup:
+#
+#   SurfaceRenderer  software blits onto the display surface (the default)
+#   TextureRenderer  pygame._sdl2.video Renderer; surfaces are uploaded once as
+#                    textures and rotation, alpha and scaling happen in SDL's
+#                    renderer (GPU where available, SDL's software renderer
+#                    otherwise)
+#
+# Anything that takes a surface also takes an atlas Region.
+#
+# Primitives (rect, circle, line) behave like pygame.draw on the screen: the
+# colour's alpha is ignored. fill() blends, and sprites take an alpha argument.
+
+TEXT_CACHE_SIZE = 512
+# Circles off the atlas; level-up bursts use random colours, so this is an LRU
+# too rather than growing for the whole session
+CIRCLE_CACHE_SIZE = 1024
+
+# Alpha levels circle sprites are quantized to
+CIRCLE_ALPHAS = list(range(0, 256, 16)) + [255]
+
+_text_cache = collections.OrderedDict()
+_circle_cache = collections.OrderedDict()
+_button_cache = {}
+
+
+def render_text(font, text, color, antialias=True):
+    # LRU cache of rendered text; fonts come from resources.get_font so they
+    # are stable keys. Fixed labels are packed into the atlas.
+    if atlas.regions:
+        region = atlas.get(('text', *font_key(font), text, tuple(color), antialias))
+        if region is not None:
+            return region
+    key = (font, text, tuple(color), antialias)
+    surface = _text_cache.get(key)
+    if surface is None:
+        surface = font.render(text, antialias, color)
+        _text_cache[key] = surface
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return surface
+
+
+def make_text(path, size, text, color, antialias=True):
+    from resources import get_font
+    return get_font(path, size).render(text, antialias, color)
+
+
+def circle_sprite(radius, color, alpha=255):
+    # Filled circle on a transparent surface. Radius is quantized to half
+    # pixels and alpha to 16 levels, and the alpha is baked into the pixels:
+    # blitting per-pixel alpha plus surface alpha is much slower in software
+    radius = max(0.5, round(radius * 2) / 2)
+    alpha = min(255, (alpha + 8) // 16 * 16)
+    key = ('circle', radius, tuple(color[:3]), alpha)
+    sprite = atlas.get(key) if atlas.regions else None
+    if sprite is None:
+        sprite = _circle_cache.get(key)
+        if sprite is None:
+            sprite = _circle_cache[key] = make_circle(*key[1:])
+            if len(_circle_cache) > CIRCLE_CACHE_SIZE:
+                _circle_cache.popitem(last=False)
+        else:
+            _circle_cache.move_to_end(key)
+    return sprite
+
+
+def make_circle(radius, color, alpha):
+    size = max(1, int(math.ceil(radius * 2)))
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (*color[:3], alpha), (size / 2, size / 2), radius)
+    return sprite
+
+
+def button_sprite(size, color):
+    # Rounded button face with its white border
+    key = ('button', tuple(size), tuple(color[:3]))
+    sprite = atlas.get(key) if atlas.regions else None
+    if sprite is None:
+        sprite = _button_cache.get(key)
+        if sprite is None:
+            sprite = _button_cache[key] = make_button(*key[1:])
+    return sprite
+
+
+def make_button(size, color):
+    sprite = pygame.Surface(size, pygame.SRCALPHA)
+    rect = sprite.get_rect()
+    pygame.draw.rect(sprite, (*color[:3], 255), rect, border_radius=8)
+    pygame.draw.rect(sprite, WHITE, rect, 2, border_radius=8)
+    return sprite
+
+
+class SurfaceRenderer:
+    name = "software"
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.size = screen.get_size()
+
+    def begin_frame(self):
+        pass
+
+    def blit(self, surface, pos, area=None):
+        if surface.__class__ is Region:
+            if area is None:
+                self.screen.blit(surface.page, pos, surface.rect)
+                return
+            surface = surface.surface()
+        self.screen.blit(surface, pos, area)
+
+    def draw_sprite(self, surface, center, angle=0, alpha=255):
+        if surface.__class__ is Region:
+            if not angle and alpha == 255:
+                rect = surface.rect
+                self.screen.blit(surface.page, (center[0] - rect.width / 2, center[1] - rect.height / 2), rect)
+                return
+            surface = surface.surface()
+        # Sprites are shared, so the surface alpha is set on every draw
+        current = surface.get_alpha()
+        if alpha != 255:
+            if current != alpha:
+                surface.set_alpha(alpha)
+        elif current is not None and current != 255:
+            surface.set_alpha(255)
+        if angle:
+            surface = pygame.transform.rotate(surface, angle)
+        rect = surface.get_rect(center=center)
+        self.screen.blit(surface, rect)
+
+    def fill(self, color, rect=None):
+        if len(color) > 3 and color[3] < 255:
+            if rect is None:
+                rect = self.screen.get_rect()
+            rect = pygame.Rect(rect)
+            overlay = pygame.Surface(rect.size, pygame.SRCALPHA)
+            overlay.fill(color)
+            self.screen.blit(overlay, rect)
+        else:
+            self.screen.fill(color, rect)
+
+    def rect(self, color, rect, width=0, border_radius=0):
+        pygame.draw.rect(self.screen, color, rect, width, border_radius=border_radius)
+
+    def circle(self, color, center, radius):
+        pygame.draw.circle(self.screen, color, center, radius)
+
+    def line(self, color, start, end, width=1):
+        pygame.draw.line(self.screen, color, start, end, width)
+
+    def snapshot(self):
+        return self.screen.copy()
+
+    def read_pixels(self):
+        return self.screen
+
+    def present(self):
+        pygame.display.flip()
+
+
+class TextureRenderer:
+    name = "texture"
+
+    def __init__(self, size, title="Code Catcher", vsync=False):
+        from pygame._sdl2.video import Window, Renderer, Texture
+        from pygame._sdl2.sdl2 import error as sdl_error
+
+        self.Texture = Texture
+        self.size = size
+        self.window = Window(title, size=size)
+        try:
+            self.renderer = Renderer(self.window, accelerated=1, vsync=vsync)
+            self.accelerated = True
+        except sdl_error:
+            # No accelerated driver; SDL's software renderer still does the
+            # rotation, scaling and blending for us
+            self.renderer = Renderer(self.window, accelerated=0)
+            self.accelerated = False
+        self.renderer.draw_blend_mode = 1  # SDL_BLENDMODE_BLEND, used by fill()
+        self.textures = weakref.WeakKeyDictionary()
+        self.uploads = 0
+
+    def texture(self, surface):
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = 1
+            self.textures[surface] = texture
+            self.uploads += 1
+        return texture
+
+    def invalidate(self, surface):
+        self.textures.pop(surface, None)
+
+    def begin_frame(self):
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+
+    def blit(self, surface, pos, area=None):
+        if surface.__class__ is Region:
+            # Region of an atlas page: draw straight from the page texture
+            texture = self.texture(surface.page)
+            source = surface.rect
+            if area is not None:
+                area = pygame.Rect(area)
+                source = area.move(source.topleft).clip(source)
+        else:
+            texture = self.texture(surface)
+            source = pygame.Rect(area) if area is not None else None
+        texture.alpha = 255
+        if source is None:
+            texture.draw(dstrect=(pos[0], pos[1], surface.get_width(), surface.get_height()))
+        else:
+            texture.draw(srcrect=source, dstrect=(pos[0], pos[1], source.width, source.height))
+
+    def draw_sprite(self, surface, center, angle=0, alpha=255):
+        rect = surface.get_rect(center=center)
+        if surface.__class__ is Region:
+            texture = self.texture(surface.page)
+            source = surface.rect
+        else:
+            texture = self.texture(surface)
+            source = None
+        texture.alpha = alpha
+        # SDL rotates clockwise, pygame.transform.rotate counter-clockwise
+        texture.draw(srcrect=source, dstrect=rect, angle=-angle)
+
+    def fill(self, color, rect=None):
+        self.renderer.draw_color = color if len(color) > 3 else (*color, 255)
+        if rect is None:
+            rect = (0, 0, *self.size)
+        self.renderer.fill_rect(rect)
+
+    def rect(self, color, rect, width=0, border_radius=0):
+        if border_radius:
+            # SDL has no rounded rectangles; draw them once in software
+            self.blit(rounded_rect_sprite(pygame.Rect(rect).size, color, width, border_radius), rect[:2])
+            return
+        self.renderer.draw_color = (*color[:3], 255)
+        if width:
+            rect = pygame.Rect(rect)
+            for i in range(width):
+                self.renderer.draw_rect(rect.inflate(-2 * i, -2 * i))
+        else:
+            self.renderer.fill_rect(rect)
+
+    def circle(self, color, center, radius):
+        self.draw_sprite(circle_sprite(radius, color), center)
+
+    def line(self, color, start, end, width=1):
+        self.renderer.draw_color = (*color[:3], 255)
+        if width <= 1:
+            self.renderer.draw_line(start, end)
+        elif start[1] == end[1]:
+            self.renderer.fill_rect((min(start[0], end[0]), start[1] - width // 2,
+                                     abs(end[0] - start[0]) + 1, width))
+        elif start[0] == end[0]:
+            self.renderer.fill_rect((start[0] - width // 2, min(start[1], end[1]),
+                                     width, abs(end[1] - start[1]) + 1))
+        else:
+            for offset in range(-(width // 2), width - width // 2):
+                self.renderer.draw_line((start[0], start[1] + offset), (end[0], end[1] + offset))
+
+    def snapshot(self):
+        return self.renderer.to_surface()
+
+    def read_pixels(self):
+        return self.renderer.to_surface()
+
+    def present(self):
+        self.renderer.present()
+
+
+_rounded_cache = {}
+
+
+def rounded_rect_sprite(size, color, width, border_radius):
+    key = (tuple(size), tuple(color[:3]), width, border_radius)
+    sprite = _rounded_cache.get(key)
+    if sprite is None:
+        sprite = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(sprite, (*color[:3], 255), sprite.get_rect(), width, border_radius=border_radius)
+        _rounded_cache[key] = sprite
+    return sprite
+
+
+def create_renderer(kind, size, title="Code Catcher"):
+    # Returns (renderer, screen); screen is None for the texture backend
+    if kind == "texture":
+        try:
+            return TextureRenderer(size, title), None
+        except (ImportError, RuntimeError, pygame.error) as e:
+            print(f"Texture renderer unavailable ({e}), using software rendering")
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(title)
+    return SurfaceRenderer(screen), screen
@@ -0,0 +1,83 @@
+import os
+import pygame
+from settings import *
+
+# Shared game resources. Fonts are loaded once per (file, size) instead of on
+# every frame, which also gives the text caches a stable key.
+#
+# Assets are looked up by name relative to ASSET_DIR ("logo.png",
+# "fonts/Roboto-Bold.ttf"), first in the asset pack and then as loose files.
+# Pack assets are handed to pygame as views of the mapped file.
+
+_fonts = {}
+_font_keys = {}
+
+
+def asset_source(name):
+    # A file object reading from the pack, or the loose file's path
+    if asset_pack and name in asset_pack:
+        return asset_pack.open(name)
+    return os.path.join(ASSET_DIR, name)
+
+
+def asset_bytes(path):
+    # Contents of a font path from settings or a loose file, for hashing
+    if path.startswith(PACK_PREFIX):
+        return asset_pack.view(path[len(PACK_PREFIX):])
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def get_font(path, size):
+    key = (path, size)
+    font = _fonts.get(key)
+    if font is None:
+        source = path
+        if path and path.startswith(PACK_PREFIX):
+            # FreeType reads the font through the file object as it needs it
+            source = asset_pack.open(path[len(PACK_PREFIX):])
+        font = _fonts[key] = pygame.font.Font(source, size)
+        _font_keys[font] = key
+    return font
+
+
+def font_key(font):
+    # (path, size) a font was loaded with, for cache keys that outlive it
+    return _font_keys.get(font, (None, None))
+
+
+def load_image(name, size=None):
+    image = pygame.image.load(asset_source(name), name)
+    # Only a display surface gives us a pixel format to convert to; the
+    # texture renderer has none and does not need converted surfaces anyway
+    if pygame.display.get_surface() is not None:
+        image = image.convert_alpha()
+    if size:
+        image = pygame.transform.scale(image, size)
+    return image
+
+
+def load_sound(filename):
+    try:
+        if asset_pack and filename in asset_pack:
+            # Raw samples already in the mixer's format go in as a buffer,
+            # anything else is decoded from a view of the pack
+            samples = asset_pack.samples(filename, pygame.mixer.get_init())
+            if samples is not None:
+                return pygame.mixer.Sound(buffer=samples)
+            return pygame.mixer.Sound(file=asset_pack.open(filename))
+        sound_path = os.path.join(ASSET_DIR, filename)
+        return pygame.mixer.Sound(sound_path)
+    except:
+        return None
+
+
+def load_assets():
+    # Images used by the game; None where an image is missing
+    assets = {}
+    for key, name, size in (('logo', 'logo.png', (400, 200)), ('player_img', 'catcher.png', (100, 60))):
+        try:
+            assets[key] = load_image(name, size)
+        except:
+            assets[key] = None
+    return assets
@@ -0,0 +1,188 @@
+from settings import *
+from metrics import metrics
+from input_events import BACK, CONFIRM
+
+# Scene stack. Each screen of the game is a scene with its own event handling,
+# update and draw pipeline; Game only forwards to the scene on top. Scenes that
+# sit on top of another one (pause, game over) render the covered scene once
+# into a cached snapshot and afterwards just blit it.
+
+
+class Scene:
+    state = None
+
+    def __init__(self, game):
+        self.game = game
+
+    def handle_action(self, action):
+        # UI actions from input_events (BACK, CONFIRM); moves go to the player
+        pass
+
+    def handle_buttons(self, pointer, clicks):
+        # Returns False to quit the game
+        return True
+
+    def update(self):
+        pass
+
+    def draw(self, renderer):
+        pass
+
+    def is_animating(self):
+        # False when the next frame would look the same as the last one
+        return False
+
+
+class CachedScene(Scene):
+    # The static part of the scene is drawn once by draw_static and reused
+    def __init__(self, game):
+        super().__init__(game)
+        self.snapshot = None
+
+    def draw_static(self, renderer):
+        pass
+
+    def draw(self, renderer):
+        if self.snapshot is None:
+            self.draw_static(renderer)
+            self.snapshot = renderer.snapshot()
+            if metrics.enabled:
+                metrics.cache_miss('scene_snapshot')
+        else:
+            renderer.blit(self.snapshot, (0, 0))
+            if metrics.enabled:
+                metrics.cache_hit('scene_snapshot')
+        self.draw_dynamic(renderer)
+
+    def draw_dynamic(self, renderer):
+        pass
+
+
+class MenuScene(CachedScene):
+    state = 'menu'
+
+    def draw_static(self, renderer):
+        renderer.blit(self.game.background, (0, 0))
+        self.game.draw_menu()
+
+    def draw_dynamic(self, renderer):
+        for button in self.game.menu_buttons:
+            button.draw(renderer)
+
+    def handle_buttons(self, pointer, clicks):
+        game = self.game
+        for button in game.menu_buttons:
+            action = button.update(pointer, clicks)
+            if action == "start_game":
+                game.reset_game()
+                game.start_game()
+                game.set_scene(GameplayScene(game))
+            elif action == "tutorial":
+                game.set_scene(TutorialScene(game))
+            elif action == "quit":
+                game.analytics.flush()
+                return False
+        return True
+
+    def is_animating(self):
+        # Hovered buttons pulse
+        return any(button.is_hovered for button in self.game.menu_buttons)
+
+
+class TutorialScene(CachedScene):
+    state = 'tutorial'
+
+    def draw_static(self, renderer):
+        renderer.blit(self.game.background, (0, 0))
+        self.game.draw_tutorial()
+
+    def handle_action(self, action):
+        if action == BACK or action == CONFIRM:
+            self.game.set_scene(MenuScene(self.game))
+
+
+class GameplayScene(Scene):
+    state = 'game'
+
+    def handle_action(self, action):
+        # Classroom games can't pause: cards follow a fixed schedule of game
+        # frames, and a paused client would fall behind everyone else's
+        if action == BACK and not self.game.session:
+            self.game.push_scene(PauseScene(self.game, self))
+
+    def update(self):
+        game = self.game
+        game.game_update()
+        game.update_particles()
+
+        # Handle flash effect fade
+        if game.flash_alpha > 0:
+            game.flash_alpha = max(0, game.flash_alpha - 15)
+
+    def draw(self, renderer, state=None):
+        # state is a FrameState when the render thread draws this scene
+        game = self.game
+        if state is None:
+            state = game
+        renderer.blit(game.background, (0, 0))
+        game.draw_particles(state.particles)
+
+        # Flash effect if active
+        if state.flash_alpha > 0:
+            renderer.fill((*state.flash_color[:3], state.flash_alpha))
+
+        game.draw_game(state)
+
+    def is_animating(self):
+        return True
+
+
+class OverlayScene(CachedScene):
+    # Drawn over a frozen snapshot of the scene it covers
+    def __init__(self, game, below):
+        super().__init__(game)
+        self.below = below
+
+    def draw_static(self, renderer):
+        self.below.draw(renderer)
+        self.draw_overlay(renderer)
+
+    def draw_overlay(self, renderer):
+        pass
+
+
+class PauseScene(OverlayScene):
+    state = 'game'
+
+    def draw_overlay(self, renderer):
+        self.game.draw_pause()
+
+    def handle_action(self, action):
+        if action == BACK:
+            self.game.pop_scene()
+
+
+class GameOverScene(OverlayScene):
+    state = 'game_over'
+
+    def draw_overlay(self, renderer):
+        self.game.draw_game_over()
+
+    def draw_dynamic(self, renderer):
+        for button in self.game.game_over_buttons:
+            button.draw(renderer)
+
+    def handle_buttons(self, pointer, clicks):
+        game = self.game
+        for button in game.game_over_buttons:
+            action = button.update(pointer, clicks)
+            if action == "play_again":
+                game.reset_game()
+                game.start_game()
+                game.set_scene(GameplayScene(game))
+            elif action == "menu":
+                game.set_scene(MenuScene(game))
+        return True
+
+    def is_animating(self):
+        return any(button.is_hovered for button in self.game.game_over_buttons)
@@ -1,11 +1,16 @@
 import os
 import pygame
+from assetpack import open_pack, PACK_PREFIX
 
 # Game configuration
 WIDTH = 800
 HEIGHT = 600
 FPS = 60
 
+# When nothing on screen animates (menu, tutorial, pause), block on input
+# instead of redrawing at FPS; redraw at least this often
+IDLE_WAIT_MS = 500
+
 # Try to load fonts
 pygame.font.init()
 
@@ -13,15 +18,30 @@ pygame.font.init()
 font_dir = "assets/fonts"
 os.makedirs(font_dir, exist_ok=True)
 
+# Packed assets (built with assetpack.py); loose files are used for anything
+# the pack does not contain
+ASSET_PACK = os.path.join("assets", "assets.pack")
+asset_pack = open_pack(ASSET_PACK)
+
+def find_font(filename):
+    # "pack:fonts/<filename>" if the pack has the font, else the loose file
+    name = "fonts/" + filename
+    if asset_pack and name in asset_pack:
+        return PACK_PREFIX + name
+    path = os.path.join(font_dir, filename)
+    if os.path.exists(path):
+        return path
+    return None
+
 # Font settings - with fallbacks
 try:
     # Try to load custom fonts if available
-    GAME_FONT = os.path.join(font_dir, "Roboto-Regular.ttf")
-    GAME_FONT_BOLD = os.path.join(font_dir, "Roboto-Bold.ttf")
-    GAME_FONT_MONO = os.path.join(font_dir, "RobotoMono-Regular.ttf")
+    GAME_FONT = find_font("Roboto-Regular.ttf")
+    GAME_FONT_BOLD = find_font("Roboto-Bold.ttf")
+    GAME_FONT_MONO = find_font("RobotoMono-Regular.ttf")
     
-    # Test if files exist, otherwise use system fonts
-    if not (os.path.exists(GAME_FONT) and os.path.exists(GAME_FONT_BOLD) and os.path.exists(GAME_FONT_MONO)):
+    # Test if all were found, otherwise use system fonts
+    if not (GAME_FONT and GAME_FONT_BOLD and GAME_FONT_MONO):
         raise FileNotFoundError("Custom fonts not found")
         
 except:
@@ -56,6 +76,28 @@ HEADER_COLOR = (240, 248, 255, 255)
 UI_BG_COLOR = (240, 248, 255, 200)
 UI_BORDER_COLOR = (30, 144, 255, 255)
 
+# Rendering backend: "software" (display surface blits) or "texture"
+# (SDL2 renderer, GPU-accelerated where available)
+RENDERER = "software"
+CARD_CACHE_SIZE = 256         # cached card sprites before the cache is reset
+
+# Falling code cards, sized to fit their snippet (see layout.py). Text wider
+# than CARD_WIDTH_MAX minus the padding is wrapped onto more lines.
+CARD_FONT_SIZE = 16
+CARD_WIDTH_MIN = 120
+CARD_WIDTH_MAX = 240
+CARD_HEIGHT = 50              # minimum height, taller for wrapped snippets
+CARD_PADDING_X = 24           # keeps the text clear of the corner icon
+CARD_PADDING_Y = 8
+
+# Sprite atlas: "sync" builds it before the first frame, "worker" in a
+# separate process while the menu runs, "off" draws sprites individually.
+# Built atlases are cached under ATLAS_CACHE_DIR.
+ATLAS_MODE = "sync"
+ATLAS_CACHE_DIR = os.path.join("cache", "atlas")
+ATLAS_PAGE_SIZE = 1024
+ATLAS_PADDING = 2
+
 # Difficulty settings
 DIFFICULTY_MULTIPLIERS = {
     "easy": 0.8,
@@ -68,6 +110,84 @@ DEFAULT_DIFFICULTY = "normal"
 MAX_LEVELS = 10
 LIVES = 5
 MAX_BUGS = 5
+POINTS_PER_LEVEL = 10
+
+# Gameplay profiles (config.py); main.py --profile picks one by name. They
+# ship next to the code, so this doesn't depend on the working directory
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+# Difficulty tuning (frames are 1/FPS seconds)
+SPAWN_INTERVAL_BASE = 60
+SPAWN_INTERVAL_STEP = 5
+SPAWN_INTERVAL_MIN = 20
+FALL_SPEED_BASE = 2
+FALL_SPEED_STEP = 0.5
+FALL_SPEED_SPREAD = 3
+BUG_RATIO = 0.5
+BUG_RATIO_MIN = 0.3
+BUG_RATIO_MAX = 0.7
+BUG_RATIO_STEP = 0.0         # added per level before adaptive adjustment
+
+# Adaptive difficulty
+ADAPTIVE_DIFFICULTY = True
+ADAPT_WINDOW = 20            # recent outcomes/reactions considered
+ADAPT_MIN_SAMPLES = 5        # outcomes needed before adapting
+ADAPT_RATE = 0.02            # how quickly pressure follows the player
+TARGET_ACCURACY = 0.75
+REACTION_FAST = 15           # frames; quicker than this means push harder
+REACTION_SLOW = 45           # frames; slower than this means ease off
+
+# Most falling objects on screen at once; keeps high levels within what the
+# renderer can draw at FPS
+OBJECT_BUDGET = 12
+
+# Most live particles at level 1, lowered by PARTICLE_BUDGET_STEP per level;
+# the quality tier's particle_cap also applies
+PARTICLE_BUDGET = 600
+PARTICLE_BUDGET_STEP = 0
+
+# Render quality tiers, best first. The quality governor steps between them
+# to hold the FPS target on slow machines.
+QUALITY_TIERS = [
+    {
+        "name": "high",
+        "particle_cap": 600,       # live particles in Game.particles
+        "particle_scale": 1.0,     # multiplier on particles per effect
+        "trail_particles": True,   # falling cards emit trail particles
+        "card_rotation": True,
+        "card_shine": True,
+        "glow_passes": 4,          # title glow layers in menu/game over
+        "player_trail": 5          # ghost rects behind the catcher
+    },
+    {
+        "name": "medium",
+        "particle_cap": 250,
+        "particle_scale": 0.5,
+        "trail_particles": True,
+        "card_rotation": True,
+        "card_shine": False,
+        "glow_passes": 2,
+        "player_trail": 3
+    },
+    {
+        "name": "low",
+        "particle_cap": 80,
+        "particle_scale": 0.25,
+        "trail_particles": False,
+        "card_rotation": False,
+        "card_shine": False,
+        "glow_passes": 0,
+        "player_trail": 0
+    }
+]
+QUALITY_AUTO = True
+QUALITY_START = 0             # index into QUALITY_TIERS
+QUALITY_WINDOW = 60           # frames per evaluation
+QUALITY_PERCENTILE = 0.9
+QUALITY_DOWNGRADE = 1.1       # step down when the percentile exceeds budget * this
+QUALITY_UPGRADE = 0.6         # step up when it stays under budget * this
+QUALITY_DOWNGRADE_WINDOWS = 2 # consecutive slow windows before stepping down
+QUALITY_UPGRADE_WINDOWS = 5   # consecutive fast windows before stepping up
 
 # Sound settings
 SOUND_ENABLED = True
@@ -79,8 +199,48 @@ ASSET_DIR = "assets"
 SOUND_DIR = os.path.join(ASSET_DIR, "sounds")
 IMAGE_DIR = os.path.join(ASSET_DIR, "images")
 
+# Input: timestamped action events buffered between simulation ticks
+INPUT_BUFFER_SIZE = 256
+
+# Debug overlay and metrics export
+DEBUG_OVERLAY_KEY = pygame.K_F3
+METRICS_HISTORY = 120         # frames kept for the frame-time graph
+METRICS_EXPORT_INTERVAL = 1.0 # seconds between exported samples
+METRICS_QUEUE = 8             # tcp samples waiting for the sender thread
+METRICS_RECONNECT_MIN = 1.0   # seconds before the first tcp reconnect
+METRICS_RECONNECT_MAX = 30.0  # backoff cap while the collector is down
+
+# Memory diagnostics (main.py --memdiag DIR)
+MEMDIAG_INTERVAL = 300        # seconds between periodic reports
+MEMDIAG_FRAMES = 10           # traceback depth kept by tracemalloc
+MEMDIAG_TOP = 25              # entries per report section
+MEMDIAG_GROWTH_WINDOW = 5     # restarts of steady growth before flagging a leak
+MEMDIAG_GROWTH_MIN_BYTES = 256 * 1024
+
+# Classroom mode (classroom.py): students play the same seeded card stream
+# and a teacher-run server relays their scores
+CLASSROOM_PORT = 5050
+CLASSROOM_TICK_RATE = 10              # score broadcasts per second
+CLASSROOM_MAX_CLIENTS = 64
+CLASSROOM_WRITE_LIMIT = 256 * 1024    # bytes queued for a client before it is dropped
+CLASSROOM_SCOREBOARD_ROWS = 5
+CLASSROOM_LEVEL_SECONDS = 30           # the shared card schedule steps up a level this often
+
+# Gameplay recording (main.py --record PATH, see recorder.py)
+RECORD_FPS = 15
+RECORD_SCALE = 0.5              # output size relative to the window
+RECORD_SLOTS = 8                # frame buffers shared with the encoder process
+RECORD_MAX_GAP = 1.0            # seconds an idle pause may last in the clip
+RECORD_CLOSE_TIMEOUT = 30       # seconds to wait for the encoder at exit
+
+# Learning analytics (per-snippet event log)
+ANALYTICS_ENABLED = True
+ANALYTICS_DIR = "analytics"
+ANALYTICS_LOG = os.path.join(ANALYTICS_DIR, "events.jsonl")
+ANALYTICS_STATE = os.path.join(ANALYTICS_DIR, "snippet_stats.json")
+
 # Create directories if they don't exist
-for directory in [ASSET_DIR, SOUND_DIR, IMAGE_DIR, font_dir]:
+for directory in [ASSET_DIR, SOUND_DIR, IMAGE_DIR, font_dir, ANALYTICS_DIR]:
     os.makedirs(directory, exist_ok=True)
 
 # Try to create readme file with font instructions if it doesn't exist
@@ -0,0 +1,399 @@
+import argparse
+import ast
+import builtins
+import difflib
+import hashlib
+import importlib.util
+import io
+import json
+import keyword
+import os
+import random
+import re
+import sys
+import tokenize
+
+# Snippet corpus. SOURCE_TIERS holds the hand-written snippets; the build step
+# checks that every "correct" snippet is valid Python and every bug really is
+# one, generates more bugs from the correct snippets with token-level
+# mutations, and writes the verified result to SNIPPET_CORPUS. The game only
+# reads that JSON file, it never parses code at runtime.
+#
+#   python snippets.py build            # verify, generate, write the corpus
+#   python snippets.py check            # verify the hand-written snippets only
+#
+# A bug counts as a bug if it is a syntax error in every context a snippet
+# can appear in (a block header gets a body, yield/await get a function), or
+# if it compiles but misspells a builtin, keyword or module name.
+
+CORPUS_VERSION = 1
+LANGUAGE = "python"
+MAX_VARIANTS = 6  # generated bugs kept per correct snippet
+
+SNIPPET_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snippet_corpus.json")
+
+# Code snippets by tier: (correct, bugs)
+SOURCE_TIERS = [
+    (
+        [
+            "print('Hello')",
+            "x = 5 + 3",
+            "def func():",
+            "for i in range(10):",
+            "if x > 0:",
+            "if x >= 10:"
+        ],
+        [
+            "pront('Hello')",
+            "x = 5 +",
+            "def func()",
+            "for i in rage(10):",
+            "if x > 0",
+            "if x => 10:"
+        ]
+    ),
+    (
+        [
+            "while True: break",
+            "raise ValueError('oops')",
+            "class MyClass(object):",
+            "with open('file.txt') as f:",
+            "import random",
+            "while n != 0: n -= 1"
+        ],
+        [
+            "while True, break",
+            "raise ValueErorr('oops')",
+            "class MyClass(object)",
+            "with open('file.txt') as f",
+            "import randum",
+            "while n =! 0: n -= 1"
+        ]
+    ),
+    (
+        [
+            "lambda x: x * 2",
+            "[x for x in range(10)]",
+            "async def func(): await x",
+            "assert condition, 'message'",
+            "yield from generator()"
+        ],
+        [
+            "lambda x: x *",
+            "[x for x in range 10]",
+            "async def func(): wait x",
+            "assert condition 'message'",
+            "yield form generator()"
+        ]
+    )
+]
+
+# Places a snippet may stand: on its own, as a block header, or inside a
+# (async) function for yield and await
+CONTEXTS = [
+    "{code}",
+    "{code}\n    pass",
+    "def _snippet():\n    {code}",
+    "def _snippet():\n    {code}\n        pass",
+    "async def _snippet():\n    {code}",
+    "async def _snippet():\n    {code}\n        pass",
+]
+
+# Comparison and other operators written the wrong way round; the checker
+# drops the ones that still compile
+SWAPPED_OPERATORS = {"==": "=", "!=": "=!", "<=": "=<", ">=": "=>", "->": "=>", ":=": "=:"}
+
+KNOWN_NAMES = sorted(set(dir(builtins)) | set(keyword.kwlist))
+KNOWN_MODULES = sorted(getattr(sys, "stdlib_module_names", ()))
+
+
+def normalize(text):
+    # Dedupe form of a snippet: trimmed, runs of spaces collapsed except for
+    # indentation
+    return re.sub(r"(?<=\S)[ \t]+", " ", text.strip())
+
+
+def snippet_hash(text):
+    return hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()[:12]
+
+
+def parse(code):
+    # The AST of the first context the snippet compiles in, or None
+    for context in CONTEXTS:
+        source = context.format(code=code.replace("\n", "\n    "))
+        try:
+            tree = ast.parse(source, "<snippet>")
+            compile(tree, "<snippet>", "exec", dont_inherit=True)
+        except (SyntaxError, ValueError):
+            continue
+        return tree
+    return None
+
+
+def bound_names(tree):
+    names = {"_snippet"}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split(".")[0])
+    return names
+
+
+def misspellings(tree):
+    # Free names that are near misses of builtins or keywords, and imports
+    # of modules that do not exist
+    problems = []
+    bound = bound_names(tree)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            name = node.id
+            if name in bound or name in KNOWN_NAMES or len(name) < 3:
+                continue
+            close = difflib.get_close_matches(name, KNOWN_NAMES, n=1, cutoff=0.8)
+            if close:
+                problems.append(f"misspelled {close[0]!r} as {name!r}")
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module or ""]
+            for module in modules:
+                top = module.split(".")[0]
+                if top and importlib.util.find_spec(top) is None:
+                    close = difflib.get_close_matches(top, KNOWN_MODULES, n=1, cutoff=0.8)
+                    hint = f", did you mean {close[0]!r}" if close else ""
+                    problems.append(f"unknown module {top!r}{hint}")
+    return problems
+
+
+def classify(code):
+    # None for valid code, otherwise why it is a bug
+    tree = parse(code)
+    if tree is None:
+        return "syntax error"
+    problems = misspellings(tree)
+    return "; ".join(problems) if problems else None
+
+
+# Per-language checkers: classify(code) -> None if valid, else the reason
+CHECKERS = {"python": classify}
+
+
+def typos(word):
+    # Plausible misspellings: swapped, dropped and doubled letters and
+    # swapped vowels
+    variants = []
+    for i in range(len(word) - 1):
+        if word[i] != word[i + 1]:
+            variants.append(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+    if len(word) > 3:
+        for i in range(1, len(word)):
+            variants.append(word[:i] + word[i + 1:])
+    for i in range(1, len(word)):
+        variants.append(word[:i] + word[i] + word[i:])
+    vowels = {"a": "e", "e": "a", "i": "o", "o": "u", "u": "o"}
+    for i, char in enumerate(word):
+        if char in vowels:
+            variants.append(word[:i] + vowels[char] + word[i + 1:])
+    return [variant for variant in dict.fromkeys(variants) if variant != word]
+
+
+def tokens(code):
+    # (type, string, start offset, end offset) of each token in code
+    line_starts = [0]
+    for line in code.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+    result = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type in (tokenize.NEWLINE, tokenize.NL, tokenize.ENDMARKER, tokenize.INDENT, tokenize.DEDENT):
+                continue
+            start = line_starts[token.start[0] - 1] + token.start[1]
+            end = line_starts[token.end[0] - 1] + token.end[1]
+            result.append((token.type, token.string, start, end))
+    except (tokenize.TokenError, IndentationError):
+        pass
+    return result
+
+
+def mutations(code):
+    # Token-level bug candidates for a correct snippet
+    toks = tokens(code)
+    imported = set()
+    for i, (kind, string, _, _) in enumerate(toks):
+        if string in ("import", "from") and i + 1 < len(toks):
+            imported.add(toks[i + 1][1])
+
+    candidates = []
+    for i, (kind, string, start, end) in enumerate(toks):
+        before, after = code[:start], code[end:]
+        if kind == tokenize.OP and string == ":":
+            candidates.append(before.rstrip() + after)          # dropped colon
+            candidates.append(before + "," + after)             # colon for comma
+        elif kind == tokenize.OP and string in SWAPPED_OPERATORS:
+            candidates.append(before + SWAPPED_OPERATORS[string] + after)  # swapped operator
+        elif kind == tokenize.OP and string in (")", "]"):
+            candidates.append(before + after)                   # unclosed bracket
+        elif kind == tokenize.OP and string == "(" and i > 0 and toks[i - 1][0] == tokenize.NAME:
+            candidates.append(before + " " + after)             # call without parentheses
+        elif kind == tokenize.NAME and (string in KNOWN_NAMES or string in imported):
+            for typo in typos(string):                          # misspelled keyword, builtin or module
+                candidates.append(before + typo + after)
+        if kind in (tokenize.NUMBER, tokenize.NAME, tokenize.STRING) and i == len(toks) - 1 and i > 0:
+            if toks[i - 1][1] in ("+", "-", "*", "/", "%", "=", ","):
+                candidates.append(before)                       # missing operand
+    return list(dict.fromkeys(candidates))
+
+
+def generate_bugs(code, correct_texts, checker=classify, limit=MAX_VARIANTS):
+    # Verified, deduplicated bug variants of one correct snippet: (text, reason)
+    bugs = []
+    for candidate in mutations(code):
+        candidate = candidate.strip()
+        if not candidate or normalize(candidate) in correct_texts:
+            continue
+        reason = checker(candidate)
+        if reason:
+            bugs.append((candidate, reason))
+    # Deterministic choice, so rebuilding gives the same corpus
+    rng = random.Random(snippet_hash(code))
+    rng.shuffle(bugs)
+    return sorted(bugs[:limit])
+
+
+def source_hash(tiers, limit):
+    digest = hashlib.sha256()
+    digest.update(f"{CORPUS_VERSION} {LANGUAGE} {limit} {sys.version_info[:2]}".encode())
+    digest.update(json.dumps(tiers).encode("utf-8"))
+    with open(os.path.abspath(__file__), "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def verify_sources(tiers, checker=classify):
+    # Problems with the hand-written snippets, as printable strings
+    problems = []
+    for tier, (correct, bugs) in enumerate(tiers):
+        for code in correct:
+            reason = checker(code)
+            if reason:
+                problems.append(f"tier {tier}: {code!r} is labelled correct but has a {reason}")
+        for code in bugs:
+            if not checker(code):
+                problems.append(f"tier {tier}: {code!r} is labelled a bug but is valid")
+    return problems
+
+
+def build_corpus(tiers=SOURCE_TIERS, limit=MAX_VARIANTS, language=LANGUAGE):
+    checker = CHECKERS[language]
+    correct_texts = {normalize(code) for correct, _ in tiers for code in correct}
+    snippets = {}
+    problems = verify_sources(tiers, checker)
+
+    def add(code, tier, is_correct, source, reason=None):
+        key = snippet_hash(code)
+        if key in snippets:
+            return
+        snippets[key] = {"text": code.strip(), "tier": tier, "correct": is_correct, "source": source}
+        if reason:
+            snippets[key]["reason"] = reason
+
+    for tier, (correct, bugs) in enumerate(tiers):
+        for code in correct:
+            if not checker(code):
+                add(code, tier, True, "manual")
+        for code in bugs:
+            reason = checker(code)
+            if reason:
+                add(code, tier, False, "manual", reason)
+        for code in correct:
+            if checker(code):
+                continue
+            for bug, reason in generate_bugs(code, correct_texts, checker, limit):
+                add(bug, tier, False, "generated", reason)
+
+    return {
+        "version": CORPUS_VERSION,
+        "language": language,
+        "source_hash": source_hash(tiers, limit),
+        "tiers": len(tiers),
+        "snippets": snippets,
+        "problems": problems,
+    }
+
+
+def load_corpus(path=SNIPPET_CORPUS):
+    try:
+        with open(path, encoding="utf-8") as f:
+            corpus = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if corpus.get("version") != CORPUS_VERSION:
+        return None
+    return corpus
+
+
+def load_tiers(path=SNIPPET_CORPUS):
+    # (correct, bugs) per tier from the built corpus; the hand-written
+    # snippets, unverified, if it has not been built
+    corpus = load_corpus(path)
+    if corpus is None:
+        return [(list(correct), list(bugs)) for correct, bugs in SOURCE_TIERS]
+    tiers = [([], []) for _ in range(corpus["tiers"])]
+    for entry in corpus["snippets"].values():
+        tiers[entry["tier"]][0 if entry["correct"] else 1].append(entry["text"])
+    return tiers
+
+
+def write_corpus(corpus, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(corpus, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and verify the snippet corpus")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="verify snippets, generate bugs and write the corpus")
+    build_parser.add_argument("--out", default=SNIPPET_CORPUS)
+    build_parser.add_argument("--max-variants", type=int, default=MAX_VARIANTS,
+                              help="generated bugs kept per correct snippet")
+    build_parser.add_argument("--force", action="store_true", help="rebuild even if the corpus is up to date")
+
+    commands.add_parser("check", help="verify the hand-written snippets")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        problems = verify_sources(SOURCE_TIERS)
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} problem(s)")
+        return 1 if problems else 0
+
+    existing = load_corpus(args.out)
+    if existing and not args.force and existing["source_hash"] == source_hash(SOURCE_TIERS, args.max_variants):
+        print(f"{args.out} is up to date ({len(existing['snippets'])} snippets)")
+        return 1 if existing["problems"] else 0
+
+    corpus = build_corpus(SOURCE_TIERS, args.max_variants)
+    write_corpus(corpus, args.out)
+    for problem in corpus["problems"]:
+        print(problem)
+    counts = {}
+    for entry in corpus["snippets"].values():
+        key = "correct" if entry["correct"] else entry["source"] + " bugs"
+        counts[key] = counts.get(key, 0) + 1
+    print(f"Wrote {len(corpus['snippets'])} snippets to {args.out}: "
+          + ", ".join(f"{count} {name}" for name, count in sorted(counts.items())))
+    return 1 if corpus["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
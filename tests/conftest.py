@@ -0,0 +1,37 @@
+import os
+import sys
+
+# The game modules live flat in src/ and import each other by name, with
+# paths relative to src/ as when the game is started from there; run them
+# headless with SDL's dummy drivers
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, SRC)
+os.chdir(SRC)
+
+import pygame
+import pytest
+from settings import WIDTH, HEIGHT
+
+
+@pytest.fixture(scope="session", autouse=True)
+def display():
+    pygame.init()
+    yield pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.quit()
+
+
+@pytest.fixture
+def game(display, monkeypatch):
+    # A game on the gameplay scene that logs no analytics
+    import game as game_module
+    from scenes import GameplayScene
+
+    monkeypatch.setattr(game_module, "ANALYTICS_ENABLED", False)
+    game = game_module.Game(display)
+    game.reset_game()
+    game.start_game()
+    game.set_scene(GameplayScene(game))
+    return game
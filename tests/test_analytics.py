@@ -0,0 +1,71 @@
+import json
+from analytics import Analytics, SnippetAggregator
+
+
+def write_events(path, events):
+    with open(path, "a", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def event(session, kind="catch", text="x = 1", **extra):
+    return {"type": kind, "session": session, "text": text, "is_correct": True, "level": 1, **extra}
+
+
+def test_catch_up_reads_only_new_events(tmp_path):
+    log = str(tmp_path / "events.jsonl")
+    write_events(log, [event("a", "spawn"), event("a", "catch", fall=1.0)])
+    aggregator = SnippetAggregator()
+    assert aggregator.catch_up(log) == 2
+    assert aggregator.catch_up(log) == 0
+    write_events(log, [event("b", "spawn")])
+    assert aggregator.catch_up(log) == 1
+    assert aggregator.get("x = 1").spawns == 2
+
+
+def test_sessions_are_counted_not_stored(tmp_path):
+    log = str(tmp_path / "events.jsonl")
+    state = str(tmp_path / "state.json")
+    write_events(log, [event("a", "spawn"), event("a", "miss"), event("b", "spawn")])
+    aggregator = SnippetAggregator()
+    aggregator.catch_up(log)
+    aggregator.save(state)
+
+    # A session spanning two catch-ups is counted once
+    write_events(log, [event("b", "catch"), event("c", "spawn")])
+    aggregator = SnippetAggregator.load(state)
+    aggregator.catch_up(log)
+    assert aggregator.sessions == 3
+    aggregator.save(state)
+    with open(state, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["sessions"] == 3
+    assert saved["last_session"] == "c"
+
+
+def test_loads_old_session_lists(tmp_path):
+    state = tmp_path / "state.json"
+    state.write_text(json.dumps({"offset": 0, "sessions": ["a", "b"], "stats": {}}))
+    assert SnippetAggregator.load(str(state)).sessions == 2
+
+
+def test_timings_are_game_frames(tmp_path):
+    from falling_object import FallingObject
+
+    log = str(tmp_path / "events.jsonl")
+    analytics = Analytics(log, fps=60)
+    obj = FallingObject(1)
+    analytics.spawn(obj, 1)
+    for _ in range(90):
+        obj.update()
+    obj.reacted_at = 30
+    analytics.catch(obj, 1)
+    analytics.flush()
+    aggregator = SnippetAggregator()
+    aggregator.catch_up(log)
+    with open(log, encoding="utf-8") as f:
+        spawn, catch = [json.loads(line) for line in f]
+    assert "fall" not in spawn
+    assert (catch["fall"], catch["reaction"]) == (1.5, 0.5)
+    stats = aggregator.get(obj.text)
+    assert (stats.spawns, stats.catches, stats.reaction_mean) == (1, 1, 0.5)
@@ -0,0 +1,81 @@
+import os
+import shutil
+import struct
+import pygame
+import pytest
+import resources
+import metrics as metrics_module
+from assetpack import AssetPack, build_pack, open_pack, wav_samples, PACK_PREFIX
+from resources import get_font, font_key
+
+FONT = "fonts/Mono.ttf"
+
+
+@pytest.fixture
+def pack(tmp_path, monkeypatch):
+    # A pack holding pygame's default font, in place of the game's pack
+    source = tmp_path / "assets"
+    (source / "fonts").mkdir(parents=True)
+    shutil.copy(os.path.join(os.path.dirname(pygame.__file__), "freesansbold.ttf"), source / FONT)
+    build_pack(str(source), str(tmp_path / "assets.pack"))
+    pack = AssetPack(str(tmp_path / "assets.pack"))
+    monkeypatch.setattr(resources, "asset_pack", pack)
+    return pack
+
+
+def test_pack_font_path(pack):
+    assert FONT in pack
+    path = PACK_PREFIX + FONT
+    font = get_font(path, 13)
+    assert font.render("x", True, (0, 0, 0)).get_width() > 0
+    assert get_font(path, 13) is font
+    assert font_key(font) == (path, 13)
+
+
+def test_metrics_overlay_uses_pack_font(pack, game, monkeypatch):
+    monkeypatch.setattr(metrics_module, "GAME_FONT_MONO", PACK_PREFIX + FONT)
+    overlay = metrics_module.Metrics()
+    overlay.draw_overlay(game.renderer, game)
+    assert font_key(overlay.font)[0] == PACK_PREFIX + FONT
+
+
+def wav(audio_format, bits, frames=b"\0" * 64, frequency=22050, channels=1):
+    block = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", audio_format, channels, frequency, frequency * block, block, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(frames)) + frames
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def test_wav_sample_formats():
+    offset, size, fmt = wav_samples(wav(1, 16))
+    assert (size, fmt) == (64, (22050, -16, 1))
+    assert wav_samples(wav(3, 32))[2] == (22050, -32, 1)
+    # Integer 32-bit and non-WAV data are left to pygame's loader
+    assert wav_samples(wav(1, 32)) is None
+    assert wav_samples(b"ID3 not a wav") is None
+
+
+def test_pack_contents(tmp_path):
+    source = tmp_path / "assets"
+    (source / "sounds").mkdir(parents=True)
+    (source / "README.txt").write_text("not packed")
+    (source / "logo.png").write_bytes(b"\x89PNG" + bytes(range(50)))
+    samples = bytes(range(64))
+    (source / "sounds" / "hit.wav").write_bytes(wav(1, 16, samples))
+    path = str(source / "assets.pack")
+    build_pack(str(source), path)
+
+    pack = AssetPack(path)
+    assert sorted(pack.names()) == ["logo.png", "sounds/hit.wav"]
+    assert bytes(pack.view("logo.png")) == (source / "logo.png").read_bytes()
+    assert pack.open("logo.png").read() == (source / "logo.png").read_bytes()
+    assert bytes(pack.samples("sounds/hit.wav", (22050, -16, 1))) == samples
+    assert pack.samples("sounds/hit.wav", (44100, -16, 2)) is None
+
+
+def test_invalid_pack_is_ignored(tmp_path, capsys):
+    path = tmp_path / "assets.pack"
+    path.write_bytes(b"not a pack at all, just some bytes")
+    assert open_pack(str(path)) is None
+    assert open_pack(str(tmp_path / "missing.pack")) is None
+    assert "Ignoring asset pack" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+import pygame
+import pytest
+from atlas import Atlas, Region, ShelfPacker, pack
+from settings import GREEN
+
+
+def solid(size, color):
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    surface.fill(color)
+    return surface
+
+
+SPECS = [
+    (("box", i), lambda i=i: solid((10 + i * 7, 5 + i * 3), (i * 20, 255 - i * 20, 50, 128 + i)))
+    for i in range(8)
+]
+
+
+def test_shelf_packer_never_overlaps():
+    packer = ShelfPacker(size=64, padding=1)
+    placed = []
+    for width, height in [(30, 10), (30, 12), (20, 20), (63, 5), (10, 40), (40, 40)]:
+        page, x, y = packer.insert(width, height)
+        rect = pygame.Rect(x, y, width, height)
+        assert pygame.Rect(0, 0, 64, 64).contains(rect)
+        assert not any(p == page and rect.colliderect(r) for p, r in placed)
+        placed.append((page, rect))
+    assert len(packer.pages) > 1
+    with pytest.raises(ValueError):
+        packer.insert(64, 1)
+
+
+def test_pack_keeps_pixels_exactly():
+    pages, table = pack(SPECS)
+    for key, factory in SPECS:
+        page, x, y, width, height = table[key]
+        region = Region(pages[page], (x, y, width, height))
+        original = factory()
+        assert region.get_size() == original.get_size()
+        assert region.surface().get_at((0, 0)) == original.get_at((0, 0))
+        assert region.surface().get_at((width - 1, height - 1)) == original.get_at((width - 1, height - 1))
+
+
+def test_cache_round_trip(tmp_path):
+    pages, table = pack(SPECS)
+    built = Atlas()
+    built.digest = "test"
+    built.save(str(tmp_path), pages, table)
+
+    loaded = Atlas()
+    loaded.digest = "test"
+    assert loaded.load(str(tmp_path))
+    assert loaded.get(("box", 3)).get_size() == built_size(table, ("box", 3))
+    # Another digest doesn't pick up these files
+    stale = Atlas()
+    stale.digest = "other"
+    assert not stale.load(str(tmp_path))
+
+
+def built_size(table, key):
+    return table[key][3:]
+
+
+def test_game_sprites_come_from_the_atlas(tmp_path):
+    atlas = Atlas()
+    atlas.load_or_build("sync", str(tmp_path))
+    assert atlas.ready
+    assert isinstance(atlas.get(('circle', 2.0, tuple(GREEN[:3]), 255)), Region)
+    # A second start loads the cached build
+    cached = Atlas()
+    cached.load_or_build("sync", str(tmp_path))
+    assert cached.regions.keys() == atlas.regions.keys()
@@ -0,0 +1,34 @@
+import benchmark
+from benchmark import compare, save, time_benchmark
+
+
+def results(**times):
+    return {"results": {name: {"min_ms": ms, "ms_per_op": ms} for name, ms in times.items()}}
+
+
+def test_compare_flags_only_beyond_threshold(capsys):
+    baseline = results(fast=1.0, slow=1.0, gone=1.0)
+    current = results(fast=1.05, slow=1.2, new=3.0)
+    assert compare(baseline, current, threshold=10) == ["slow"]
+    assert "new" in capsys.readouterr().out
+
+
+def test_faster_is_not_a_regression():
+    assert compare(results(a=2.0), results(a=1.0), threshold=0) == []
+
+
+def test_compare_command_exit_code(tmp_path):
+    base, latest = str(tmp_path / "base.json"), str(tmp_path / "out" / "latest.json")
+    save(base, results(a=1.0))
+    save(latest, results(a=1.5))
+    assert benchmark.main(["compare", base, latest, "--threshold", "60"]) == 0
+    assert benchmark.main(["compare", base, latest, "--threshold", "10"]) == 1
+
+
+def test_time_benchmark_counts_iterations():
+    calls = []
+    result = time_benchmark(4, lambda: lambda: calls.append(1), repeat=3)
+    # One warm-up call, then repeat * iterations
+    assert len(calls) == 1 + 3 * 4
+    assert result["min_ms"] <= result["ms_per_op"]
+    assert result["iterations"] == 4 and result["repeat"] == 3
@@ -0,0 +1,55 @@
+import pytest
+from balance import init_worker, parse_profile, run_session, summarize
+from bot import BotPolicy, check
+from input_events import MOVE_RIGHT
+from settings import WIDTH
+
+
+def holding_right(monkeypatch):
+    bot = BotPolicy(reaction_delay=0, error_rate=0, seed=0)
+    monkeypatch.setattr(bot, "decide", lambda game: WIDTH)
+    return bot
+
+
+def test_bot_presses_again_after_restart(game, monkeypatch):
+    bot = game.controller = holding_right(monkeypatch)
+    bot.feed(game, game.inputs)
+    assert MOVE_RIGHT in game.inputs.latch().held
+
+    # Play again: the game resets the bot and clears the input buffer
+    game.start_game()
+    assert not game.inputs.latch().held
+    bot.feed(game, game.inputs)
+    assert MOVE_RIGHT in game.inputs.latch().held
+
+
+def test_perfect_bot_clears_level_one():
+    assert check(sessions=2) == []
+
+
+def test_sessions_are_reproducible():
+    init_worker("default", {}, {})
+    first = run_session(3, 1200, 8, 0.05, False)
+    assert run_session(3, 1200, 8, 0.05, False) == first
+    assert first["frames"] <= 1200
+
+
+def test_parse_profile():
+    spec = "hard:lives=2,FALL_SPEED_STEP=0.5"
+    assert parse_profile(spec) == (spec, "hard", {"lives": 2}, {"FALL_SPEED_STEP": 0.5})
+    with pytest.raises(SystemExit):
+        parse_profile("default:lives=0")
+
+
+def test_summarize():
+    results = [
+        {"frames": 600, "level": 2, "score": 12, "caught_bugs": 5, "missed_correct": 1, "finished": True},
+        {"frames": 1200, "level": 3, "score": 25, "caught_bugs": 0, "missed_correct": 5, "finished": True},
+        {"frames": 1800, "level": 3, "score": 28, "caught_bugs": 0, "missed_correct": 0, "finished": False},
+    ]
+    summary = summarize(results, fps=60)
+    assert summary["sessions"] == 3
+    assert summary["survival_seconds"]["mean"] == 20
+    assert summary["level_histogram"] == {2: 1, 3: 2}
+    assert summary["ended_by_bugs"] == 1
+    assert summary["timed_out"] == 1
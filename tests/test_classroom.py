@@ -0,0 +1,120 @@
+import asyncio
+import random
+import threading
+import time
+from classroom import ClassroomClient, ClassroomServer, spawn_rng
+from input_events import BACK
+
+
+class FakeSession:
+    # Stands in for ClassroomClient: a session seed and no network
+    seed = "test"
+
+    def spawn_rng(self, index):
+        return spawn_rng(self.seed, index)
+
+    def report(self, game):
+        pass
+
+    def scoreboard(self):
+        return ()
+
+
+def spawns(game, frames):
+    # (frame, text) of each card spawned while the player stands still
+    seen = []
+    for frame in range(frames):
+        count = game.spawn_count
+        game.game_update()
+        if game.spawn_count > count:
+            seen.append((frame, game.objects[-1].text))
+        if game.game_over:
+            break
+    return seen
+
+
+def test_classroom_schedule_is_fixed(game):
+    game.session = FakeSession()
+    game.reset_game()
+    game.start_game()
+    random.seed(1)
+    first = spawns(game, 600)
+    game.reset_game()
+    game.start_game()
+    random.seed(2)
+    second = spawns(game, 600)
+    assert first and first == second
+
+
+def test_classroom_game_cannot_pause(game):
+    game.session = FakeSession()
+    game.scene.handle_action(BACK)
+    assert not game.pause
+
+
+def test_solo_game_pauses(game):
+    game.scene.handle_action(BACK)
+    assert game.pause
+    game.scene.handle_action(BACK)
+    assert not game.pause
+
+
+def test_broadcast_sends_only_changes():
+    server = ClassroomServer(seed=1)
+    server.players = {"1": {"n": "Ada", "s": 0, "l": 1, "m": 0, "b": 0, "o": 0}}
+    server.broadcast()
+    assert server.sent["1"]["n"] == "Ada"
+    server.update_player("1", {"type": "state", "s": 10, "l": 2, "m": 0, "b": 0, "o": 0})
+    assert server.events == [["1", "level", 2]]
+    server.update_player("1", {"type": "state", "s": 3, "l": 1, "m": 0, "b": 0, "o": 0})
+    assert server.events[-1] == ["1", "restart"]
+    server.broadcast()
+    assert server.sent["1"]["s"] == 3 and not server.events
+    sent = server.stats["broadcasts"]
+    server.broadcast()  # nothing changed since
+    assert server.stats["ticks"] == 3
+    assert server.stats["broadcasts"] == sent
+
+
+class Server:
+    # ClassroomServer on its own event loop thread
+    def __init__(self):
+        self.server = ClassroomServer(seed=42, tick_rate=50)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.port = self.run(self.server.start("127.0.0.1", 0))
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(5)
+
+    def close(self):
+        self.run(self.server.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.01)
+
+
+def test_players_see_each_other(game):
+    server = Server()
+    ada = ClassroomClient("127.0.0.1", server.port, "Ada").start()
+    bob = ClassroomClient("127.0.0.1", server.port, "Bob").start()
+    try:
+        assert ada.seed == bob.seed == 42
+        assert ada.spawn_rng(3).random() == bob.spawn_rng(3).random()
+        game.score, game.level = 12, 2
+        ada.report(game)
+        wait_for(lambda: any(name == "Ada" and score == 12 for name, score, *_ in bob.scoreboard()))
+        assert bob.scoreboard()[0][:3] == ("Ada", 12, 2)
+        wait_for(lambda: ["1", "level", 2] in list(bob.events))
+    finally:
+        ada.close()
+        wait_for(lambda: "1" not in bob.players)
+        bob.close()
+        server.close()
@@ -0,0 +1,40 @@
+import pytest
+from config import load_profile, profile_names
+from settings import MAX_BUGS
+
+
+def test_profiles_found_from_any_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert {"default", "classroom", "hard"} <= set(profile_names())
+    hard = load_profile("hard")
+    assert hard.name == "hard"
+    assert hard.max_bugs == 3
+    assert load_profile("classroom").adaptive is False
+
+
+def test_default_profile():
+    config = load_profile()
+    assert config.name == "default"
+    assert config.max_bugs == MAX_BUGS
+    assert len(config.fall_speeds) == config.max_levels
+
+
+def test_profile_path(tmp_path):
+    path = tmp_path / "custom.toml"
+    path.write_text("lives = 2\n")
+    config = load_profile(str(path))
+    assert config.name == "custom"
+    assert config.lives == 2
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="Unknown profile 'nope'"):
+        load_profile("nope")
+
+
+def test_overrides_are_validated():
+    assert len(load_profile(overrides={"max_levels": 3}).spawn_frames) == 3
+    with pytest.raises(ValueError, match="lives must be a whole number"):
+        load_profile(overrides={"lives": 2.5})
+    with pytest.raises(ValueError, match="unknown settings"):
+        load_profile(overrides={"livez": 2})
@@ -0,0 +1,60 @@
+from config import load_profile
+from difficulty import DifficultyEngine, RollingWindow
+from settings import ADAPT_MIN_SAMPLES, ADAPT_WINDOW
+
+
+def settle(engine, right, frames=600):
+    for _ in range(ADAPT_WINDOW):
+        engine.record_outcome(right)
+    for _ in range(frames):
+        engine.tick(1)
+
+
+def test_rolling_window_keeps_the_latest():
+    window = RollingWindow(3)
+    assert window.mean(default=7) == 7
+    for value in (1, 2, 3, 4):
+        window.add(value)
+    assert window.count == 3
+    assert window.mean() == 3
+
+
+def test_strong_player_gets_more_pressure():
+    engine = DifficultyEngine()
+    engine.tick(1)
+    baseline = (engine.spawn_interval, engine.base_speed, engine.bug_ratio)
+    settle(engine, True)
+    assert engine.pressure > 0.5
+    assert engine.spawn_interval < baseline[0]
+    assert engine.base_speed > baseline[1]
+    assert engine.bug_ratio > baseline[2]
+
+
+def test_struggling_player_gets_relief():
+    engine = DifficultyEngine()
+    engine.tick(1)
+    speed = engine.base_speed
+    settle(engine, False)
+    assert engine.pressure < -0.5
+    assert engine.base_speed < speed
+
+
+def test_needs_samples_before_adapting():
+    engine = DifficultyEngine()
+    for _ in range(ADAPT_MIN_SAMPLES - 1):
+        engine.record_outcome(True)
+    assert engine.target_pressure() == 0.0
+
+
+def test_fixed_profile_does_not_adapt():
+    engine = DifficultyEngine(load_profile("classroom"))
+    settle(engine, True)
+    assert engine.pressure == 0.0
+
+
+def test_levels_past_the_last_play_like_it():
+    engine = DifficultyEngine(load_profile(overrides={"max_levels": 3}))
+    engine.tick(3)
+    last = (engine.spawn_interval, engine.base_speed)
+    engine.tick(9)
+    assert (engine.spawn_interval, engine.base_speed) == last
@@ -0,0 +1,41 @@
+import pygame
+from idle import IdleScheduler
+from input_events import InputSystem, MOVE_LEFT, MOVE_RIGHT
+
+
+def scheduler(inputs):
+    pygame.event.clear()
+    return IdleScheduler(pygame.time.Clock(), inputs, wait_ms=10)
+
+
+def moves(inputs):
+    inputs.poll()
+    return [(event.action, event.down) for event in inputs.ring.pop_until(float("inf"))]
+
+
+def test_waking_event_keeps_its_place():
+    inputs = InputSystem()
+    idle = scheduler(inputs)
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_LEFT))
+    pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_LEFT))
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RIGHT))
+    idle.tick(False)
+    assert idle.idle
+    assert moves(inputs) == [(MOVE_LEFT, True), (MOVE_LEFT, False), (MOVE_RIGHT, True)]
+
+
+def test_times_out_without_input():
+    inputs = InputSystem()
+    idle = scheduler(inputs)
+    idle.tick(False)
+    assert inputs.deferred == []
+
+
+def test_animating_ticks_at_fps():
+    inputs = InputSystem()
+    idle = scheduler(inputs)
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_LEFT))
+    idle.tick(True)
+    assert not idle.idle
+    assert inputs.deferred == []
+    assert moves(inputs) == [(MOVE_LEFT, True)]
@@ -0,0 +1,97 @@
+import pygame
+from input_events import InputSystem, MOVE_LEFT, MOVE_RIGHT
+from metrics import metrics
+
+
+def post(kind, **attrs):
+    pygame.event.post(pygame.event.Event(kind, **attrs))
+
+
+def held(inputs):
+    inputs.poll()
+    return inputs.latch().held
+
+
+def test_move_held_while_any_key_is_down():
+    pygame.event.clear()
+    inputs = InputSystem()
+    post(pygame.KEYDOWN, key=pygame.K_LEFT)
+    post(pygame.KEYDOWN, key=pygame.K_a)
+    assert held(inputs) == {MOVE_LEFT}
+    post(pygame.KEYUP, key=pygame.K_a)
+    assert held(inputs) == {MOVE_LEFT}
+    post(pygame.KEYUP, key=pygame.K_LEFT)
+    assert held(inputs) == frozenset()
+
+
+def test_key_up_keeps_hat_move():
+    pygame.event.clear()
+    inputs = InputSystem()
+    post(pygame.KEYDOWN, key=pygame.K_LEFT)
+    post(pygame.JOYHATMOTION, instance_id=5, hat=0, value=(-1, 0))
+    post(pygame.KEYUP, key=pygame.K_LEFT)
+    assert held(inputs) == {MOVE_LEFT}
+    post(pygame.JOYHATMOTION, instance_id=5, hat=0, value=(0, 0))
+    assert held(inputs) == frozenset()
+
+
+def test_removed_device_releases_its_moves():
+    pygame.event.clear()
+    inputs = InputSystem()
+    inputs.joysticks[5] = object()  # opened earlier
+    post(pygame.KEYDOWN, key=pygame.K_RIGHT)
+    post(pygame.JOYHATMOTION, instance_id=5, hat=0, value=(-1, 0))
+    assert held(inputs) == {MOVE_LEFT, MOVE_RIGHT}
+    post(pygame.JOYDEVICEREMOVED, instance_id=5)
+    assert held(inputs) == {MOVE_RIGHT}
+    assert not inputs.directions
+
+
+def test_controller_ignores_its_joystick_events():
+    inputs = InputSystem()
+    inputs.controllers.add(3)
+    event = pygame.event.Event(pygame.JOYBUTTONDOWN, instance_id=3, button=0)
+    assert inputs.translate(event) == []
+
+
+def test_focus_loss_keeps_bot_move():
+    pygame.event.clear()
+    inputs = InputSystem()
+    inputs.push(MOVE_RIGHT, True)
+    post(pygame.KEYDOWN, key=pygame.K_LEFT)
+    post(pygame.WINDOWFOCUSLOST)
+    assert held(inputs) == {MOVE_RIGHT}
+
+
+def test_tap_between_ticks_still_counts():
+    inputs = InputSystem()
+    inputs.push(MOVE_LEFT, True)
+    inputs.push(MOVE_LEFT, False)
+    state = inputs.latch()
+    assert state.active(MOVE_LEFT) and not state.held
+    assert not inputs.latch().active(MOVE_LEFT)
+
+
+def test_tap_moves_the_player(game):
+    x = game.player.x
+    game.inputs.push(MOVE_LEFT, True)
+    game.inputs.push(MOVE_LEFT, False)
+    game.update()
+    assert game.player.x < x
+
+
+def test_input_latency_is_measured(game):
+    metrics.toggle_overlay()
+    try:
+        metrics.latencies.clear()
+        pygame.event.clear()
+        post(pygame.KEYDOWN, key=pygame.K_RIGHT)
+        game.handle_events()
+        game.update()
+        game.draw()
+        assert len(metrics.latencies) == 1 and metrics.latencies[0] >= 0
+        game.update()
+        game.draw()
+        assert len(metrics.latencies) == 1
+    finally:
+        metrics.toggle_overlay()
@@ -0,0 +1,48 @@
+from falling_object import SNIPPET_TIERS
+from layout import card_font, card_layout, precompute, text_size, wrap
+from settings import CARD_HEIGHT, CARD_PADDING_X, CARD_WIDTH_MAX, CARD_WIDTH_MIN
+
+
+def test_short_snippet_gets_a_minimum_card():
+    layout = card_layout("x")
+    assert (layout.width, layout.height) == (CARD_WIDTH_MIN, CARD_HEIGHT)
+    assert len(layout.lines) == 1
+
+
+def test_card_fits_its_text():
+    font = card_font()
+    for correct, bugs in SNIPPET_TIERS:
+        for text in correct + bugs:
+            layout = card_layout(text)
+            assert layout.width <= CARD_WIDTH_MAX
+            for line, x, y in layout.lines:
+                width, height = text_size(font, line)
+                assert x >= 0 and x + width <= layout.width
+                assert y >= 0 and y + height <= layout.height
+
+
+def test_long_lines_wrap_at_spaces():
+    text = " ".join(["word"] * 40)
+    layout = card_layout(text)
+    assert len(layout.lines) > 1
+    assert " ".join(line for line, _, _ in layout.lines) == text
+    assert layout.height > CARD_HEIGHT
+
+
+def test_newlines_and_long_words_are_kept():
+    font = card_font()
+    assert wrap(font, "if x:\n    y = 1", 10 ** 6) == ["if x:", "    y = 1"]
+    word = "w" * 200
+    assert wrap(font, f"a {word} b", CARD_WIDTH_MAX - 2 * CARD_PADDING_X) == ["a", word, "b"]
+
+
+def test_layouts_are_cached():
+    assert card_layout("print('Hello')") is card_layout("print('Hello')")
+    assert precompute(SNIPPET_TIERS) >= len({t for c, b in SNIPPET_TIERS for t in c + b})
+
+
+def test_wrapped_lines_keep_their_indentation():
+    font = card_font()
+    lines = wrap(font, "if x:\n    " + " ".join(["y"] * 200), CARD_WIDTH_MAX - 2 * CARD_PADDING_X)
+    assert len(lines) > 2
+    assert all(line.startswith("    y") for line in lines[1:])
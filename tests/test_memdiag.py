@@ -0,0 +1,62 @@
+import json
+import tracemalloc
+import pygame
+import pytest
+from memdiag import MemoryDiagnostics, count_surfaces
+from settings import MEMDIAG_GROWTH_WINDOW, MEMDIAG_GROWTH_MIN_BYTES
+from metrics import AllocationCounter
+
+
+class Holder:
+    # Surfaces are found through gc-tracked objects that refer to them
+    def __init__(self, surface):
+        self.surface = surface
+
+
+def test_counts_surfaces_while_metrics_patch_pygame():
+    base = count_surfaces()["count"]
+    before = Holder(pygame.Surface((7, 3)))
+    counter = AllocationCounter()
+    counter.install()
+    try:
+        during = Holder(pygame.Surface((7, 3)))
+        census = count_surfaces()
+    finally:
+        counter.uninstall()
+    assert counter.count == 1
+    assert census["count"] == base + 2
+    assert before.surface is not during.surface
+
+
+@pytest.fixture
+def diagnostics(tmp_path):
+    was_tracing = tracemalloc.is_tracing()
+    yield MemoryDiagnostics(str(tmp_path), interval=3600)
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def samples(traced):
+    return [{"traced_bytes": value, "surfaces": 0} for value in traced]
+
+
+def test_growth_needs_a_steady_rise(diagnostics):
+    step = MEMDIAG_GROWTH_MIN_BYTES
+    diagnostics.restarts = samples(range(0, step * (MEMDIAG_GROWTH_WINDOW + 1), step))
+    assert diagnostics.growth()["suspected"]
+    # One restart that freed memory breaks the run
+    diagnostics.restarts[-2]["traced_bytes"] = 0
+    assert not diagnostics.growth()["suspected"]
+    # So does too short a history
+    diagnostics.restarts = diagnostics.restarts[-MEMDIAG_GROWTH_WINDOW:]
+    assert not diagnostics.growth()["suspected"]
+
+
+def test_leak_across_restarts_is_reported(diagnostics, game, tmp_path):
+    leak = []
+    for _ in range(MEMDIAG_GROWTH_WINDOW + 1):
+        leak.append(bytearray(MEMDIAG_GROWTH_MIN_BYTES))
+        diagnostics.on_restart(game)
+    assert diagnostics.restarts[-1]["growth_suspected"]
+    with open(tmp_path / "memory-00001.json", encoding="utf-8") as f:
+        assert json.load(f)["reason"] == "growth"
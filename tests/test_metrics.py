@@ -0,0 +1,88 @@
+import json
+import socket
+import time
+import pygame
+from metrics import Metrics, MetricsExporter, prometheus_text
+
+
+def frame(metrics, game):
+    metrics.begin_frame()
+    pygame.Surface((2, 2))
+    metrics.mark("update")
+    metrics.end_frame(game)
+
+
+def test_overlay_counts_allocations_and_restores_pygame(game):
+    original = pygame.Surface
+    metrics = Metrics()
+    metrics.toggle_overlay()
+    assert metrics.enabled and pygame.Surface is not original
+    frame(metrics, game)
+    assert metrics.surfaces_per_frame == 1
+    metrics.toggle_overlay()
+    assert not metrics.enabled and pygame.Surface is original
+
+
+def test_snapshot_formats(game):
+    metrics = Metrics()
+    metrics.cache_hit("text")
+    metrics.cache_miss("text")
+    metrics.record_latency(12.0)
+    frame(metrics, game)
+    snapshot = metrics.snapshot(game)
+    assert snapshot["frame"] == 1
+    assert snapshot["cache_hit_ratio"] == {"text": 0.5}
+    assert snapshot["input_latency_ms_p50"] == 12.0
+    text = prometheus_text(snapshot)
+    assert 'codecatcher_cache_hit_ratio{cache="text"} 0.5' in text
+    assert 'codecatcher_count{name="objects"}' in text
+
+
+def test_file_export(tmp_path, game):
+    snapshot = Metrics().snapshot(game)
+    path = str(tmp_path / "out" / "metrics.jsonl")
+    exporter = MetricsExporter(path)
+    exporter.export(snapshot)
+    exporter.export(snapshot)
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["state"] for line in f] == ["game", "game"]
+
+    # Prometheus files always hold just the latest sample
+    path = str(tmp_path / "metrics.prom")
+    exporter = MetricsExporter(path, "prometheus")
+    exporter.export(snapshot)
+    exporter.export(snapshot)
+    with open(path, encoding="utf-8") as f:
+        assert f.read().count("# TYPE codecatcher_fps gauge") == 1
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_tcp_export_never_blocks_the_caller(game):
+    snapshot = Metrics().snapshot(game)
+    exporter = MetricsExporter(f"tcp://127.0.0.1:{free_port()}")
+    started = time.perf_counter()
+    for _ in range(100):
+        exporter.export(snapshot)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_tcp_export_delivers(game):
+    snapshot = Metrics().snapshot(game)
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        exporter = MetricsExporter(f"tcp://127.0.0.1:{server.getsockname()[1]}")
+        exporter.export(snapshot)
+        server.settimeout(5)
+        conn, _ = server.accept()
+        with conn:
+            conn.settimeout(5)
+            data = b""
+            while not data.endswith(b"\n"):
+                data += conn.recv(4096)
+    assert json.loads(data)["state"] == "game"
@@ -0,0 +1,58 @@
+import random
+import pytest
+from bot import BotPolicy
+from pipeline import RenderPipeline
+
+
+def play(game, frames, draw):
+    random.seed(5)
+    game.controller = BotPolicy(seed=5)
+    game.start_game()
+    game.reset_game()
+    trace = []
+    for _ in range(frames):
+        game.update()
+        draw()
+        trace.append((game.score, game.spawn_count, tuple(obj.rect.topleft for obj in game.objects)))
+    return trace
+
+
+def test_rendering_does_not_change_the_simulation(game):
+    headless = play(game, 300, lambda: None)
+    pipeline = RenderPipeline(game)
+    try:
+        pipelined = play(game, 300, pipeline.draw)
+    finally:
+        pipeline.close()
+    assert pipelined == headless
+
+
+def test_frames_are_presented_one_behind(game, monkeypatch):
+    presented = []
+    monkeypatch.setattr(game.renderer, "present", lambda: presented.append(1), raising=False)
+    pipeline = RenderPipeline(game)
+    try:
+        game.update()
+        pipeline.draw()
+        assert presented == []
+        game.update()
+        pipeline.draw()
+        assert presented == [1]
+    finally:
+        pipeline.close()
+    # close() shows the frame still in flight
+    assert presented == [1, 1]
+    assert not pipeline.thread.is_alive()
+
+
+def test_render_errors_reach_the_main_thread(game, monkeypatch):
+    def broken(renderer, state=None):
+        raise RuntimeError("draw failed")
+
+    monkeypatch.setattr(game.scene, "draw", broken)
+    pipeline = RenderPipeline(game)
+    game.update()
+    pipeline.draw()
+    with pytest.raises(RuntimeError, match="draw failed"):
+        pipeline.wait()
+    pipeline.close()
@@ -0,0 +1,48 @@
+from quality import QualityGovernor
+from settings import (QUALITY_TIERS, QUALITY_WINDOW, QUALITY_DOWNGRADE_WINDOWS,
+                      QUALITY_UPGRADE_WINDOWS, QUALITY_DOWNGRADE, QUALITY_UPGRADE)
+
+FPS = 60
+BUDGET = 1000.0 / FPS
+
+
+def windows(governor, frame_ms, count):
+    for _ in range(count * QUALITY_WINDOW):
+        governor.record(frame_ms)
+
+
+def test_downgrades_after_slow_windows():
+    governor = QualityGovernor(start=0, auto=True, fps=FPS)
+    slow = BUDGET * QUALITY_DOWNGRADE * 1.5
+    windows(governor, slow, QUALITY_DOWNGRADE_WINDOWS - 1)
+    assert governor.level == 0
+    windows(governor, slow, 1)
+    assert governor.level == 1
+
+
+def test_upgrades_after_fast_windows():
+    governor = QualityGovernor(start=1, auto=True, fps=FPS)
+    fast = BUDGET * QUALITY_UPGRADE * 0.5
+    windows(governor, fast, QUALITY_UPGRADE_WINDOWS)
+    assert governor.level == 0
+
+
+def test_holds_between_thresholds():
+    # Hysteresis: frames inside the band reset both counters
+    governor = QualityGovernor(start=1, auto=True, fps=FPS)
+    middle = BUDGET * (QUALITY_DOWNGRADE + QUALITY_UPGRADE) / 2
+    windows(governor, middle, QUALITY_DOWNGRADE_WINDOWS + QUALITY_UPGRADE_WINDOWS)
+    assert governor.level == 1
+
+
+def test_stays_within_tiers():
+    governor = QualityGovernor(start=len(QUALITY_TIERS) - 1, auto=True, fps=FPS)
+    windows(governor, BUDGET * 10, QUALITY_DOWNGRADE_WINDOWS * 2)
+    assert governor.tier is QUALITY_TIERS[-1]
+
+
+def test_manual_mode_only_measures():
+    governor = QualityGovernor(start=0, auto=False, fps=FPS)
+    windows(governor, BUDGET * 10, QUALITY_DOWNGRADE_WINDOWS * 2)
+    assert governor.level == 0
+    assert governor.last_percentile == BUDGET * 10
@@ -0,0 +1,67 @@
+import os
+import queue
+from multiprocessing import shared_memory
+import pygame
+import recorder
+from recorder import Recorder, encode_frames, output_kind, pixel_format
+from settings import RECORD_MAX_GAP
+
+
+def test_output_kind():
+    assert output_kind("clip/frames") == ("frames", "clip/frames")
+    kind, path = output_kind("clip.mp4")
+    assert (kind, path) in (("ffmpeg", "clip.mp4"), ("frames", "clip_frames"))
+
+
+def test_pixel_format():
+    assert pixel_format(pygame.Surface((2, 2), 0, 32, (0xff0000, 0xff00, 0xff, 0))) == "BGRA"
+    assert pixel_format(pygame.Surface((2, 2), 0, 32, (0xff, 0xff00, 0xff0000, 0))) == "RGBX"
+    assert pixel_format(pygame.Surface((2, 2), 0, 16)) is None
+
+
+class ListWriter:
+    # Keeps the timeline indices instead of encoding
+    written = []
+
+    def __init__(self, path, size, fps):
+        ListWriter.written = []
+
+    def write(self, rgb, index):
+        ListWriter.written.append(index)
+
+    def close(self):
+        pass
+
+
+def test_frames_are_placed_on_the_timeline(monkeypatch):
+    monkeypatch.setitem(recorder.WRITERS, "list", ListWriter)
+    size, fps = (4, 4), 10
+    memory = shared_memory.SharedMemory(create=True, size=4 * 4 * 4)
+    try:
+        filled, free = queue.Queue(), queue.Queue()
+        # On time, a dropped capture, then an idle pause far past RECORD_MAX_GAP
+        for captured_at in (0.0, 0.1, 0.3, 0.4, 100.0):
+            filled.put((0, "RGBX", captured_at))
+        filled.put(None)
+        encode_frames(memory.name, size, (2, 2), fps, "list", "", filled, free)
+    finally:
+        memory.close()
+        memory.unlink()
+    gap = int(RECORD_MAX_GAP * fps)
+    assert ListWriter.written == [0, 1, 3, 4, 5 + gap]
+    assert free.qsize() == 5
+
+
+def test_records_frames_from_another_process(game, tmp_path):
+    path = str(tmp_path / "clip")
+    clip = Recorder(path, game.renderer.size, fps=1000, scale=0.5)
+    for _ in range(3):
+        game.update()
+        game.draw()
+        clip.capture(game.renderer)
+        pygame.time.wait(2)
+    clip.close()
+    frames = sorted(os.listdir(path))
+    assert len(frames) == clip.captured >= 1
+    first = pygame.image.load(os.path.join(path, frames[0]))
+    assert first.get_size() == (game.renderer.size[0] // 2, game.renderer.size[1] // 2)
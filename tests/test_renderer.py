@@ -0,0 +1,46 @@
+import gc
+import pygame
+import pytest
+import renderer
+from renderer import circle_sprite
+
+
+def test_circle_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(renderer, "CIRCLE_CACHE_SIZE", 8)
+    renderer._circle_cache.clear()
+    # Random level-up colours, one new key each
+    for red in range(20):
+        circle_sprite(3, (red, 100, 100))
+    assert len(renderer._circle_cache) == 8
+
+
+def test_circle_cache_keeps_recently_used():
+    renderer._circle_cache.clear()
+    first = circle_sprite(3, (1, 2, 3))
+    for i in range(renderer.CIRCLE_CACHE_SIZE * 2):
+        circle_sprite(2, (i % 256, i // 256, 0))
+        assert circle_sprite(3, (1, 2, 3)) is first
+
+
+def test_software_renderer_draws_sprites(display):
+    software = renderer.SurfaceRenderer(display)
+    software.begin_frame()
+    display.fill((0, 0, 0))
+    software.draw_sprite(circle_sprite(4, (255, 0, 0)), (50, 50))
+    assert display.get_at((50, 50))[:3] == (255, 0, 0)
+
+
+def test_texture_renderer_uploads_each_surface_once():
+    try:
+        texture = renderer.TextureRenderer((64, 64))
+    except Exception as e:
+        pytest.skip(f"no SDL renderer here: {e}")
+    sprite = pygame.Surface((8, 8), pygame.SRCALPHA)
+    texture.begin_frame()
+    for angle in (0, 30, 60):
+        texture.draw_sprite(sprite, (32, 32), angle)
+    assert texture.uploads == 1
+    # Textures live only as long as their surfaces
+    del sprite
+    gc.collect()
+    assert len(texture.textures) == 0
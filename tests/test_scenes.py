@@ -0,0 +1,61 @@
+from input_events import BACK, CONFIRM
+from scenes import MenuScene
+
+
+def click(game, button):
+    return game.scene.handle_buttons(button.rect.center, [button.rect.center])
+
+
+def test_pause_freezes_gameplay(game):
+    for _ in range(120):
+        game.update()
+    assert game.objects
+    positions = [obj.rect.topleft for obj in game.objects]
+    game.scene.handle_action(BACK)
+    assert game.pause
+    for _ in range(30):
+        game.update()
+    assert [obj.rect.topleft for obj in game.objects] == positions
+    game.scene.handle_action(BACK)
+    game.update()
+    assert [obj.rect.topleft for obj in game.objects] != positions
+
+
+def test_overlay_draws_covered_scene_once(game, monkeypatch):
+    calls = []
+    monkeypatch.setattr(game, "draw_pause", lambda: calls.append(1))
+    game.scene.handle_action(BACK)
+    for _ in range(3):
+        game.draw()
+    assert len(calls) == 1
+    assert not game.is_animating()
+
+
+def test_game_over_and_play_again(game):
+    game.score = 7
+    game.game_over = True
+    game.update()
+    assert game.state == "game_over"
+    play_again = next(b for b in game.game_over_buttons if b.action == "play_again")
+    click(game, play_again)
+    assert game.state == "game"
+    assert game.score == 0 and not game.game_over
+
+
+def test_menu_starts_game_and_tutorial_returns(game):
+    game.set_scene(MenuScene(game))
+    assert not game.is_animating()
+    tutorial = next(b for b in game.menu_buttons if b.action == "tutorial")
+    click(game, tutorial)
+    assert game.state == "tutorial"
+    game.scene.handle_action(CONFIRM)
+    assert game.state == "menu"
+    start = next(b for b in game.menu_buttons if b.action == "start_game")
+    click(game, start)
+    assert game.state == "game"
+
+
+def test_menu_quit(game):
+    game.set_scene(MenuScene(game))
+    quit_button = next(b for b in game.menu_buttons if b.action == "quit")
+    assert click(game, quit_button) is False
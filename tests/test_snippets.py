@@ -0,0 +1,65 @@
+import snippets
+from snippets import (SOURCE_TIERS, build_corpus, classify, generate_bugs, load_corpus,
+                      load_tiers, mutations, normalize, snippet_hash, verify_sources, write_corpus)
+
+
+def test_normalize_ignores_spacing_but_keeps_indentation():
+    assert normalize("  x  =  5 +\t3 ") == "x = 5 + 3"
+    assert snippet_hash("x = 5") == snippet_hash("x  =   5 ")
+    assert normalize("if x:\n    y = 1") == "if x:\n    y = 1"
+    assert snippet_hash("if x:\n    y = 1") != snippet_hash("if x:\n y = 1")
+
+
+def test_whitespace_variants_are_deduplicated():
+    tiers = [(["x = 5 + 3", "x  =  5 + 3 "], ["pritn('hi')", "pritn( 'hi')", "pritn('hi')  "])]
+    corpus = build_corpus(tiers, limit=0)
+    texts = sorted(entry["text"] for entry in corpus["snippets"].values())
+    assert texts == ["pritn( 'hi')", "pritn('hi')", "x = 5 + 3"]
+
+
+def test_classify():
+    assert classify("print('Hello')") is None
+    assert classify("for i in range(10):") is None
+    assert classify("yield x") is None
+    assert classify("print('Hello'") == "syntax error"
+    assert "misspelled 'print'" in classify("pritn('Hello')")
+    assert "unknown module" in classify("import mathh")
+
+
+def test_operator_swaps_are_generated():
+    candidates = mutations("if x == 10:")
+    assert "if x = 10:" in candidates
+    assert "while n =! 0: n -= 1" in mutations("while n != 0: n -= 1")
+
+
+def test_generated_bugs_are_verified_and_stable():
+    correct = {normalize("if x >= 10:")}
+    bugs = generate_bugs("if x >= 10:", correct, limit=20)
+    assert bugs and all(classify(text) for text, _ in bugs)
+    assert all(normalize(text) not in correct for text, _ in bugs)
+    assert generate_bugs("if x >= 10:", correct, limit=20) == bugs
+
+
+def test_hand_written_snippets_are_labelled_right():
+    assert verify_sources(SOURCE_TIERS) == []
+    assert verify_sources([(["pritn('x')"], ["print('x')"])]) == [
+        "tier 0: \"pritn('x')\" is labelled correct but has a misspelled 'print' as 'pritn'",
+        "tier 0: \"print('x')\" is labelled a bug but is valid",
+    ]
+
+
+def test_shipped_corpus_is_current():
+    corpus = load_corpus()
+    assert corpus is not None
+    assert corpus["source_hash"] == snippets.source_hash(SOURCE_TIERS, snippets.MAX_VARIANTS)
+    assert not corpus["problems"]
+
+
+def test_load_tiers(tmp_path):
+    path = str(tmp_path / "corpus.json")
+    write_corpus(build_corpus([(["x = 1"], ["x = = 1"]), (["y = 2"], [])], limit=1), path)
+    tiers = load_tiers(path)
+    assert tiers[0][0] == ["x = 1"] and "x = = 1" in tiers[0][1]
+    assert tiers[1][0] == ["y = 2"]
+    # An unbuilt corpus falls back to the hand-written snippets
+    assert load_tiers(str(tmp_path / "missing.json"))[0][0] == SOURCE_TIERS[0][0]